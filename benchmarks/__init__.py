@@ -0,0 +1,3 @@
+"""
+Synthetic report generator and benchmarks for the extraction pipeline.
+"""
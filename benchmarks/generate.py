@@ -0,0 +1,177 @@
+"""
+Generator of synthetic free float reports in the Central Depository layout.
+
+The reports have the header line with the report date, a ruled five-column
+table whose company names wrap onto several lines, and the footer with the
+number of emitents. They need reportlab and a TrueType font with Cyrillic
+glyphs (DejaVu Sans by default).
+
+Usage:
+    python -m benchmarks.generate report.pdf --rows 2000 --pages 40
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+from csd_bg_free_float_extractor.constants import HEADER_TEXT
+
+# Locations searched for a font with Cyrillic glyphs
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+FONT_NAME = "SyntheticReportFont"
+
+TABLE_HEADER = ["Емитент", "Емисия", "Брой акции", "Фрий флoут", "Брой акционери"]
+COLUMN_WIDTHS = [170, 90, 80, 80, 70]
+
+# Words used to build company names
+NAME_WORDS = ["ХОЛДИНГ", "ИНВЕСТ", "ИНДУСТРИАЛЕН", "ФОНД", "ЗА", "НЕДВИЖИМИ", "ИМОТИ",
+              "БЪЛГАРИЯ", "ЕНЕРДЖИ", "ТРАНС", "СТРОЙ", "АГРО", "ФАРМА", "КАПИТАЛ"]
+
+
+def find_font(font_path=None):
+    """
+    Find a TrueType font with Cyrillic glyphs.
+
+    Args:
+        font_path (str, optional): Font to use instead of searching
+
+    Returns:
+        str: Path of the font
+
+    Raises:
+        FileNotFoundError: If no font was found
+    """
+    candidates = [font_path] if font_path else FONT_PATHS
+    for candidate in candidates:
+        if candidate and Path(candidate).exists():
+            return candidate
+    raise FileNotFoundError("No TrueType font with Cyrillic glyphs found; pass font_path")
+
+
+def isin_check_digit(body):
+    """
+    Compute the check digit of an ISIN.
+
+    Args:
+        body (str): First eleven characters of the ISIN
+
+    Returns:
+        str: Luhn check digit of the body with letters as two digits (A = 10 ... Z = 35)
+    """
+    digits = "".join(str(int(char, 36)) for char in body)
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        # Doubled once the check digit is appended on the right
+        if position % 2 == 0:
+            value = 2 * value - 9 if value >= 5 else 2 * value
+        total += value
+    return str(-total % 10)
+
+
+def synthetic_rows(rows, seed=1, long_name_every=7):
+    """
+    Build the rows of a synthetic report.
+
+    Args:
+        rows (int): Number of rows
+        seed (int, optional): Seed of the random numbers
+        long_name_every (int, optional): Every n-th company gets a name long
+            enough to wrap onto several lines; 0 disables long names
+
+    Returns:
+        list: (company, emission code, total shares, free float, shareholders) tuples
+    """
+    rnd = random.Random(seed)
+    result = []
+    for i in range(rows):
+        if long_name_every and i % long_name_every == 0:
+            words = rnd.sample(NAME_WORDS, 6)
+        else:
+            words = rnd.sample(NAME_WORDS, 2)
+        company = f"{' '.join(words)} {i} АД"
+        total = rnd.randint(1000, 10 ** 9)
+        code = f"BG11{i:07d}"
+        free_float, shareholders = rnd.randint(0, total), rnd.randint(1, 9000)
+        result.append((company, code + isin_check_digit(code), total, free_float, shareholders))
+    return result
+
+
+def generate_report(path, rows=300, pages=None, report_date="28-02-2025", seed=1,
+                    long_name_every=7, font_path=None):
+    """
+    Write a synthetic report.
+
+    Args:
+        path (str or Path): Output PDF path
+        rows (int, optional): Number of table rows
+        pages (int, optional): Spread the rows evenly over this many pages; by
+            default the table flows onto as many pages as it needs. Pages that
+            cannot hold their share of rows overflow onto extra pages.
+        report_date (str, optional): Date in the header, DD-MM-YYYY
+        seed (int, optional): Seed of the random numbers
+        long_name_every (int, optional): Every n-th company name wraps onto several lines
+        font_path (str, optional): TrueType font with Cyrillic glyphs
+
+    Returns:
+        list: Rows written, see synthetic_rows
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    pdfmetrics.registerFont(TTFont(FONT_NAME, find_font(font_path)))
+    style = ParagraphStyle("cell", fontName=FONT_NAME, fontSize=8, leading=9)
+    table_style = TableStyle([
+        ("FONT", (0, 0), (-1, -1), FONT_NAME, 8),
+        ("GRID", (0, 0), (-1, -1), 0.5, "black"),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ])
+
+    data = synthetic_rows(rows, seed, long_name_every)
+    cells = [[Paragraph(company, style), code, str(total), str(free_float), str(shareholders)]
+             for company, code, total, free_float, shareholders in data]
+
+    chunk_size = -(-len(cells) // pages) if pages else len(cells) or 1
+    chunks = [cells[start:start + chunk_size] for start in range(0, len(cells), chunk_size)] or [[]]
+
+    story = [Paragraph(f"{HEADER_TEXT} {report_date}", style)]
+    for number, chunk in enumerate(chunks):
+        table_rows = ([TABLE_HEADER] if number == 0 else []) + chunk
+        if number == len(chunks) - 1:
+            table_rows.append([f"{rows} Брой емитенти", "", "", "", ""])
+        if number > 0:
+            story.append(PageBreak())
+        table = Table(table_rows, colWidths=COLUMN_WIDTHS)
+        table.setStyle(table_style)
+        story.append(table)
+
+    SimpleDocTemplate(str(path), pagesize=A4).build(story)
+    return data
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Write a synthetic free float report.")
+    parser.add_argument("path", help="Output PDF path")
+    parser.add_argument("--rows", type=int, default=300, help="Number of table rows")
+    parser.add_argument("--pages", type=int, default=None,
+                        help="Spread the rows over this many pages")
+    parser.add_argument("--date", default="28-02-2025", help="Report date (DD-MM-YYYY)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random numbers")
+    parser.add_argument("--font", default=None, help="TrueType font with Cyrillic glyphs")
+    args = parser.parse_args()
+
+    generate_report(args.path, args.rows, args.pages, args.date, args.seed, font_path=args.font)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Benchmarks of the extraction pipeline on synthetic reports.
+
+Each case runs in a fresh process so its peak RSS is measured on its own.
+Results can be stored as a baseline and later runs compared against it:
+
+    python -m benchmarks.run --rows 2000 --pages 40 --save-baseline
+    python -m benchmarks.run --rows 2000 --pages 40 --compare
+
+Baselines are specific to the machine they were recorded on.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from .generate import generate_report, synthetic_rows
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+
+# Allowed slowdown (or RSS growth) before a case counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def _peak_rss_mb():
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        float: Peak RSS in MB, or None if it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _best_time(function, repeat):
+    """
+    Run a function several times.
+
+    Args:
+        function (callable): Function to time
+        repeat (int): Number of runs
+
+    Returns:
+        tuple: (shortest run time in seconds, result of the last run)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _bench_parser(pdf_path, backend, repeat):
+    """
+    Time PDFParser on a report.
+
+    Args:
+        pdf_path (Path): Report to parse
+        backend (str): Extraction backend
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Seconds, pages and rows
+    """
+    import pdfplumber
+
+    from csd_bg_free_float_extractor.extractor.parser import PDFParser
+    from csd_bg_free_float_extractor.extractor.templates import TemplateCache
+
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.CRITICAL)
+    parser = PDFParser(logger, backend=backend, template_cache=TemplateCache(logger=logger))
+
+    seconds, (df, _, _) = _best_time(lambda: parser.extract_data_from_pdf(pdf_path), repeat)
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = len(pdf.pages)
+    return {"seconds": seconds, "pages": pages, "rows": len(df)}
+
+
+def _row_texts(rows):
+    """
+    Build the text of synthetic table rows as parse_row receives it.
+
+    Args:
+        rows (int): Number of rows
+
+    Returns:
+        list: Row strings
+    """
+    return [" ".join(str(value) for value in row) for row in synthetic_rows(rows)]
+
+
+def _bench_parse_row(rows, repeat):
+    """
+    Time parse_row on synthetic rows.
+
+    Args:
+        rows (int): Number of rows
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Seconds and rows
+    """
+    from csd_bg_free_float_extractor.extractor.parser import parse_row
+
+    texts = _row_texts(rows)
+    seconds, _ = _best_time(lambda: [parse_row(text) for text in texts], repeat)
+    return {"seconds": seconds, "rows": rows}
+
+
+def _bench_parse_rows(rows, repeat):
+    """
+    Time the batch parse_rows on synthetic rows.
+
+    Args:
+        rows (int): Number of rows
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Seconds and rows
+    """
+    from csd_bg_free_float_extractor.extractor.parser import parse_rows
+
+    texts = _row_texts(rows)
+    seconds, _ = _best_time(lambda: parse_rows(texts), repeat)
+    return {"seconds": seconds, "rows": rows}
+
+
+def _bench_writer(output_format, rows, repeat):
+    """
+    Time an output writer on synthetic rows.
+
+    Args:
+        output_format (str): Output format
+        rows (int): Number of rows
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Seconds and rows
+    """
+    from csd_bg_free_float_extractor.extractor.parser import parse_rows
+    from csd_bg_free_float_extractor.extractor.writers import check_formats, write_outputs
+
+    check_formats([output_format])
+    df, _ = parse_rows(_row_texts(rows))
+    with tempfile.TemporaryDirectory() as output_dir:
+        seconds, _ = _best_time(
+            lambda: write_outputs(df, Path(output_dir), "28-02-2025", (output_format,)), repeat
+        )
+    return {"seconds": seconds, "rows": rows}
+
+
+def _run_case(name, pdf_path, rows, repeat):
+    """
+    Run a benchmark case; executed in a fresh worker process.
+
+    Args:
+        name (str): Case name
+        pdf_path (Path): Synthetic report
+        rows (int): Number of rows of the report
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Measurements of the case
+    """
+    kind, _, variant = name.partition(":")
+    if kind == "parser":
+        result = _bench_parser(pdf_path, variant, repeat)
+    elif kind == "parse_row":
+        result = _bench_parse_row(rows, repeat)
+    elif kind == "parse_rows":
+        result = _bench_parse_rows(rows, repeat)
+    elif kind == "writer":
+        result = _bench_writer(variant, rows, repeat)
+    else:
+        raise ValueError(f"Unknown benchmark case: {name}")
+
+    result["rows_per_s"] = result["rows"] / result["seconds"]
+    if "pages" in result:
+        result["pages_per_s"] = result["pages"] / result["seconds"]
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+CASES = [
+    "parser:pdfplumber",
+    "parser:pdfminer",
+    "parse_row",
+    "parse_rows",
+    "writer:csv",
+    "writer:xlsx",
+    "writer:parquet",
+]
+
+
+def run_benchmarks(cases=CASES, rows=2000, pages=None, repeat=3):
+    """
+    Generate a synthetic report and run benchmark cases on it.
+
+    Args:
+        cases (list, optional): Names of the cases to run
+        rows (int, optional): Number of report rows
+        pages (int, optional): Number of report pages
+        repeat (int, optional): Runs per case; the fastest is reported
+
+    Returns:
+        dict: Case name -> measurements, or {"error": message} if the case failed
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = Path(temp_dir) / "report.pdf"
+        generate_report(pdf_path, rows=rows, pages=pages)
+
+        for name in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                try:
+                    results[name] = executor.submit(
+                        _run_case, name, pdf_path, rows, repeat
+                    ).result()
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results (dict): Results of run_benchmarks
+        baseline (dict): Stored results
+        tolerance (float, optional): Allowed relative slowdown or RSS growth
+
+    Returns:
+        list: Descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "error" in base or "error" in result:
+            continue
+        if result["rows_per_s"] < base["rows_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['rows_per_s']:.0f} rows/s, baseline {base['rows_per_s']:.0f}"
+            )
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak RSS {result['peak_rss_mb']:.0f} MB, "
+                f"baseline {base['peak_rss_mb']:.0f} MB"
+            )
+    return regressions
+
+
+def format_results(results, baseline=None):
+    """
+    Format results as a text table.
+
+    Args:
+        results (dict): Results of run_benchmarks
+        baseline (dict, optional): Stored results to show the relative change against
+
+    Returns:
+        str: Table of the results
+    """
+    lines = [
+        f"{'case':<20} {'seconds':>9} {'pages/s':>9} {'rows/s':>11} {'peak MB':>8} {'vs base':>8}"
+    ]
+    for name, result in results.items():
+        if "error" in result:
+            lines.append(f"{name:<20} skipped: {result['error']}")
+            continue
+        pages_per_s = f"{result['pages_per_s']:.1f}" if "pages_per_s" in result else "-"
+        rss = f"{result['peak_rss_mb']:.0f}" if result.get("peak_rss_mb") else "-"
+        change = "-"
+        base = (baseline or {}).get(name)
+        if base and "rows_per_s" in base:
+            change = f"{result['rows_per_s'] / base['rows_per_s'] - 1:+.0%}"
+        lines.append(f"{name:<20} {result['seconds']:>9.3f} {pages_per_s:>9} "
+                     f"{result['rows_per_s']:>11.0f} {rss:>8} {change:>8}")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline.")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows of the synthetic report")
+    parser.add_argument("--pages", type=int, default=None, help="Pages of the synthetic report")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (the fastest is kept)")
+    parser.add_argument("--case", dest="cases", action="append", choices=CASES,
+                        help="Case to run (repeatable; all by default)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as the baseline")
+    parser.add_argument("--compare", action="store_true",
+                        help="Exit with status 1 if a case regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed relative regression (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.cases or CASES, args.rows, args.pages, args.repeat)
+
+    baseline = None
+    if args.baseline.exists():
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(results, baseline))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if baseline is None:
+            print(f"No baseline found at {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
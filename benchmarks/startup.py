@@ -0,0 +1,112 @@
+"""
+Startup time of the command line.
+
+Runs ``free-float-extractor --help`` in fresh interpreters and checks the
+median wall time against a budget, so scheduled jobs on slow NAS CPUs do
+not pay for importing pandas, pdfplumber or watchdog before doing any work:
+
+    python -m benchmarks.startup --budget 0.3
+
+With --imports the slowest imports of one run are listed, as reported by
+``python -X importtime``.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Seconds the command line may take to print its help
+DEFAULT_BUDGET = 0.3
+
+# Modules that must not be imported before the first file is processed
+HEAVY_MODULES = ("pandas", "numpy", "pdfplumber", "pdfminer", "watchdog", "openpyxl", "pyarrow")
+
+COMMAND = [sys.executable, "-m", "csd_bg_free_float_extractor", "--help"]
+
+
+def measure_startup(runs=5):
+    """
+    Time the command line printing its help.
+
+    Args:
+        runs (int, optional): Number of fresh interpreters to start
+
+    Returns:
+        list: Wall time of each run in seconds
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(COMMAND, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def heavy_imports():
+    """
+    Find the heavy modules imported by parsing the command-line arguments.
+
+    Returns:
+        list: Names of the heavy modules that were imported
+    """
+    code = (
+        "import sys\n"
+        "from csd_bg_free_float_extractor.cli import parse_arguments\n"
+        "parse_arguments(['--input', 'in', '--output', 'out'])\n"
+        f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return output.stdout.split()
+
+
+def slowest_imports(count=15):
+    """
+    List the slowest imports of one run, including the time of their own imports.
+
+    Args:
+        count (int, optional): Number of imports to list
+
+    Returns:
+        list: (cumulative microseconds, module name) from the slowest
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime"] + COMMAND[1:],
+                            capture_output=True, text=True)
+    imports = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure the startup time of the command line.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs (the median is kept)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help=f"Allowed median startup time in seconds (default: {DEFAULT_BUDGET})")
+    parser.add_argument("--imports", action="store_true", help="List the slowest imports")
+    args = parser.parse_args()
+
+    times = measure_startup(args.runs)
+    median = statistics.median(times)
+    print(f"startup: median {median:.3f}s, min {min(times):.3f}s, budget {args.budget:.3f}s")
+
+    heavy = heavy_imports()
+    if heavy:
+        print(f"heavy modules imported at startup: {', '.join(heavy)}")
+
+    if args.imports:
+        for cumulative, name in slowest_imports():
+            print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+    return 1 if median > args.budget or heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Micro-benchmarks of splitting a row into its fields.
+
+Compares the per-row cost of PATTERN_ROW with the right-anchored tokenizer
+the parser tries first, and of split_row (tokenizer with the regex as
+fallback), on realistic rows and on adversarial ones: long company names
+full of digits and BG substrings, and rows that match neither.
+
+    python -m benchmarks.tokenizer --rows 2000
+
+Every input is also checked to give the same fields with split_row as with
+the regex alone; a difference fails the run.
+"""
+
+import argparse
+import sys
+import timeit
+
+from csd_bg_free_float_extractor.constants import PATTERN_ROW
+from csd_bg_free_float_extractor.extractor.parser import _normalize_row, _tokenize_row, split_row
+
+from .generate import synthetic_rows
+
+
+def _regex_split(row_data):
+    """
+    Split a row with PATTERN_ROW only, as the parser did before the tokenizer.
+
+    Args:
+        row_data (str): Row data without line breaks
+
+    Returns:
+        tuple: Fields with the company name stripped, or None if the row does not match
+    """
+    match = PATTERN_ROW.match(row_data)
+    if match is None:
+        return None
+    company, code, total_shares, free_float, shareholders = match.groups()
+    return company.strip(), code, total_shares, free_float, shareholders
+
+
+def realistic_rows(rows):
+    """
+    Build single-line rows as parse_row receives them from a table.
+
+    Args:
+        rows (int): Number of rows
+
+    Returns:
+        list: Row strings
+    """
+    return [" ".join(str(value) for value in row) for row in synthetic_rows(rows)]
+
+
+def wrapped_rows(rows):
+    """
+    Build rows whose company name wraps onto a second line, reassembled as the parser does.
+
+    Args:
+        rows (int): Number of rows
+
+    Returns:
+        list: Row strings without line breaks
+    """
+    result = []
+    for company, code, total, free_float, shareholders in synthetic_rows(rows):
+        head, _, tail = company.partition(" ")
+        result.append(_normalize_row(f"{head} {code} {total} {free_float} {shareholders}\n{tail}"))
+    return result
+
+
+def adversarial_rows(rows):
+    """
+    Build valid rows with long company names full of digits and BG substrings.
+
+    Args:
+        rows (int): Number of rows
+
+    Returns:
+        list: Row strings
+    """
+    result = []
+    for i, (company, code, total, free_float, shareholders) in enumerate(synthetic_rows(rows)):
+        noise = " ".join(f"BG{i % 97} 2024 {j} BGN" for j in range(12))
+        result.append(
+            f"{company} {noise} BG ХОЛДИНГ {i} {code} {total} {free_float} {shareholders}"
+        )
+    return result
+
+
+def rejected_rows(rows):
+    """
+    Build rows that match neither the tokenizer nor the regex.
+
+    Args:
+        rows (int): Number of rows
+
+    Returns:
+        list: Row strings: missing counts, trailing text, a code without a company
+            and long runs of BG codes and numbers never ending in three counts
+    """
+    result = []
+    for i, (company, code, total, free_float, shareholders) in enumerate(synthetic_rows(rows)):
+        variant = i % 4
+        if variant == 0:
+            result.append(f"{company} {code} {total} {free_float}")
+        elif variant == 1:
+            result.append(f"{company} {code} {total} {free_float} {shareholders} АД")
+        elif variant == 2:
+            result.append(f"{code} {total} {free_float} {shareholders}")
+        else:
+            result.append(company + f" {code} {total} {free_float}" * 20 + " -")
+    return result
+
+
+INPUTS = {
+    "realistic": realistic_rows,
+    "wrapped": wrapped_rows,
+    "adversarial": adversarial_rows,
+    "rejected": rejected_rows,
+}
+
+SPLITTERS = {
+    "regex": _regex_split,
+    "tokenizer": _tokenize_row,
+    "split_row": split_row,
+}
+
+
+def check_identical(texts):
+    """
+    Find the rows that split_row splits differently from the regex.
+
+    Args:
+        texts (list): Row strings
+
+    Returns:
+        list: Rows with different fields
+    """
+    return [text for text in texts if split_row(text) != _regex_split(text)]
+
+
+def measure(texts, function, repeat=5):
+    """
+    Time a splitter on rows.
+
+    Args:
+        texts (list): Row strings
+        function (callable): Splitter called with each row
+        repeat (int, optional): Number of runs; the fastest is kept
+
+    Returns:
+        float: Seconds per row of the fastest run
+    """
+    best = min(timeit.repeat(lambda: [function(text) for text in texts], number=1, repeat=repeat))
+    return best / len(texts)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Measure the per-row cost of splitting rows into fields."
+    )
+    parser.add_argument("--rows", type=int, default=2000, help="Number of rows of each input")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of runs (the fastest is kept)")
+    args = parser.parse_args()
+
+    print(f"{'input':<12}" + "".join(f"{name:>12}" for name in SPLITTERS) + f"{'speedup':>10}")
+    mismatches = 0
+    for input_name, build in INPUTS.items():
+        texts = build(args.rows)
+        mismatches += len(check_identical(texts))
+        costs = {
+            name: measure(texts, function, args.repeat) for name, function in SPLITTERS.items()
+        }
+        print(f"{input_name:<12}"
+              + "".join(f"{costs[name] * 1e6:>9.2f} us" for name in SPLITTERS)
+              + f"{costs['regex'] / costs['split_row']:>9.2f}x")
+
+    if mismatches:
+        print(f"split_row differs from the regex on {mismatches} rows")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
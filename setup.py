@@ -15,7 +15,8 @@ Features:
 - Extracts company data from standardized Bulgarian PDF files
 - Identifies and extracts the date from the introductory text
 - Parses tabular data into structured format
-- Exports the data to CSV files named after the extracted date
+- Exports the data to CSV files named after the extracted date, optionally
+  also to Parquet, Arrow or Excel
 - Provides detailed error logging (only when errors occur)
 - Watches for new or modified PDF files in the input directory
 - Supports custom input and output directories
@@ -50,12 +51,20 @@ setup(
     ],
     # Development dependencies
     extras_require={
+        # Parquet and Arrow output
+        "parquet": [
+            "pyarrow>=8.0.0",
+        ],
         "dev": [
             "setuptools>=42",
             "wheel",
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
         ],
+        # Synthetic report generator for benchmarks and end-to-end tests
+        "bench": [
+            "reportlab>=3.6.0",
+        ],
     },
     entry_points={
         'console_scripts': [
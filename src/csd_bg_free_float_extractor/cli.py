@@ -1,22 +1,49 @@
 """
 Command-line interface functions for Bulgarian PDF extractor.
+
+The processor, the history index and watchdog are imported by the functions
+that use them, so parsing the arguments (and --help) does not wait for
+pandas, pdfplumber or watchdog to be imported.
 """
 
 import argparse
 import logging
+import signal
+import sys
+import threading
 import time
 
-from watchdog.observers import Observer
-
-from .extractor.processor import PDFProcessor
+from .constants import DEFAULT_QUIET_PERIOD, DEFAULT_RETRIES, DEFAULT_RETRY_BACKOFF
+from .extractor.metrics import MetricsExporter
+from .extractor.parser import BACKEND_CHOICES
+from .extractor.scheduler import ORDER_NEWEST, ORDERS
 from .extractor.utils import setup_logger
-from .watcher.handler import PdfFileHandler
+from .extractor.writers import DEFAULT_FORMATS, FORMATS, parse_formats
+
+
+def _formats_argument(value):
+    """
+    Convert the --formats option to a tuple of output formats.
+
+    Args:
+        value (str): Comma separated format names
+
+    Returns:
+        tuple: Output format names
+    """
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 
-def parse_arguments():
+def parse_arguments(argv=None):
     """
     Parse command-line arguments.
 
+    Args:
+        argv (list, optional): Arguments to parse; sys.argv by default
+
     Returns:
         argparse.Namespace: Parsed arguments
     """
@@ -26,23 +53,237 @@ def parse_arguments():
     parser.add_argument("--watch", "-w", action="store_true", help="Watch for new PDF files")
     parser.add_argument("--process", "-p", action="store_true", help="Process existing PDF files")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes for processing existing files "
+                             "(0 = use all CPUs)")
+    parser.add_argument("--page-jobs", type=int, default=1,
+                        help="Number of worker processes sharing the pages of a single PDF "
+                             "(0 = use all CPUs)")
+    parser.add_argument("--backend", choices=BACKEND_CHOICES, default="pdfplumber",
+                        help="Extraction backend: pdfplumber, pdfminer (faster, falls back to "
+                             "pdfplumber) or compare (reports differences between both)")
+    parser.add_argument("--no-templates", dest="templates", action="store_false",
+                        help="Detect the table on every page instead of reusing the learned "
+                             "table geometry")
+    parser.add_argument("--no-history", dest="history", action="store_false",
+                        help="Do not store the extracted rows in the history database")
+    parser.add_argument("--no-deltas", dest="deltas", action="store_false",
+                        help="Do not write the changes of each report against the previous one")
+    parser.add_argument("--formats", type=_formats_argument, default=DEFAULT_FORMATS,
+                        help="Comma separated output formats: " + ", ".join(FORMATS) +
+                             f" (default: {','.join(DEFAULT_FORMATS)})")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="Reprocess PDF files even if they are unchanged since the last run")
+    parser.add_argument("--quiet-period", type=float, default=DEFAULT_QUIET_PERIOD,
+                        help="Seconds a watched PDF must stay unchanged before it is processed "
+                             f"(default: {DEFAULT_QUIET_PERIOD})")
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="Watch by scanning the input directory every N seconds instead of "
+                             "relying on file system events (for SMB/NFS shares)")
+    parser.add_argument("--no-background-writes", dest="background_writes", action="store_false",
+                        help="Write each file's outputs before parsing the next one instead of "
+                             "in a background thread")
+    parser.add_argument("--recursive", "-r", action="store_true",
+                        help="Also process and watch PDF files in subdirectories of the input "
+                             "directory, e.g. year/month folders")
+    parser.add_argument("--order", choices=ORDERS, default=ORDER_NEWEST,
+                        help="Processing order of existing files by report date: newest first, "
+                             "oldest first or by file name (default: newest)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds the extraction of one PDF may take; each PDF is then "
+                             "extracted in an isolated worker process that is killed on overrun")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="Megabytes of memory the worker extracting one PDF may use; "
+                             "implies isolated worker processes like --timeout")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Times a PDF killed for exceeding a limit is retried before it is "
+                             f"moved to the failed directory (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--retry-backoff", type=float, default=DEFAULT_RETRY_BACKOFF,
+                        help="Seconds before the first retry, doubled for each further retry "
+                             f"(default: {DEFAULT_RETRY_BACKOFF:g})")
+    parser.add_argument("--strict", action="store_true",
+                        help="Reject a PDF whose rows fail validation (free float above total "
+                             "shares, invalid ISIN check digit, duplicate emission code) instead "
+                             "of only logging the violations")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream rows page by page to the CSV output in near-constant memory "
+                             "(CSV output only; no table templates or pdfminer backend)")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="Directory for a JSON summary of the stage timings and counters "
+                             "of each processed file")
+    parser.add_argument("--metrics-textfile", default=None,
+                        help="Prometheus textfile (*.prom) updated after each processed file, "
+                             "for the node_exporter textfile collector")
+
+    return parser.parse_args(argv)
+
+
+def parse_query_arguments(argv=None):
+    """
+    Parse the arguments of the query subcommand.
+
+    Args:
+        argv (list, optional): Arguments following "query"
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="free-float-extractor query",
+        description="Query the free float history of emissions."
+    )
+    parser.add_argument("--output", "-o", required=True,
+                        help="Output directory holding the history database")
+    parser.add_argument("--code", "-c", dest="codes", action="append",
+                        help="Emission code (repeatable)")
+    parser.add_argument("--company", dest="companies", action="append",
+                        help="Part of a company name, case-insensitive (repeatable)")
+    parser.add_argument("--from", dest="start", help="First report date (DD-MM-YYYY or YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="Last report date (DD-MM-YYYY or YYYY-MM-DD)")
+    parser.add_argument("--as-of",
+                        help="Return the report in effect on this date instead of a history")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="Output format")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+
+    return parser.parse_args(argv)
+
+
+def parse_serve_arguments(argv=None):
+    """
+    Parse the arguments of the serve subcommand.
+
+    Args:
+        argv (list, optional): Arguments following "serve"
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    from .extractor.server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD, DEFAULT_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="free-float-extractor serve",
+        description="Extract PDF files uploaded over HTTP."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of warm worker processes extracting uploads "
+                             "(0 = use all CPUs)")
+    parser.add_argument("--backend", choices=BACKEND_CHOICES, default="pdfplumber",
+                        help="Extraction backend: pdfplumber, pdfminer (faster, falls back to "
+                             "pdfplumber) or compare (reports differences between both)")
+    parser.add_argument("--max-upload-mb", type=float, default=DEFAULT_MAX_UPLOAD / 1024 / 1024,
+                        help="Largest accepted upload in megabytes")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+
+    return parser.parse_args(argv)
+
+
+def run_server(args):
+    """
+    Run the HTTP extraction service until interrupted.
+
+    Args:
+        args (argparse.Namespace): Parsed serve arguments
 
-    return parser.parse_args()
+    Returns:
+        int: Exit code
+    """
+    from .extractor.server import ExtractionServer
+
+    logger = setup_logger(
+        "csd_bg_free_float_extractor", logging.DEBUG if args.verbose else logging.INFO
+    )
+    server = ExtractionServer(
+        args.host,
+        args.port,
+        jobs=args.jobs,
+        backend=args.backend,
+        max_upload=int(args.max_upload_mb * 1024 * 1024),
+        logger=logger
+    )
+    try:
+        server.start()
+    except OSError as e:
+        server.close()
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    server.serve_forever()
+    return 0
+
+
+def run_query(args):
+    """
+    Run a history query and print the result to standard output.
 
+    Args:
+        args (argparse.Namespace): Parsed query arguments
 
-def run_watcher(processor):
+    Returns:
+        int: Exit code
+    """
+    from .extractor.query import HistoryIndex
+
+    logger = setup_logger(
+        "csd_bg_free_float_extractor", logging.DEBUG if args.verbose else logging.WARNING
+    )
+
+    try:
+        index = HistoryIndex.open(args.output, logger)
+        if args.as_of:
+            df = index.snapshot(args.as_of, codes=args.codes, companies=args.companies)
+        else:
+            df = index.history(
+                codes=args.codes, companies=args.companies, start=args.start, end=args.end
+            )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.format == "json":
+        print(df.to_json(orient="records", force_ascii=False))
+    else:
+        print(df.to_csv(index=False), end="")
+    return 0
+
+
+def run_watcher(processor, quiet_period=DEFAULT_QUIET_PERIOD, poll_interval=None, backfill=False):
     """
     Set up and run the file system watcher.
 
+    Watched files are processed by a scheduler, which takes them ahead of the
+    existing files queued as backfill. With more than one job the backfill
+    runs in the processor's worker processes instead, see _start_backfill.
+
     Args:
         processor (PDFProcessor): Processor for PDF files
+        quiet_period (float, optional): Seconds a PDF must stay unchanged before processing
+        poll_interval (float, optional): Scan the directory every N seconds instead of
+            using file system events
+        backfill (bool, optional): Also process the existing PDF files while watching
     """
-    event_handler = PdfFileHandler(processor)
+    scheduler = processor.create_scheduler()
+    scheduler.start()
+
+    if poll_interval:
+        run_polling_watcher(processor, quiet_period, poll_interval, scheduler, backfill)
+        return
+
+    from watchdog.observers import Observer
+
+    from .watcher.handler import PdfFileHandler
+
+    event_handler = PdfFileHandler(processor, quiet_period, callback=scheduler.submit_live)
+    event_handler.start()
     observer = Observer()
-    observer.schedule(event_handler, str(processor.input_dir), recursive=False)
+    observer.schedule(event_handler, str(processor.input_dir), recursive=processor.recursive)
     observer.start()
 
     processor.logger.info(f"Watching directory {processor.input_dir} for PDF changes...")
+    if backfill:
+        _start_backfill(processor, scheduler)
 
     try:
         while True:
@@ -50,26 +291,159 @@ def run_watcher(processor):
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    event_handler.stop()
+    scheduler.stop()
+    # A backfill running in the background may have unsaved progress
+    processor.manifest.flush()
+
+
+def run_polling_watcher(processor, quiet_period, poll_interval, scheduler, backfill=False):
+    """
+    Set up and run the polling directory scanner.
+
+    Args:
+        processor (PDFProcessor): Processor for PDF files
+        quiet_period (float): Seconds a PDF must stay unchanged before processing
+        poll_interval (float): Seconds between two scans
+        scheduler (WorkScheduler): Started scheduler processing the files
+        backfill (bool, optional): Also process the existing PDF files while polling
+    """
+    from .watcher.poller import PollingScanner
+
+    scanner = PollingScanner(processor, poll_interval, quiet_period, callback=scheduler.submit_live,
+                             recursive=processor.recursive)
+    scanner.start()
+
+    processor.logger.info(
+        f"Polling directory {processor.input_dir} every {poll_interval}s for PDF changes..."
+    )
+    if backfill:
+        _start_backfill(processor, scheduler)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    scanner.stop()
+    scheduler.stop()
+    processor.manifest.flush()
 
 
-def main():
-    """Main command-line entry point."""
-    args = parse_arguments()
+def _start_backfill(processor, scheduler):
+    """
+    Process the existing PDF files without delaying the watched ones.
+
+    With one job the files are queued on the scheduler behind the watched
+    ones. With more jobs process_directory runs them in its worker processes
+    on a background thread, while the scheduler processes the watched files
+    in this process.
+
+    Args:
+        processor (PDFProcessor): Processor for PDF files
+        scheduler (WorkScheduler): Started scheduler processing the watched files
+    """
+    if processor.jobs > 1:
+        thread = threading.Thread(
+            target=_run_backfill, args=(processor,), name="pdf-backfill", daemon=True
+        )
+        thread.start()
+        processor.logger.info(
+            f"Processing the existing PDFs with {processor.jobs} workers while watching"
+        )
+        return
+
+    count = scheduler.submit_backfill(processor.discover_pdfs())
+    processor.logger.info(f"Queued {count} existing PDFs behind the watched ones")
+
+
+def _run_backfill(processor):
+    """
+    Process the existing PDF files in the background, logging unexpected errors.
+
+    Args:
+        processor (PDFProcessor): Processor for PDF files
+    """
+    try:
+        processor.process_directory()
+    except Exception as e:
+        processor.logger.error(f"Error processing the existing PDFs: {str(e)}")
+
+
+def _interrupt(signum, frame):
+    """Stop on SIGTERM as on Ctrl+C, so a run saves its progress before exiting."""
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    """
+    Main command-line entry point.
+
+    Args:
+        argv (list, optional): Command-line arguments; sys.argv by default
+
+    Returns:
+        int: Exit code
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["query"]:
+        return run_query(parse_query_arguments(argv[1:]))
+    if argv[:1] == ["serve"]:
+        return run_server(parse_serve_arguments(argv[1:]))
+
+    args = parse_arguments(argv)
 
     # Set up logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logger = setup_logger("csd_bg_free_float_extractor", log_level)
 
+    # Export per-file timings and counters if requested
+    metrics_hooks = []
+    if args.metrics_dir or args.metrics_textfile:
+        metrics_hooks.append(MetricsExporter(args.metrics_dir, args.metrics_textfile, logger))
+
     # Create the processor
-    processor = PDFProcessor(args.input, args.output, logger)
+    from .extractor.processor import PDFProcessor
 
-    # Process existing files if requested
-    if args.process:
-        processor.process_directory()
+    try:
+        processor = PDFProcessor(
+            args.input,
+            args.output,
+            logger,
+            jobs=args.jobs,
+            force=args.force,
+            page_jobs=args.page_jobs,
+            backend=args.backend,
+            templates=args.templates,
+            formats=args.formats,
+            history=args.history,
+            deltas=args.deltas,
+            metrics_hooks=metrics_hooks,
+            streaming=args.stream,
+            background_writes=args.background_writes,
+            recursive=args.recursive,
+            order=args.order,
+            timeout=args.timeout,
+            max_rss_mb=args.max_rss_mb,
+            retries=args.retries,
+            retry_backoff=args.retry_backoff,
+            strict=args.strict
+        )
+    except (ValueError, ImportError) as e:
+        # Conflicting options, such as --stream with --strict, or a format missing its dependency
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    # A stopped container or service sends SIGTERM; unwind so the manifest is saved
+    signal.signal(signal.SIGTERM, _interrupt)
 
-    # Watch for new files if requested
+    # Watch for new files if requested, processing the existing ones in the
+    # background so new files do not wait for them
     if args.watch:
-        run_watcher(processor)
+        run_watcher(processor, args.quiet_period, args.poll_interval, backfill=args.process)
+    elif args.process:
+        processor.process_directory()
 
     # If neither --watch nor --process specified, process existing by default
     if not args.process and not args.watch:
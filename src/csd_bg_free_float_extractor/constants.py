@@ -14,5 +14,36 @@ PATTERN_EMITENT_COUNT = re.compile(r'(\d+)\s+Брой\s+емитенти')
 # Header text indicator
 HEADER_TEXT = "Фрий флoут на публичните дружества регистрирани в Централен Депозитар към дата:"
 
+# Fraction of the first page height (from the top) that holds the header with the date
+HEADER_STRIP_RATIO = 0.25
+
 # CSV column names
-CSV_COLUMNS = ["Company", "Emission Code", "Total Shares", "Free Float", "Shareholders"]
\ No newline at end of file
+CSV_COLUMNS = ["Company", "Emission Code", "Total Shares", "Free Float", "Shareholders"]
+
+# Manifest of processed input files, stored in the output directory
+MANIFEST_FILENAME = ".manifest.json"
+
+# Seconds a watched file must stay unchanged before it is processed
+DEFAULT_QUIET_PERIOD = 2.0
+
+# Index of file sizes and modification times kept by the polling scanner
+SCAN_INDEX_FILENAME = ".scan-index.json"
+
+# Learned table templates, stored in the output directory
+TEMPLATES_FILENAME = ".table-templates.json"
+
+# Consolidated history of all extracted reports, stored in the output directory
+HISTORY_FILENAME = "history.sqlite"
+
+# Memory-mapped query index derived from the history database
+HISTORY_INDEX_FILENAME = ".history-index.json"
+
+# Directory in the output directory holding PDFs that kept exceeding the extraction limits
+FAILED_DIRNAME = "failed"
+
+# Hidden directory in the output directory holding the lock file of each report date
+LOCKS_DIRNAME = ".locks"
+
+# Retries of a PDF killed for exceeding a limit, and seconds before the first retry
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 30.0
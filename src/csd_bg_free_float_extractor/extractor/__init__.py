@@ -1,16 +1,60 @@
 """
 PDF extraction module for Bulgarian market data.
+
+The public names are imported from their submodules on first access, so
+importing a light submodule such as writers or metrics does not pull in
+pandas and pdfplumber.
 """
 
-from .parser import PDFParser, parse_row, extract_date_from_text
-from .processor import PDFProcessor, LogHandler
-from .utils import setup_logger
-
-__all__ = [
-    'PDFParser',
-    'parse_row',
-    'extract_date_from_text',
-    'PDFProcessor',
-    'LogHandler',
-    'setup_logger'
-]
\ No newline at end of file
+import importlib
+
+# Submodule defining each public name
+_EXPORTS = {
+    'PDFParser': 'parser',
+    'parse_row': 'parser',
+    'extract_date_from_text': 'parser',
+    'open_document': 'backends',
+    'PDFProcessor': 'processor',
+    'LogHandler': 'processor',
+    'Manifest': 'manifest',
+    'FileMetrics': 'metrics',
+    'MetricsExporter': 'metrics',
+    'RowDiagnostics': 'diagnostics',
+    'validate_frame': 'validation',
+    'HistoryStore': 'history',
+    'HistoryIndex': 'query',
+    'ExtractionServer': 'server',
+    'DeltaTracker': 'deltas',
+    'compute_delta': 'deltas',
+    'setup_logger': 'utils',
+    'write_outputs': 'writers'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Import a public name from its submodule on first access.
+
+    Args:
+        name (str): Attribute name
+
+    Returns:
+        object: The public class or function
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    List the module attributes, including the public names not imported yet.
+
+    Returns:
+        list: Attribute names
+    """
+    return sorted(list(globals()) + __all__)
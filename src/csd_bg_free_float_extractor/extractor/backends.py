@@ -0,0 +1,347 @@
+"""
+Extraction backends that open PDF documents for the parser.
+
+Each backend opens a document whose pages provide ``width``, ``height``,
+``crop()``, ``extract_table()`` and ``extract_text()``, so the parser can use
+them interchangeably:
+
+- ``pdfplumber``: pdfplumber's table detection from ruling lines and edges.
+- ``pdfminer``: character boxes read directly from pdfminer.six, grouped into
+  words, lines and the five report columns by their coordinates.
+
+pdfplumber and pdfminer.six are imported when the first document is opened,
+so importing this module does not slow down the start of the command line.
+"""
+
+from ..constants import PATTERN_EMITENT_COUNT
+
+# Names of the available backends
+BACKEND_PDFPLUMBER = "pdfplumber"
+BACKEND_PDFMINER = "pdfminer"
+BACKENDS = (BACKEND_PDFPLUMBER, BACKEND_PDFMINER)
+
+# Maximum horizontal gap (in points) between two characters of the same word
+X_TOLERANCE = 3
+# Maximum vertical offset (in points) between characters of the same line
+Y_TOLERANCE = 3
+# Maximum gap, in line heights, between a company name line and its continuation
+CONTINUATION_GAP = 1.5
+
+# Text identifying the page title and column header lines
+HEADER_MARKERS = ["Емитент", "Емисия", "Фрий флoут", "към дата"]
+
+
+class Word:
+    """A word and its bounding box, with top/bottom measured from the top of the page."""
+
+    __slots__ = ("text", "x0", "x1", "top", "bottom")
+
+    def __init__(self, text, x0, x1, top, bottom):
+        self.text = text
+        self.x0 = x0
+        self.x1 = x1
+        self.top = top
+        self.bottom = bottom
+
+
+def group_lines(chars):
+    """
+    Group characters into lines of words by their coordinates.
+
+    Args:
+        chars (list): (text, x0, x1, top, bottom) tuples
+
+    Returns:
+        list: Lines from top to bottom, each a list of Words from left to right
+    """
+    lines = []
+    line = []
+    line_top = None
+    for char in sorted(chars, key=lambda c: (c[3], c[1])):
+        if line and char[3] - line_top > Y_TOLERANCE:
+            lines.append(line)
+            line = []
+        if not line:
+            line_top = char[3]
+        line.append(char)
+    if line:
+        lines.append(line)
+
+    return [_group_words(sorted(line, key=lambda c: c[1])) for line in lines]
+
+
+def _group_words(line_chars):
+    """
+    Split the characters of one line into words on spaces and horizontal gaps.
+
+    Args:
+        line_chars (list): Characters of a line sorted from left to right
+
+    Returns:
+        list: Words of the line
+    """
+    words = []
+    current = None
+    for text, x0, x1, top, bottom in line_chars:
+        if text.isspace():
+            current = None
+            continue
+        if current is not None and x0 - current.x1 <= X_TOLERANCE:
+            current.text += text
+            current.x1 = max(current.x1, x1)
+            current.top = min(current.top, top)
+            current.bottom = max(current.bottom, bottom)
+        else:
+            current = Word(text, x0, x1, top, bottom)
+            words.append(current)
+    return words
+
+
+def _emission_code_index(words):
+    """
+    Find the emission code among the words of a line.
+
+    The code is normally the fourth word from the right, followed by the three
+    numeric columns; otherwise the last word starting with "BG" is used.
+
+    Args:
+        words (list): Words of the line
+
+    Returns:
+        int: Index of the emission code or None if the line has none
+    """
+    if len(words) >= 5 and words[-4].text.startswith("BG"):
+        return len(words) - 4
+    for index in range(len(words) - 1, -1, -1):
+        if words[index].text.startswith("BG"):
+            return index
+    return None
+
+
+def rows_from_lines(lines):
+    """
+    Build table rows in the shape returned by pdfplumber's extract_table().
+
+    Lines holding an emission code start a row of company, code and numeric
+    cells. Lines entirely left of the code column that follow a row closely
+    continue its company name. Footer lines with the emitent count become
+    single-cell rows; title and header lines are dropped.
+
+    Args:
+        lines (list): Lines of Words from group_lines
+
+    Returns:
+        list: Rows as lists of cell strings, or None if no rows were found
+    """
+    rows = []
+    current = None
+    for words in lines:
+        if not words:
+            continue
+        text = " ".join(word.text for word in words)
+
+        if any(marker in text for marker in HEADER_MARKERS):
+            current = None
+            continue
+
+        if PATTERN_EMITENT_COUNT.search(text):
+            rows.append([text])
+            current = None
+            continue
+
+        code_index = _emission_code_index(words)
+        if code_index is not None:
+            company = " ".join(word.text for word in words[:code_index])
+            row = [company or None] + [word.text for word in words[code_index:]]
+            rows.append(row)
+            height = max(word.bottom - word.top for word in words)
+            current = (row, words[code_index].x0, max(word.bottom for word in words), height)
+            continue
+
+        if current:
+            row, code_x0, bottom, height = current
+            if words[-1].x1 <= code_x0 and words[0].top - bottom <= CONTINUATION_GAP * height:
+                row[0] = f"{row[0]}\n{text}" if row[0] else text
+                current = (row, code_x0, max(word.bottom for word in words), height)
+
+    return rows or None
+
+
+class PdfminerPage:
+    """Page of a document opened with the pdfminer backend."""
+
+    def __init__(self, document, page, page_number, bbox=None, chars=None):
+        """
+        Initialize the page.
+
+        Args:
+            document (PdfminerDocument): Document the page belongs to
+            page (pdfminer.pdfpage.PDFPage): pdfminer page
+            page_number (int): Page number (1-based)
+            bbox (tuple, optional): Crop box (x0, top, x1, bottom) of a cropped view
+            chars (list, optional): Characters of the parent page for a cropped view
+        """
+        self.document = document
+        self.page = page
+        self.page_number = page_number
+        x0, y0, x1, y1 = page.mediabox
+        self.width = x1 - x0
+        self.height = y1 - y0
+        self.bbox = bbox
+        self._chars = chars
+
+    @property
+    def chars(self):
+        """
+        Characters of the page, interpreted on first access.
+
+        Returns:
+            list: (text, x0, x1, top, bottom) tuples
+        """
+        if self._chars is None:
+            layout = self.document.render(self.page)
+            page_top = layout.y1
+            self._chars = [
+                (obj.get_text(), obj.x0, obj.x1, page_top - obj.y1, page_top - obj.y0)
+                for obj in _iter_chars(layout)
+            ]
+        return self._chars
+
+    def crop(self, bbox):
+        """
+        Get a view of the characters whose centre lies within a bounding box.
+
+        Args:
+            bbox (tuple): (x0, top, x1, bottom) in points
+
+        Returns:
+            PdfminerPage: Cropped page
+        """
+        x0, top, x1, bottom = bbox
+        chars = [c for c in self.chars
+                 if x0 <= (c[1] + c[2]) / 2 <= x1 and top <= (c[3] + c[4]) / 2 <= bottom]
+        return PdfminerPage(self.document, self.page, self.page_number, bbox, chars)
+
+    def extract_text(self):
+        """
+        Extract the text of the page, one line per text line.
+
+        Returns:
+            str: Page text
+        """
+        return "\n".join(" ".join(word.text for word in words) for words in group_lines(self.chars))
+
+    def extract_table(self):
+        """
+        Extract the report table from the character positions.
+
+        Returns:
+            list: Rows as lists of cell strings, or None if no rows were found
+        """
+        return rows_from_lines(group_lines(self.chars))
+
+    def close(self):
+        """Release the characters of the page."""
+        self._chars = None
+
+
+def _iter_chars(layout):
+    """
+    Iterate over all characters of a layout, including those nested in figures.
+
+    Args:
+        layout (pdfminer.layout.LTContainer): Layout object
+
+    Yields:
+        LTChar: Characters of the layout
+    """
+    from pdfminer.layout import LTChar, LTContainer
+
+    for obj in layout:
+        if isinstance(obj, LTChar):
+            yield obj
+        elif isinstance(obj, LTContainer):
+            yield from _iter_chars(obj)
+
+
+class PdfminerDocument:
+    """Document opened with the pdfminer backend."""
+
+    def __init__(self, pdf_file, pages=None):
+        """
+        Open the document.
+
+        Args:
+            pdf_file (str, Path or file object): PDF file to open
+            pages (list, optional): Page numbers (1-based) to include; all pages by default
+        """
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser as PDFMinerParser
+
+        if hasattr(pdf_file, "read"):
+            self._stream = pdf_file
+            self._owns_stream = False
+        else:
+            self._stream = open(pdf_file, "rb")
+            self._owns_stream = True
+
+        document = PDFDocument(PDFMinerParser(self._stream))
+        resource_manager = PDFResourceManager(caching=True)
+        # No layout analysis: the raw characters are grouped by the backend itself
+        self._device = PDFPageAggregator(resource_manager, laparams=None)
+        self._interpreter = PDFPageInterpreter(resource_manager, self._device)
+
+        wanted = set(pages) if pages is not None else None
+        self.pages = [
+            PdfminerPage(self, page, number)
+            for number, page in enumerate(PDFPage.create_pages(document), 1)
+            if wanted is None or number in wanted
+        ]
+
+    def render(self, page):
+        """
+        Interpret a page without layout analysis.
+
+        Args:
+            page (pdfminer.pdfpage.PDFPage): pdfminer page
+
+        Returns:
+            pdfminer.layout.LTPage: Page layout holding the raw characters
+        """
+        self._interpreter.process_page(page)
+        return self._device.get_result()
+
+    def close(self):
+        """Close the underlying file if it was opened by the document."""
+        if self._owns_stream:
+            self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_document(pdf_file, backend=BACKEND_PDFPLUMBER, pages=None):
+    """
+    Open a PDF document with an extraction backend.
+
+    Args:
+        pdf_file (str, Path or file object): PDF file to open
+        backend (str, optional): Name of the backend
+        pages (list, optional): Page numbers (1-based) to include; all pages by default
+
+    Returns:
+        Document usable as a context manager, with a list of pages
+    """
+    if backend == BACKEND_PDFMINER:
+        return PdfminerDocument(pdf_file, pages=pages)
+    if backend == BACKEND_PDFPLUMBER:
+        import pdfplumber
+
+        return pdfplumber.open(pdf_file, pages=pages)
+    raise ValueError(f"Unknown extraction backend: {backend}")
@@ -0,0 +1,242 @@
+"""
+Day-over-day changes between consecutive reports.
+
+The delta of a report lists the emissions whose total shares, free float or
+number of shareholders changed since the previous report, and the emissions
+that were listed or delisted in between. It is written to
+``<date>.delta.csv`` next to the report's CSV file.
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from ..constants import CSV_COLUMNS
+from .history import iso_date
+from .writers import atomic_path
+
+# Kinds of change
+CHANGE_LISTED = "listed"
+CHANGE_DELISTED = "delisted"
+CHANGE_CHANGED = "changed"
+
+# Compared columns
+METRIC_COLUMNS = CSV_COLUMNS[2:]
+
+# Columns of a delta: emission, kind of change, then the previous value,
+# current value and difference of each metric
+DELTA_COLUMNS = ["Emission Code", "Company", "Change"] + [
+    column
+    for metric in METRIC_COLUMNS
+    for column in (f"Previous {metric}", metric, f"{metric} Change")
+]
+
+
+def compute_delta(previous, current):
+    """
+    Compare two reports by emission code.
+
+    Args:
+        previous (DataFrame): Earlier report with the CSV columns
+        current (DataFrame): Later report with the CSV columns
+
+    Returns:
+        DataFrame: Changed, listed and delisted emissions ordered by emission code
+    """
+    import numpy as np
+    import pandas as pd
+
+    company, code = CSV_COLUMNS[:2]
+    # Nullable integers keep exact values for emissions missing on one side
+    nullable = {metric: "Int64" for metric in METRIC_COLUMNS}
+    merged = previous.drop_duplicates(code, keep="last").astype(nullable).merge(
+        current.drop_duplicates(code, keep="last").astype(nullable),
+        on=code, how="outer", suffixes=(" Previous", ""), indicator=True, sort=True
+    )
+
+    side = merged["_merge"].to_numpy()
+    listed = side == "right_only"
+    delisted = side == "left_only"
+    changed = np.zeros(len(merged), dtype=bool)
+    for metric in METRIC_COLUMNS:
+        changed |= (
+            (merged[f"{metric} Previous"] != merged[metric]).fillna(False).to_numpy(dtype=bool)
+        )
+    changed &= ~(listed | delisted)
+
+    delta = pd.DataFrame({
+        code: merged[code],
+        company: merged[company].where(~delisted, merged[f"{company} Previous"]),
+        "Change": np.select([listed, delisted], [CHANGE_LISTED, CHANGE_DELISTED], CHANGE_CHANGED),
+    })
+    for metric in METRIC_COLUMNS:
+        before = merged[f"{metric} Previous"]
+        after = merged[metric]
+        delta[f"Previous {metric}"] = before
+        delta[metric] = after
+        delta[f"{metric} Change"] = after - before
+
+    return delta[listed | delisted | changed].reset_index(drop=True)
+
+
+def _file_date(report_date):
+    """
+    Get the date used in output file names.
+
+    Args:
+        report_date (str): Report date
+
+    Returns:
+        str: Date as DD-MM-YYYY
+    """
+    return datetime.strptime(iso_date(report_date), "%Y-%m-%d").strftime("%d-%m-%Y")
+
+
+class DeltaTracker:
+    """
+    Writes the delta of each new report against the report preceding it.
+
+    The reports are read from the history store. The latest report seen is
+    kept in memory, so the delta of the next daily report needs no read.
+    """
+
+    def __init__(self, history, output_dir, logger=None):
+        """
+        Initialize the tracker.
+
+        Args:
+            history (HistoryStore): Store holding all reports
+            output_dir (str or Path): Directory for the delta files
+            logger (Logger, optional): Logger instance
+        """
+        self.history = history
+        self.output_dir = Path(output_dir)
+        self.logger = logger or logging.getLogger(__name__)
+        # (ISO date, rows) of the latest report read or written
+        self._cached = None
+
+    def delta_path(self, report_date):
+        """
+        Get the path of the delta file of a report.
+
+        Args:
+            report_date (str): Report date
+
+        Returns:
+            Path: Path of the delta CSV file
+        """
+        return self.output_dir / f"{_file_date(report_date)}.delta.csv"
+
+    def _report(self, date):
+        """
+        Get the rows of a stored report, from the cache if possible.
+
+        Args:
+            date (str): ISO report date
+
+        Returns:
+            DataFrame: Rows of the report
+        """
+        if self._cached and self._cached[0] == date:
+            return self._cached[1]
+        return self.history.read_report(date)
+
+    def _remember(self, date, df):
+        """
+        Cache a report if it is the latest one seen.
+
+        Args:
+            date (str): ISO report date
+            df (DataFrame): Rows of the report
+        """
+        if self._cached is None or date >= self._cached[0]:
+            self._cached = (date, df)
+
+    def _write(self, date, previous, current):
+        """
+        Write the delta between two reports.
+
+        Args:
+            date (str): ISO date of the later report
+            previous (DataFrame): Earlier report
+            current (DataFrame): Later report
+
+        Returns:
+            Path: Path of the written delta file
+        """
+        path = self.delta_path(date)
+        delta = compute_delta(previous, current)
+        with atomic_path(path) as tmp_path:
+            delta.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        self.logger.info(f"Saved {len(delta)} changes to {path}")
+        return path
+
+    def update(self, report_date, df):
+        """
+        Write the deltas affected by a newly stored report.
+
+        The report's own delta is written against the report preceding it. If
+        an older report was processed late, the delta of the report following
+        it is written again as well.
+
+        Args:
+            report_date (str): Date of the report, already stored in the history
+            df (DataFrame): Rows of the report
+
+        Returns:
+            list: Paths of the written delta files
+        """
+        date = iso_date(report_date)
+        dates = self.history.report_dates()
+        position = dates.index(date)
+
+        written = []
+        if position > 0:
+            written.append(self._write(date, self._report(dates[position - 1]), df))
+        if position + 1 < len(dates):
+            following = dates[position + 1]
+            written.append(self._write(following, df, self._report(following)))
+
+        self._remember(date, df)
+        return written
+
+    def build_chain(self, dates=()):
+        """
+        Write the deltas of many reports in one pass over the stored dates.
+
+        Deltas are written for the given dates, for the reports following
+        them, and for every report whose delta file is missing. Each report is
+        read at most once.
+
+        Args:
+            dates (iterable, optional): Dates of newly stored reports
+
+        Returns:
+            list: Paths of the written delta files
+        """
+        stored = self.history.report_dates()
+        changed = {iso_date(date) for date in dates}
+
+        written = []
+        previous = None
+        for position, date in enumerate(stored):
+            needed = position > 0 and (
+                date in changed
+                or stored[position - 1] in changed
+                or not self.delta_path(date).exists()
+            )
+            if not needed:
+                previous = None
+                continue
+
+            if previous is None:
+                previous = self._report(stored[position - 1])
+            current = self._report(date)
+            written.append(self._write(date, previous, current))
+            previous = current
+
+        if stored:
+            last = stored[-1]
+            if previous is not None:
+                self._remember(last, previous)
+        return written
@@ -0,0 +1,164 @@
+"""
+Aggregated diagnostics of rows that could not be parsed.
+
+Instead of a warning per malformed row, the parser counts the rejected rows
+of a file by page and failure category, keeps every rejected row for a
+machine-readable rejects file and logs a single summary with a few sample
+rows per file.
+"""
+
+import json
+from collections import Counter
+
+from .writers import atomic_path
+
+# Failure categories of a rejected row
+CATEGORY_EMPTY = "empty"
+CATEGORY_NO_CODE = "missing_emission_code"
+CATEGORY_NUMBERS = "missing_numbers"
+CATEGORY_FORMAT = "unexpected_format"
+
+# Where a rejected row came from
+SOURCE_TABLE = "table"
+SOURCE_TEXT = "text"
+
+# Raw rows quoted in the summary of a file
+DEFAULT_SAMPLE_SIZE = 5
+
+# Rejects file of a PDF, written next to its outputs
+REJECTS_SUFFIX = ".rejects.jsonl"
+
+
+def classify_row(row_data):
+    """
+    Find out why a row did not match the row pattern.
+
+    Args:
+        row_data (str): Row data as passed to the parser
+
+    Returns:
+        str: Failure category
+    """
+    if not row_data or not isinstance(row_data, str) or not row_data.strip():
+        return CATEGORY_EMPTY
+
+    tokens = row_data.split()
+    if not any(token.startswith("BG") for token in tokens):
+        return CATEGORY_NO_CODE
+
+    trailing_numbers = 0
+    for token in reversed(tokens):
+        if not token.isdigit():
+            break
+        trailing_numbers += 1
+    if trailing_numbers < 3:
+        return CATEGORY_NUMBERS
+    return CATEGORY_FORMAT
+
+
+class RowDiagnostics:
+    """Rejected rows of one file, counted by page and failure category."""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        """
+        Initialize empty diagnostics.
+
+        Args:
+            sample_size (int, optional): Maximum number of raw rows quoted in the summary
+        """
+        self.sample_size = sample_size
+        self.counts = Counter()
+        self.rejects = []
+
+    def add(self, page_num, row_data, source=SOURCE_TABLE):
+        """
+        Record a rejected row.
+
+        Args:
+            page_num (int): Page number (1-based)
+            row_data (str): Row data that did not parse
+            source (str, optional): SOURCE_TABLE or SOURCE_TEXT
+
+        Returns:
+            str: Failure category of the row
+        """
+        category = classify_row(row_data)
+        self.counts[(page_num, category)] += 1
+        self.rejects.append({
+            "page": page_num,
+            "source": source,
+            "category": category,
+            "row": row_data if isinstance(row_data, str) else None
+        })
+        return category
+
+    def merge(self, other):
+        """
+        Add the rejected rows of another set of diagnostics, e.g. a kept extraction attempt.
+
+        Args:
+            other (RowDiagnostics): Diagnostics to add
+        """
+        self.counts.update(other.counts)
+        self.rejects.extend(other.rejects)
+
+    def table_rejects(self):
+        """
+        Count the rejected rows that came from a detected table.
+
+        Returns:
+            int: Number of rejected table rows
+        """
+        return sum(1 for reject in self.rejects if reject["source"] == SOURCE_TABLE)
+
+    def by_category(self):
+        """
+        Count the rejected rows per failure category.
+
+        Returns:
+            dict: Category -> number of rows
+        """
+        totals = Counter()
+        for (_, category), count in self.counts.items():
+            totals[category] += count
+        return dict(totals)
+
+    def summary(self, pdf_path):
+        """
+        Describe the rejected rows of a file in one message.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            str: Totals per category, counts per page and a sample of raw rows
+        """
+        categories = ", ".join(
+            f"{category} {count}" for category, count in sorted(self.by_category().items())
+        )
+        pages = "; ".join(
+            f"page {page_num}: {category} {count}"
+            for (page_num, category), count in sorted(self.counts.items())
+        )
+        sample = " | ".join(reject["row"] or "" for reject in self.rejects[:self.sample_size])
+        more = len(self.rejects) - self.sample_size
+        if more > 0:
+            sample += f" | ... {more} more"
+        return (f"Skipped {len(self.rejects)} rows of {pdf_path} due to unexpected format "
+                f"({categories}); {pages}; sample: {sample}")
+
+    def write_rejects(self, path):
+        """
+        Write every rejected row as a JSON line, for later reprocessing.
+
+        Args:
+            path (Path): Rejects file path
+
+        Returns:
+            Path: The written path
+        """
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for reject in self.rejects:
+                    f.write(json.dumps(reject, ensure_ascii=False) + "\n")
+        return path
@@ -0,0 +1,239 @@
+"""
+Consolidated history of all extracted reports in a single SQLite database.
+
+Rows are keyed by report date and emission code and indexed on both, so the
+history of an emission over years of daily reports is a single index range
+scan instead of a scan over hundreds of CSV files. Report dates are stored in
+ISO format (YYYY-MM-DD) so that they sort and compare chronologically.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from ..constants import CSV_COLUMNS
+
+# Seconds to wait for a concurrent writer (e.g. another pool worker) to finish
+BUSY_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS free_float (
+    report_date TEXT NOT NULL,
+    emission_code TEXT NOT NULL,
+    company TEXT,
+    total_shares INTEGER,
+    free_float INTEGER,
+    shareholders INTEGER,
+    PRIMARY KEY (report_date, emission_code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS free_float_code_date ON free_float (emission_code, report_date);
+CREATE TABLE IF NOT EXISTS reports (
+    report_date TEXT PRIMARY KEY,
+    source TEXT,
+    row_count INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def iso_date(report_date):
+    """
+    Convert a report date to ISO format.
+
+    Args:
+        report_date (str): Date as DD-MM-YYYY (as in the output file names) or YYYY-MM-DD
+
+    Returns:
+        str: Date as YYYY-MM-DD
+
+    Raises:
+        ValueError: If the date is in neither format
+    """
+    for date_format in ("%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(report_date, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid report date: {report_date}")
+
+
+class HistoryStore:
+    """SQLite store of the extracted rows of every report date."""
+
+    def __init__(self, path, logger=None):
+        """
+        Initialize the store, creating the database if it does not exist.
+
+        Args:
+            path (str or Path): Path of the SQLite database file
+            logger (Logger, optional): Logger instance
+        """
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        """
+        Get the database connection of the calling thread.
+
+        SQLite connections cannot be shared between threads, so the watcher
+        thread and the main thread each open their own.
+
+        Returns:
+            sqlite3.Connection: Open connection
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close the database connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run statements in a single write transaction, rolled back on error.
+
+        Yields:
+            sqlite3.Connection: Connection inside the transaction
+        """
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def version(self):
+        """
+        Get the version of the stored data, increased by every write.
+
+        Returns:
+            int: Data version, 0 for an empty store
+        """
+        row = self.connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def has_report(self, report_date):
+        """
+        Check whether a report date is stored.
+
+        Args:
+            report_date (str): Report date
+
+        Returns:
+            bool: True if the rows of the date are stored
+        """
+        row = self.connection().execute(
+            "SELECT 1 FROM reports WHERE report_date = ?", (iso_date(report_date),)
+        ).fetchone()
+        return row is not None
+
+    def report_dates(self):
+        """
+        Get the stored report dates.
+
+        Returns:
+            list: ISO report dates in chronological order
+        """
+        rows = self.connection().execute("SELECT report_date FROM reports ORDER BY report_date")
+        return [row[0] for row in rows]
+
+    def read_report(self, report_date):
+        """
+        Read the stored rows of a report.
+
+        Args:
+            report_date (str): Report date
+
+        Returns:
+            DataFrame: Rows with the CSV columns, ordered by emission code
+        """
+        rows = self.connection().execute(
+            "SELECT company, emission_code, total_shares, free_float, shareholders "
+            "FROM free_float WHERE report_date = ? ORDER BY emission_code",
+            (iso_date(report_date),)
+        ).fetchall()
+        import pandas as pd
+
+        df = pd.DataFrame(rows, columns=CSV_COLUMNS)
+        return df.astype({column: "int64" for column in CSV_COLUMNS[2:]})
+
+    def upsert(self, report_date, df, source=None):
+        """
+        Store the extracted rows of a report, replacing any rows stored for its date.
+
+        The rows are written in one transaction, so re-processing a report leaves
+        the store exactly as if it had been processed once.
+
+        Args:
+            report_date (str): Report date
+            df (DataFrame): Extracted data with the CSV columns
+            source (str, optional): Name of the PDF file the rows came from
+
+        Returns:
+            int: Number of stored rows
+        """
+        return self.upsert_rows(report_date, df.itertuples(index=False, name=None), source)
+
+    def upsert_rows(self, report_date, rows, source=None):
+        """
+        Store the rows of a report given one by one, replacing any rows stored for its date.
+
+        The rows are inserted as they are read, so a report streamed from a CSV
+        file is stored without holding it in memory.
+
+        Args:
+            report_date (str): Report date
+            rows (iterable): (company, emission code, total shares, free float,
+                shareholders) tuples
+            source (str, optional): Name of the PDF file the rows came from
+
+        Returns:
+            int: Number of stored rows
+        """
+        date = iso_date(report_date)
+        count = 0
+
+        def values():
+            nonlocal count
+            for company, code, total, free_float, shareholders in rows:
+                count += 1
+                yield date, code, company, int(total), int(free_float), int(shareholders)
+
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM free_float WHERE report_date = ?", (date,))
+            connection.executemany(
+                "INSERT OR REPLACE INTO free_float VALUES (?, ?, ?, ?, ?, ?)", values()
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?)",
+                (date, source, count, time.strftime("%Y-%m-%dT%H:%M:%S"))
+            )
+            connection.execute(
+                "INSERT INTO meta VALUES ('version', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+
+        self.logger.debug(f"Stored {count} rows of {date} in {self.path}")
+        return count
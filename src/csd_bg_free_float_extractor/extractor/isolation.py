@@ -0,0 +1,213 @@
+"""
+Worker processes that extract one file at a time under wall-clock and memory limits.
+
+A malformed or huge PDF can keep pdfplumber busy for minutes or make it take
+gigabytes of memory. Extracted in an IsolatedWorker, such a file only costs
+its own worker: the parent watches the child's elapsed time and resident
+memory, kills it when a limit is exceeded and starts a fresh worker for the
+next file. The worker is reused between files, so its imports are paid once.
+
+Resident memory is read from /proc on Linux, or with psutil where it is
+installed; elsewhere only the time limit applies.
+"""
+
+import logging
+import time
+
+# Seconds between two checks of a running file
+POLL_INTERVAL = 0.1
+# Seconds a new worker may take to import its dependencies
+START_TIMEOUT = 120
+
+
+class IsolationError(RuntimeError):
+    """A file exceeded a limit or its worker process died; the worker was killed."""
+
+
+def rss_bytes(pid):
+    """
+    Get the resident memory of a process.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        int: Resident set size in bytes, or None if it cannot be determined
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return psutil.Process(pid).memory_info().rss
+    except psutil.Error:
+        return None
+
+
+def _worker_main(connection, initializer, initargs, function):
+    """
+    Run files sent by the parent until the connection is closed.
+
+    Args:
+        connection (multiprocessing.connection.Connection): Child end of the pipe
+        initializer (callable): Function preparing the worker
+        initargs (tuple): Arguments of the initializer
+        function (callable): Function called with each argument sent by the parent
+    """
+    initializer(*initargs)
+    connection.send((True, None))
+    while True:
+        try:
+            argument = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, function(argument)))
+        except Exception as e:
+            connection.send((False, f"{type(e).__name__}: {str(e)}"))
+
+
+class IsolatedWorker:
+    """A child process running one function call at a time under limits."""
+
+    def __init__(self, function, initializer, initargs=(), timeout=None, max_rss=None, logger=None):
+        """
+        Initialize the worker; the child process is started on first use.
+
+        Args:
+            function (callable): Module-level function run in the child for each call
+            initializer (callable): Module-level function preparing a new child
+            initargs (tuple, optional): Arguments of the initializer
+            timeout (float, optional): Seconds a call may take
+            max_rss (int, optional): Bytes of resident memory the child may use
+            logger (Logger, optional): Logger instance
+        """
+        self.function = function
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.logger = logger or logging.getLogger(__name__)
+        self._process = None
+        self._connection = None
+
+    def _start(self):
+        """Start the child process and wait until it is initialized."""
+        import multiprocessing
+
+        # Spawned rather than forked: in watch mode the parent runs other threads
+        context = multiprocessing.get_context("spawn")
+        parent_end, child_end = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_end, self.initializer, self.initargs, self.function),
+            name="isolated-extractor",
+            daemon=True
+        )
+        self._process.start()
+        child_end.close()
+        self._connection = parent_end
+
+        # Starting up is not counted against the time limit of the first file
+        if not self._connection.poll(START_TIMEOUT):
+            self.kill()
+            raise IsolationError(f"Worker process did not start within {START_TIMEOUT}s")
+        try:
+            self._connection.recv()
+        except EOFError:
+            raise self._died()
+        self.logger.debug(f"Started isolated worker process {self._process.pid}")
+
+    def run(self, argument):
+        """
+        Run the function on an argument in the child process.
+
+        Args:
+            argument: Picklable argument of the function
+
+        Returns:
+            Return value of the function
+
+        Raises:
+            IsolationError: If the call failed, exceeded a limit or the child died; in
+                the latter two cases the child is killed and replaced on the next call
+        """
+        if self._process is None:
+            self._start()
+
+        start = time.monotonic()
+        self._connection.send(argument)
+        while not self._connection.poll(POLL_INTERVAL):
+            if not self._process.is_alive():
+                raise self._died()
+
+            elapsed = time.monotonic() - start
+            if self.timeout and elapsed > self.timeout:
+                self.kill()
+                raise IsolationError(f"Timed out after {self.timeout:g}s")
+
+            if self.max_rss:
+                rss = rss_bytes(self._process.pid)
+                if rss is not None and rss > self.max_rss:
+                    self.kill()
+                    raise IsolationError(
+                        f"Exceeded the memory limit: {rss // (1024 * 1024)} MB resident, "
+                        f"limit {self.max_rss // (1024 * 1024)} MB"
+                    )
+
+        try:
+            ok, value = self._connection.recv()
+        except EOFError:
+            raise self._died()
+        if not ok:
+            raise IsolationError(value)
+        return value
+
+    def _died(self):
+        """
+        Clean up after the child process exited unexpectedly.
+
+        Returns:
+            IsolationError: Error describing how the child exited
+        """
+        self._process.join(timeout=5)
+        code = self._process.exitcode
+        self.kill()
+        return IsolationError(f"Worker process died with exit code {code}")
+
+    def kill(self):
+        """Kill the child process at once, e.g. after it exceeded a limit."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def close(self):
+        """Stop the child process after its current call."""
+        if self._process is None:
+            return
+        self._connection.close()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._process = None
+        self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,193 @@
+"""
+Manifest of processed PDF files, used to skip inputs that have not changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Size of the chunks read when hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# While saving is deferred the manifest is still saved after this many changes
+# or seconds, so a run that is stopped keeps most of its progress
+DEFERRED_SAVE_CHANGES = 50
+DEFERRED_SAVE_SECONDS = 30.0
+
+
+def file_hash(path):
+    """
+    Compute the SHA-256 hash of a file's content.
+
+    Args:
+        path (str or Path): Path to the file
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Persistent record of processed input files and their outputs."""
+
+    def __init__(self, path, logger=None, save_changes=DEFERRED_SAVE_CHANGES,
+                 save_seconds=DEFERRED_SAVE_SECONDS):
+        """
+        Initialize the manifest and load any existing entries.
+
+        Args:
+            path (str or Path): Path of the manifest JSON file
+            logger (Logger, optional): Logger instance
+            save_changes (int, optional): Changes after which a deferred manifest is saved
+            save_seconds (float, optional): Seconds after which a deferred manifest is
+                saved on the next change
+        """
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries = {}
+        self.save_changes = save_changes
+        self.save_seconds = save_seconds
+        self._lock = threading.RLock()
+        self._deferred = 0
+        self._dirty = False
+        self._changes = 0
+        self._saved_at = time.monotonic()
+        self.load()
+
+    @staticmethod
+    def key(pdf_path):
+        """
+        Get the manifest key of an input file.
+
+        Args:
+            pdf_path (str or Path): Path to the PDF file
+
+        Returns:
+            str: Absolute path of the file
+        """
+        return str(Path(pdf_path).resolve())
+
+    def load(self):
+        """Load the manifest from disk, starting empty if it is missing or unreadable."""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.path}: {str(e)}")
+            self.entries = {}
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        with self._lock:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.entries}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._changes = 0
+            self._saved_at = time.monotonic()
+
+    def flush(self):
+        """Save the manifest if it has unsaved changes, e.g. when stopping."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    @contextmanager
+    def deferred(self):
+        """
+        Defer saving until the end of the block, e.g. while processing a directory.
+
+        The manifest is still saved every save_changes changes or save_seconds
+        seconds, and at the end of the block even if it is interrupted.
+        """
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                if not self._deferred and self._dirty:
+                    self.save()
+
+    def _changed(self):
+        """Mark the manifest as changed and save it unless saving is deferred and recent."""
+        self._dirty = True
+        self._changes += 1
+        if (not self._deferred or self._changes >= self.save_changes
+                or time.monotonic() - self._saved_at >= self.save_seconds):
+            self.save()
+
+    def lookup(self, pdf_path):
+        """
+        Look up an input file that was already processed and has not changed since.
+
+        The content hash is only recomputed when the size or modification time
+        differ from the recorded ones.
+
+        Args:
+            pdf_path (str or Path): Path to the PDF file
+
+        Returns:
+            dict: Manifest entry if the file is unchanged and its outputs exist, None otherwise
+        """
+        key = self.key(pdf_path)
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        if not all(Path(output).exists() for output in entry.get("outputs", [])):
+            return None
+
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return None
+
+        if stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+            return entry
+
+        if stat.st_size != entry.get("size") or file_hash(pdf_path) != entry.get("sha256"):
+            return None
+
+        # Same content with a new timestamp, e.g. the file was copied again
+        with self._lock:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._changed()
+        return entry
+
+    def record(self, pdf_path, extracted_date, outputs):
+        """
+        Record a successfully processed input file.
+
+        Args:
+            pdf_path (str or Path): Path to the PDF file
+            extracted_date (str): Date extracted from the PDF
+            outputs (list): Paths of the written output files
+        """
+        stat = os.stat(pdf_path)
+        entry = {
+            "sha256": file_hash(pdf_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "date": extracted_date,
+            "outputs": [str(output) for output in outputs]
+        }
+        with self._lock:
+            self.entries[self.key(pdf_path)] = entry
+            self._changed()
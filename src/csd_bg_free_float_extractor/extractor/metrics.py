@@ -0,0 +1,304 @@
+"""
+Per-stage timings and counters of processed files.
+
+The parser and processor record into a FileMetrics object for each file:
+the time spent in each stage and counters such as pages, parsed and rejected
+rows and pages that fell back to raw text. When a file is done the processor
+passes its metrics to the registered hooks; MetricsExporter is a hook that
+writes a JSON summary per file and a Prometheus textfile.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Stages, in pipeline order
+STAGE_OPEN = "open"
+STAGE_HEADER = "header"
+STAGE_TABLES = "tables"
+STAGE_TEXT = "text_fallback"
+STAGE_PARSE = "parse"
+STAGE_VALIDATE = "validate"
+STAGE_HISTORY = "history"
+STAGE_DELTAS = "deltas"
+STAGE_TOTAL = "total"
+
+# Counters
+COUNTER_PAGES = "pages"
+COUNTER_ROWS_PARSED = "rows_parsed"
+COUNTER_ROWS_REJECTED = "rows_rejected"
+COUNTER_FALLBACK_PAGES = "fallback_pages"
+COUNTER_EMITENT_MISMATCH = "emitent_count_mismatch"
+COUNTER_BACKEND_FALLBACKS = "backend_fallbacks"
+COUNTER_TEMPLATE_RETRIES = "template_retries"
+COUNTER_VALIDATION_VIOLATIONS = "validation_violations"
+
+# Prefix of the exported Prometheus metric names
+METRIC_PREFIX = "free_float_extractor"
+
+
+def write_stage(output_format):
+    """
+    Get the stage name of an output writer.
+
+    Args:
+        output_format (str): Output format
+
+    Returns:
+        str: Stage name
+    """
+    return f"write_{output_format}"
+
+
+class FileMetrics:
+    """Timings and counters collected while processing one file."""
+
+    def __init__(self, path=None):
+        """
+        Initialize empty metrics.
+
+        Args:
+            path (str or Path, optional): Path of the processed file
+        """
+        self.path = str(path) if path else None
+        self.date = None
+        self.success = None
+        self.started_at = time.time()
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage; repeated stages accumulate.
+
+        Args:
+            name (str): Stage name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        """
+        Add time to a stage.
+
+        Args:
+            name (str): Stage name
+            seconds (float): Elapsed time
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Counter name
+            value (int, optional): Increment
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """
+        Set a counter.
+
+        Args:
+            name (str): Counter name
+            value (int): Value
+        """
+        self.counters[name] = value
+
+    def merge(self, other, counters=True):
+        """
+        Add the timings, and optionally the counters, of another set of metrics.
+
+        Args:
+            other (FileMetrics): Metrics of a sub-task, e.g. an extraction attempt
+            counters (bool, optional): Also add the counters; False for attempts
+                whose result was discarded
+        """
+        for name, seconds in other.stages.items():
+            self.add_time(name, seconds)
+        if counters:
+            for name, value in other.counters.items():
+                self.count(name, value)
+
+    def to_dict(self):
+        """
+        Get the metrics as JSON-serializable data.
+
+        Returns:
+            dict: Path, date, status, stage seconds and counters
+        """
+        return {
+            "path": self.path,
+            "date": self.date,
+            "success": self.success,
+            "started_at": self.started_at,
+            "stages": dict(self.stages),
+            "counters": dict(self.counters),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create metrics from their JSON form, e.g. as returned by a worker process.
+
+        Args:
+            data (dict): Data from to_dict
+
+        Returns:
+            FileMetrics: Metrics
+        """
+        metrics = cls(data.get("path"))
+        metrics.date = data.get("date")
+        metrics.success = data.get("success")
+        metrics.started_at = data.get("started_at", metrics.started_at)
+        metrics.stages = dict(data.get("stages", {}))
+        metrics.counters = dict(data.get("counters", {}))
+        return metrics
+
+    def summary(self):
+        """
+        Describe the stage timings in one line.
+
+        Returns:
+            str: Stages with their seconds, in recording order
+        """
+        return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.stages.items())
+
+
+def _escape_label(value):
+    """
+    Escape a Prometheus label value.
+
+    Args:
+        value (str): Label value
+
+    Returns:
+        str: Escaped value
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsExporter:
+    """
+    Metrics hook writing a JSON summary per file and a Prometheus textfile.
+
+    The textfile holds counters accumulated since the exporter was created and
+    gauges of the last processed file. It is replaced atomically, as required
+    by the node_exporter textfile collector.
+    """
+
+    def __init__(self, json_dir=None, textfile=None, logger=None):
+        """
+        Initialize the exporter.
+
+        Args:
+            json_dir (str or Path, optional): Directory for the per-file JSON summaries
+            textfile (str or Path, optional): Path of the Prometheus textfile (*.prom)
+            logger (Logger, optional): Logger instance
+        """
+        self.json_dir = Path(json_dir) if json_dir else None
+        self.textfile = Path(textfile) if textfile else None
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._files = {"success": 0, "failure": 0}
+        self._stage_seconds = {}
+        self._counters = {}
+        self._last = None
+
+        if self.json_dir:
+            self.json_dir.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, metrics):
+        """
+        Export the metrics of a processed file.
+
+        Args:
+            metrics (FileMetrics): Metrics of the file
+        """
+        with self._lock:
+            self._files["success" if metrics.success else "failure"] += 1
+            for name, seconds in metrics.stages.items():
+                self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+            for name, value in metrics.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            if metrics.success:
+                self._last = metrics
+
+            try:
+                if self.json_dir:
+                    self._write_json(metrics)
+                if self.textfile:
+                    self._write_textfile()
+            except OSError as e:
+                self.logger.warning(f"Failed to export metrics: {str(e)}")
+
+    def _write_json(self, metrics):
+        """
+        Write the JSON summary of a file.
+
+        Args:
+            metrics (FileMetrics): Metrics of the file
+        """
+        name = Path(metrics.path).stem if metrics.path else "unknown"
+        path = self.json_dir / f"{name}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metrics.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def render(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Text exposition
+        """
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(
+                    f'{key}="{_escape_label(val)}"' for key, val in labels.items()
+                )
+                suffix = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{METRIC_PREFIX}_{name}{suffix} {value}")
+
+        metric("files_total", "counter", "Processed PDF files by status.",
+               [({"status": status}, count) for status, count in self._files.items()])
+        stages = sorted(self._stage_seconds.items())
+        metric("stage_seconds_total", "counter", "Time spent in each processing stage.",
+               [({"stage": name}, f"{seconds:.6f}") for name, seconds in stages])
+        metric("events_total", "counter", "Pages, rows and extraction fallbacks.",
+               [({"counter": name}, value) for name, value in sorted(self._counters.items())])
+
+        if self._last:
+            total = self._last.stages.get(STAGE_TOTAL, 0.0)
+            rows = self._last.counters.get(COUNTER_ROWS_PARSED, 0)
+            metric("last_file_seconds", "gauge", "Processing time of the last successful file.",
+                   [({}, f"{total:.6f}")])
+            metric("last_file_rows_per_second", "gauge", "Throughput of the last successful file.",
+                   [({}, f"{rows / total if total else 0:.3f}")])
+            metric("last_success_timestamp_seconds", "gauge",
+                   "When the last successful file was started.",
+                   [({}, f"{self._last.started_at:.3f}")])
+
+        return "\n".join(lines) + "\n"
+
+    def _write_textfile(self):
+        """Write the Prometheus textfile atomically."""
+        tmp_path = self.textfile.with_name(f"{self.textfile.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.textfile)
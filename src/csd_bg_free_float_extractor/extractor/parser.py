@@ -2,20 +2,41 @@
 PDF parsing functions for Bulgarian market data.
 """
 
+import copy
 import logging
 from pathlib import Path
 from datetime import datetime
 
-import pdfplumber
-import pandas as pd
-
 from ..constants import (
     PATTERN_ROW,
     PATTERN_DATE,
     PATTERN_EMITENT_COUNT,
     HEADER_TEXT,
+    HEADER_STRIP_RATIO,
     CSV_COLUMNS
 )
+from .backends import BACKENDS, BACKEND_PDFMINER, BACKEND_PDFPLUMBER, open_document
+from .diagnostics import SOURCE_TABLE, SOURCE_TEXT, RowDiagnostics
+from .metrics import (
+    COUNTER_BACKEND_FALLBACKS,
+    COUNTER_EMITENT_MISMATCH,
+    COUNTER_FALLBACK_PAGES,
+    COUNTER_PAGES,
+    COUNTER_ROWS_PARSED,
+    COUNTER_ROWS_REJECTED,
+    COUNTER_TEMPLATE_RETRIES,
+    STAGE_HEADER,
+    STAGE_OPEN,
+    STAGE_PARSE,
+    STAGE_TABLES,
+    STAGE_TEXT,
+    FileMetrics
+)
+from .templates import TableTemplate, layout_fingerprint
+
+# Extraction mode running both backends and reporting their differences
+BACKEND_COMPARE = "compare"
+BACKEND_CHOICES = BACKENDS + (BACKEND_COMPARE,)
 
 
 def extract_date_from_text(text):
@@ -37,6 +58,102 @@ def extract_date_from_text(text):
     return None
 
 
+def _normalize_row(row_data):
+    """
+    Reassemble a row whose company name spans multiple lines.
+
+    Args:
+        row_data (str): The row data, containing line breaks
+
+    Returns:
+        str: The row data on a single line
+    """
+    text = row_data.strip()
+    first_line, _, remaining_lines = text.partition("\n")
+
+    # Assume BG code is in the first line
+    bg_pos = first_line.find("BG")
+
+    if bg_pos > 0:
+        # Company name part of the first line (before BG), the remaining lines and
+        # the rest of the first line (BG code and numbers)
+        return (first_line[:bg_pos].strip() + " " + remaining_lines.replace("\n", " ").strip()
+                + " " + first_line[bg_pos:].strip())
+
+    # If BG isn't found in first line, just join everything with spaces
+    return text.replace("\n", " ")
+
+
+# Returned by _tokenize_row for rows that certainly do not match PATTERN_ROW
+_NO_MATCH = ()
+
+
+def _tokenize_row(row_data):
+    """
+    Split a single-line row into its fields by tokenizing from the right.
+
+    The last three tokens are the counts, the one before them the emission
+    code and everything before that the company name. The tokenizer only
+    decides the rows it certainly reads the same way as PATTERN_ROW; for the
+    others (line breaks, a company name of whitespace) the regex must decide.
+
+    Args:
+        row_data (str): Row data
+
+    Returns:
+        tuple: (company, emission code, total shares, free float, shareholders)
+            strings, _NO_MATCH if the row does not match, or None if the regex
+            must decide
+    """
+    if "\n" in row_data:
+        return None
+    # PATTERN_ROW anchors the last number at the end of the row
+    if not row_data or row_data[-1].isspace():
+        return _NO_MATCH
+
+    parts = row_data.rsplit(None, 4)
+    if len(parts) != 5:
+        # Too few tokens, unless leading whitespace is the company name
+        return None if row_data[0].isspace() else _NO_MATCH
+    company, code, total_shares, free_float, shareholders = parts
+
+    # isdecimal accepts exactly the characters \d matches
+    if not (total_shares.isdecimal() and free_float.isdecimal() and shareholders.isdecimal()):
+        return _NO_MATCH
+    if len(code) < 3 or not code.startswith("BG"):
+        return _NO_MATCH
+
+    company = company.strip()
+    if not company:
+        return None
+    return company, code, total_shares, free_float, shareholders
+
+
+def split_row(row_data):
+    """
+    Split a single-line row into its fields.
+
+    Tries the right-anchored tokenizer first and falls back to PATTERN_ROW for
+    the rows it leaves undecided; both give the same fields for every row.
+
+    Args:
+        row_data (str): Row data without line breaks
+
+    Returns:
+        tuple: (company, emission code, total shares, free float, shareholders)
+            strings with the company name stripped, or None if the row does not match
+    """
+    fields = _tokenize_row(row_data)
+    if fields is not None:
+        return fields or None
+
+    match = PATTERN_ROW.match(row_data)
+    if match is None:
+        return None
+    company, code, total_shares, free_float, shareholders = match.groups()
+    return company.strip(), code, total_shares, free_float, shareholders
+
+
 def parse_row(row_data, logger=None):
     """
     Parse a single row from the PDF.
@@ -53,37 +170,18 @@ def parse_row(row_data, logger=None):
 
     # Handle multi-line company names: Join all parts, preserving the order
     if "\n" in row_data:
-        # Split the row into lines
-        lines = row_data.strip().split("\n")
-
-        # Assume BG code is in the first line
-        # Find the position of "BG" in the first line
-        bg_pos = lines[0].find("BG")
-
-        if bg_pos > 0:
-            # Extract company name part from first line (before BG)
-            first_part = lines[0][:bg_pos].strip()
-            # Extract rest of the first line (including BG code and numbers)
-            rest_of_first_line = lines[0][bg_pos:].strip()
-            # Combine with remaining lines
-            remaining_lines = " ".join(lines[1:]).strip()
-            # Reconstruct the row with company name properly assembled
-            row_data = first_part + " " + remaining_lines + " " + rest_of_first_line
-        else:
-            # If BG isn't found in first line, just join everything with spaces
-            row_data = " ".join(lines)
+        row_data = _normalize_row(row_data)
 
-    # Apply regex matching
-    match = PATTERN_ROW.match(row_data)
+    fields = split_row(row_data)
 
-    if match:
-        parsed_data = match.groupdict()
+    if fields:
+        company, emission_code, total_shares, free_float, shareholders = fields
         return {
-            "Company": parsed_data["company"].strip(),
-            "Emission Code": parsed_data["emission_code"].strip(),
-            "Total Shares": int(parsed_data["total_shares"]),
-            "Free Float": int(parsed_data["free_float"]),
-            "Shareholders": int(parsed_data["shareholders"])
+            "Company": company,
+            "Emission Code": emission_code,
+            "Total Shares": int(total_shares),
+            "Free Float": int(free_float),
+            "Shareholders": int(shareholders)
         }
     else:
         if logger:
@@ -91,48 +189,768 @@ def parse_row(row_data, logger=None):
         return None  # Invalid row
 
 
+def parse_rows(rows, logger=None):
+    """
+    Parse a batch of rows from the PDF into a typed DataFrame.
+
+    Produces the same records as calling parse_row on every row, but builds the
+    columns directly: the numeric columns are cast in bulk into int64 arrays
+    instead of going through a dict per row.
+
+    Args:
+        rows (list): Row data strings
+        logger (Logger, optional): Logger for warnings about rows that do not match
+
+    Returns:
+        tuple: (DataFrame with CSV_COLUMNS, list of (position, normalized row) for rejected rows)
+    """
+    import numpy as np
+    import pandas as pd
+
+    matched_groups = []
+    rejected = []
+    for position, row_data in enumerate(rows):
+        if not row_data or not isinstance(row_data, str):
+            rejected.append((position, row_data))
+            continue
+
+        if "\n" in row_data:
+            row_data = _normalize_row(row_data)
+
+        fields = split_row(row_data)
+        if fields:
+            matched_groups.append(fields)
+        else:
+            rejected.append((position, row_data))
+            if logger:
+                logger.warning(f"Skipping row due to unexpected format: {row_data}")
+
+    columns = list(zip(*matched_groups)) or [()] * len(CSV_COLUMNS)
+    companies, codes, total_shares, free_float, shareholders = columns
+    count = len(matched_groups)
+
+    df = pd.DataFrame({
+        "Company": list(companies),
+        "Emission Code": list(codes),
+        "Total Shares": np.fromiter(map(int, total_shares), dtype=np.int64, count=count),
+        "Free Float": np.fromiter(map(int, free_float), dtype=np.int64, count=count),
+        "Shareholders": np.fromiter(map(int, shareholders), dtype=np.int64, count=count)
+    }, columns=CSV_COLUMNS)
+
+    return df, rejected
+
+
+def _joined_rows(table):
+    """
+    Join the cells of each table row the way the parser does.
+
+    Args:
+        table (list): Rows as lists of cells, or None
+
+    Returns:
+        list: Row strings
+    """
+    return [" ".join(filter(None, row)).strip() for row in table or [] if row]
+
+
+def compare_frames(expected, actual):
+    """
+    Find the rows present in only one of two extracted DataFrames.
+
+    Args:
+        expected (DataFrame): Rows extracted by pdfplumber
+        actual (DataFrame): Rows extracted by pdfminer
+
+    Returns:
+        list: (backend name, row dict) for each row missing from the other DataFrame
+    """
+    import pandas as pd
+
+    merged = pd.merge(
+        expected.reindex(columns=CSV_COLUMNS).astype(str),
+        actual.reindex(columns=CSV_COLUMNS).astype(str),
+        how="outer",
+        indicator=True
+    )
+    sources = {"left_only": BACKEND_PDFPLUMBER, "right_only": BACKEND_PDFMINER}
+    differences = merged[merged["_merge"] != "both"]
+    return [
+        (sources[row.pop("_merge")], row)
+        for row in differences.to_dict("records")
+    ]
+
+
+def _release_page(page):
+    """
+    Drop the layout objects a page has cached once its rows are extracted.
+
+    Args:
+        page (pdfplumber.page.Page): Page that was extracted
+    """
+    # Page.close() was added in pdfplumber 0.10; older versions only flush the cache
+    release = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+    if release:
+        release()
+
+
+class _RecordBuffer(logging.Handler):
+    """Logging handler that keeps records so they can be sent to another process."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Format now so the record no longer depends on its arguments
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+def _capturing_logger(log_level):
+    """
+    Create a logger that buffers its records instead of emitting them.
+
+    Args:
+        log_level (int): Logging level of the logger
+
+    Returns:
+        tuple: (Logger, _RecordBuffer holding the records)
+    """
+    buffer = _RecordBuffer()
+    logger = logging.Logger(f"{__name__}.capture", log_level)
+    logger.addHandler(buffer)
+    return logger, buffer
+
+
+def _extract_page_range(pdf_path, first_page, last_page, log_level, backend=BACKEND_PDFPLUMBER):
+    """
+    Extract the rows of a range of pages in a worker process.
+
+    The worker opens the document independently and captures its log records,
+    which are returned to be re-emitted by the parent's logger.
+
+    Args:
+        pdf_path (Path): Path to the PDF file
+        first_page (int): First page number to extract (1-based)
+        last_page (int): Last page number to extract (inclusive)
+        log_level (int): Logging level of the parent logger
+        backend (str, optional): Name of the extraction backend
+
+    Returns:
+        tuple: (list of raw rows, emitent count or None, number of errors, log records)
+    """
+    logger, buffer = _capturing_logger(log_level)
+
+    errors = []
+    page_numbers = list(range(first_page, last_page + 1))
+    with open_document(pdf_path, backend, pages=page_numbers) as pdf:
+        rows, emitent_count, _ = PDFParser(logger)._extract_pages(
+            pdf.pages, first_page, pdf_path, lambda: errors.append(1)
+        )
+
+    return rows, emitent_count, len(errors), buffer.records
+
+
 class PDFParser:
     """PDF parser for Bulgarian stock market data."""
 
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, page_jobs=1, backend=BACKEND_PDFPLUMBER, template_cache=None):
         """
         Initialize the parser.
 
         Args:
             logger (Logger, optional): Logger instance
+            page_jobs (int, optional): Number of worker processes that share the pages
+                of a single document; 1 extracts the pages in this process
+            backend (str, optional): Extraction backend: "pdfplumber", "pdfminer" (falling
+                back to pdfplumber when its result does not check out) or "compare"
+                (pdfplumber result, with differences to pdfminer reported)
+            template_cache (TemplateCache, optional): Cache of learned table templates used
+                by the pdfplumber backend; tables are detected on every page without it
         """
+        if backend not in BACKEND_CHOICES:
+            raise ValueError(f"Unknown extraction backend: {backend}")
+
         self.logger = logger or logging.getLogger(__name__)
+        self.page_jobs = page_jobs
+        self.backend = backend
+        self.template_cache = template_cache
+        self._page_pool = None
+
+    def close(self):
+        """Shut down the page worker processes, if any were started."""
+        if self._page_pool:
+            self._page_pool.shutdown()
+            self._page_pool = None
+
+    def extract_header_date(self, page):
+        """
+        Extract the report date from the header strip of a page.
+
+        Only the top part of the page is read, so the rest of the page layout
+        is not converted to text.
+
+        Args:
+            page (pdfplumber.page.Page): First page of the PDF
+
+        Returns:
+            str: Extracted date in DD-MM-YYYY format or None if not found
+        """
+        header = page.crop((0, 0, page.width, page.height * HEADER_STRIP_RATIO))
+        text = header.extract_text()
+
+        if text and HEADER_TEXT in text:
+            return extract_date_from_text(text)
+        return None
+
+    def _extract_table(self, page, template=None, fingerprint=None):
+        """
+        Extract the table of a page, using or learning a table template.
+
+        Args:
+            page (pdfplumber.page.Page): Page to read
+            template (TableTemplate, optional): Template to extract the table with
+            fingerprint (str, optional): Layout fingerprint under which to learn a
+                template from this page when no template is given
+
+        Returns:
+            tuple: (rows as lists of cells or None, template for the following pages)
+        """
+        if template:
+            table = template.extract_table(page)
+            if table is not None:
+                return table, template
+
+        if not fingerprint:
+            return page.extract_table(), template
+
+        found = page.find_table()
+        if found is None:
+            return None, template
+
+        table = found.extract()
+        learned = TableTemplate.from_table(found)
+        if learned and _joined_rows(learned.extract_table(page)) == _joined_rows(table):
+            self.logger.debug(f"Learned table template for layout {fingerprint}")
+            self.template_cache.put(fingerprint, learned)
+            template = learned
+        return table, template
+
+    def _extract_pages_with_template(self, pdf, pdf_path, error_callback=None, metrics=None):
+        """
+        Extract the data rows of a pdfplumber document using the cached table template.
+
+        Without a cached template for the document's layout, one is learned from
+        the first page where it reproduces pdfplumber's table. The result is held
+        back until it checks out; otherwise the pages are extracted again without
+        a template and the template is dropped if it produced different rows.
+
+        Args:
+            pdf (pdfplumber.PDF): Open document
+            pdf_path (Path): Path to the PDF file
+            error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+
+        Returns:
+            tuple: (list of raw rows, emitent count or None, errors occurred boolean)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        fingerprint = layout_fingerprint(pdf)
+        template = self.template_cache.get(fingerprint)
+
+        parser, buffer = self.capturing()
+        attempt = FileMetrics(pdf_path)
+        rows, emitent_count, errors_occurred = parser._extract_pages(
+            pdf.pages, 1, pdf_path, template=template,
+            fingerprint=None if template else fingerprint, metrics=attempt
+        )
+
+        _, rejected = parse_rows([row_data for _, row_data, from_table in rows if from_table])
+        if (rows and not rejected and not errors_occurred
+                and (emitent_count is None or emitent_count == len(rows))):
+            metrics.merge(attempt)
+            for record in buffer.records:
+                record.name = self.logger.name
+                self.logger.handle(record)
+            return rows, emitent_count, errors_occurred
+
+        metrics.merge(attempt, counters=False)
+        metrics.count(COUNTER_TEMPLATE_RETRIES)
+        result = self._extract_pages(pdf.pages, 1, pdf_path, error_callback, metrics=metrics)
+        if result[0] != rows and self.template_cache.get(fingerprint):
+            self.logger.info(f"Table template no longer fits {pdf_path}, it will be learned again")
+            self.template_cache.discard(fingerprint)
+        return result
+
+    def _extract_pages(self, pages, first_page_num, pdf_path, error_callback=None,
+                       template=None, fingerprint=None, metrics=None):
+        """
+        Extract the data rows from a sequence of pages.
+
+        Args:
+            pages (list): pdfplumber pages to extract
+            first_page_num (int): Page number of the first page (1-based)
+            pdf_path (Path): Path to the PDF file, used in log messages
+            error_callback (callable, optional): Function to call on parsing errors
+            template (TableTemplate, optional): Table template of the pages
+            fingerprint (str, optional): Layout fingerprint under which to learn a template
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+
+        Returns:
+            tuple: (list of raw rows, emitent count or None, errors occurred boolean), where
+                each raw row is a (page number, row data, from table) tuple
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        raw_rows = []
+        emitent_count = None
+        errors_occurred = False
+
+        # Single pass over the pages: each page's layout is extracted once
+        for page_num, page in enumerate(pages, first_page_num):
+            rows, count, page_errors, template, fingerprint = self._extract_page(
+                page, page_num, pdf_path, error_callback, template, fingerprint, metrics
+            )
+            raw_rows.extend(rows)
+            if count is not None:
+                emitent_count = count
+            errors_occurred = errors_occurred or page_errors
+
+        return raw_rows, emitent_count, errors_occurred
+
+    def _extract_page(self, page, page_num, pdf_path, error_callback=None,
+                      template=None, fingerprint=None, metrics=None):
+        """
+        Extract the data rows of one page.
+
+        Args:
+            page (pdfplumber.page.Page): Page to extract
+            page_num (int): Page number (1-based)
+            pdf_path (Path): Path to the PDF file, used in log messages
+            error_callback (callable, optional): Function to call on parsing errors
+            template (TableTemplate, optional): Table template of the page
+            fingerprint (str, optional): Layout fingerprint under which to learn a template
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+
+        Returns:
+            tuple: (list of raw rows, emitent count or None, errors occurred boolean,
+                template and fingerprint for the following pages)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        raw_rows = []
+        emitent_count = None
+        errors_occurred = False
+
+        # Try to extract as table first
+        with metrics.stage(STAGE_TABLES):
+            if template or fingerprint:
+                table, template = self._extract_table(page, template, fingerprint)
+                if template:
+                    fingerprint = None
+            else:
+                table = page.extract_table()
+
+        if table:
+            for i, row in enumerate(table):
+                if row is None or len(row) == 0:
+                    continue
+
+                # Skip the header row if detected
+                if i == 0 and any(h in (row[0] or '') for h in ["Емитент", "Емисия"]):
+                    continue
+
+                # Join row contents if split across multiple cells
+                row_data = " ".join(filter(None, row)).strip()
+
+                # Check if this is the footer row with emitent count
+                count_match = PATTERN_EMITENT_COUNT.search(row_data)
+                if count_match:
+                    emitent_count = int(count_match.group(1))
+                    self.logger.info(f"Found emitent count: {emitent_count}")
+                    continue
+
+                # Collect the row for batch parsing
+                raw_rows.append((page_num, row_data, True))
+        else:
+            # If table extraction failed, try with raw text
+            self.logger.warning(f"No table found on page {page_num}, trying with raw text")
+            errors_occurred = True
+            metrics.count(COUNTER_FALLBACK_PAGES)
+            if error_callback:
+                error_callback()
+
+            with metrics.stage(STAGE_TEXT):
+                text = page.extract_text()
+            if text:
+                lines = text.split('\n')
+
+                for line in lines:
+                    # Skip header lines
+                    if any(h in line for h in ["Емитент", "Емисия", "Фрий флoут", "към дата"]):
+                        continue
+
+                    # Check if this is the footer line with emitent count
+                    count_match = PATTERN_EMITENT_COUNT.search(line)
+                    if count_match:
+                        emitent_count = int(count_match.group(1))
+                        self.logger.info(f"Found emitent count: {emitent_count}")
+                        continue
+
+                    # Collect the line to be parsed as a data row
+                    raw_rows.append((page_num, line, False))
+
+        return raw_rows, emitent_count, errors_occurred, template, fingerprint
+
+    def _start_page_pool(self):
+        """Start the page worker processes unless they are already running."""
+        if self._page_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Spawned rather than forked: in watch mode the parent runs other threads
+            self._page_pool = ProcessPoolExecutor(
+                max_workers=self.page_jobs,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def _extract_pages_in_parallel(self, pdf_path, page_count, error_callback=None,
+                                   backend=BACKEND_PDFPLUMBER, metrics=None):
+        """
+        Extract the data rows of a document with its pages split across worker processes.
+
+        The page ranges are contiguous and their results are merged back in page order.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            page_count (int): Number of pages in the document
+            error_callback (callable, optional): Function to call on parsing errors
+            backend (str, optional): Name of the extraction backend
+            metrics (FileMetrics, optional): Metrics to record the time spent waiting
+                for the workers in, as table extraction
 
-    def extract_data_from_pdf(self, pdf_path, error_callback=None):
+        Returns:
+            tuple: (list of raw rows, emitent count or None, errors occurred boolean)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        workers = min(self.page_jobs, page_count)
+        self._start_page_pool()
+
+        # Contiguous page ranges of nearly equal size
+        bounds = [1 + page_count * i // workers for i in range(workers + 1)]
+        futures = [
+            self._page_pool.submit(_extract_page_range, pdf_path, bounds[i], bounds[i + 1] - 1,
+                                   self.logger.getEffectiveLevel(), backend)
+            for i in range(workers)
+        ]
+
+        raw_rows = []
+        emitent_count = None
+        errors_occurred = False
+        for future in futures:
+            with metrics.stage(STAGE_TABLES):
+                rows, count, errors, records = future.result()
+            # Errors in the page workers are pages without a table
+            metrics.count(COUNTER_FALLBACK_PAGES, errors)
+            for record in records:
+                record.name = self.logger.name
+                self.logger.handle(record)
+            for _ in range(errors):
+                errors_occurred = True
+                if error_callback:
+                    error_callback()
+
+            raw_rows.extend(rows)
+            if count is not None:
+                emitent_count = count
+
+        return raw_rows, emitent_count, errors_occurred
+
+    def extract_data_from_pdf(self, pdf_path, error_callback=None, metrics=None, diagnostics=None):
         """
         Extract structured tabular data from the Bulgarian stock market PDF.
 
+        Rows that cannot be parsed are not logged one by one: they are collected
+        in diagnostics and summarized in a single warning per file.
+
         Args:
             pdf_path (Path): Path to the PDF file
             error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+            diagnostics (RowDiagnostics, optional): Collects the rows that could not be parsed
 
         Returns:
             tuple: (DataFrame of extracted data, extracted date string, errors occurred boolean)
         """
         self.logger.info(f"Processing PDF: {pdf_path}")
 
-        # Lists to store extracted data
-        extracted_data = []
-        extracted_date = None
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        if diagnostics is None:
+            diagnostics = RowDiagnostics()
+        if self.backend == BACKEND_PDFMINER:
+            return self._extract_with_fallback(pdf_path, error_callback, metrics, diagnostics)
+        if self.backend == BACKEND_COMPARE:
+            return self._extract_and_compare(pdf_path, error_callback, metrics, diagnostics)
+        return self._extract(pdf_path, BACKEND_PDFPLUMBER, error_callback, metrics, diagnostics)
+
+    def read_date(self, pdf_path):
+        """
+        Read the report date from the header of a PDF without extracting its pages.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            str: Extracted date in DD-MM-YYYY format or None if not found
+        """
+        with open_document(pdf_path, BACKEND_PDFPLUMBER, pages=[1]) as pdf:
+            if not pdf.pages:
+                return None
+            return self.extract_header_date(pdf.pages[0])
+
+    def iter_rows(self, pdf_path, error_callback=None, metrics=None, diagnostics=None):
+        """
+        Yield the parsed rows of a PDF page by page.
+
+        Unlike extract_data_from_pdf no rows are accumulated: the rows of each
+        page are parsed and yielded once the page is extracted, and the page's
+        cached layout is released before the next page is read, so memory does
+        not grow with the document. Pages are read with pdfplumber in this
+        process and tables are detected on every page, since neither the
+        pdfminer fallback nor a table template can be checked before the first
+        rows have been handed out.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+            diagnostics (RowDiagnostics, optional): Collects the rows that could not be parsed
+
+        Yields:
+            dict: Parsed row data, as returned by parse_row
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        if diagnostics is None:
+            diagnostics = RowDiagnostics()
         emitent_count = None
+        parsed = 0
+
+        with metrics.stage(STAGE_OPEN):
+            document = open_document(pdf_path, BACKEND_PDFPLUMBER)
+        with document as pdf:
+            metrics.set(COUNTER_PAGES, len(pdf.pages))
+            for page_num, page in enumerate(pdf.pages, 1):
+                rows, count, _, _, _ = self._extract_page(page, page_num, pdf_path, error_callback,
+                                                          metrics=metrics)
+                _release_page(page)
+                if count is not None:
+                    emitent_count = count
+
+                for _, row_data, from_table in rows:
+                    with metrics.stage(STAGE_PARSE):
+                        record = parse_row(row_data)
+                    if record:
+                        parsed += 1
+                        yield record
+                    else:
+                        diagnostics.add(
+                            page_num, row_data, SOURCE_TABLE if from_table else SOURCE_TEXT
+                        )
+
+        table_rejects = diagnostics.table_rejects()
+        self._report_rejects(pdf_path, diagnostics, error_callback)
+        metrics.set(COUNTER_ROWS_PARSED, parsed)
+        metrics.set(COUNTER_ROWS_REJECTED, table_rejects)
+        metrics.set(
+            COUNTER_EMITENT_MISMATCH,
+            int(bool(emitent_count) and parsed and parsed != emitent_count),
+        )
+        if emitent_count and parsed and parsed != emitent_count:
+            self.logger.warning(
+                f"Extracted {parsed} rows but PDF indicates {emitent_count} emitents. "
+                f"Some data may be missing."
+            )
+            if error_callback:
+                error_callback()
+
+    def _report_rejects(self, pdf_path, diagnostics, error_callback=None):
+        """
+        Log one summary of the rows of a file that could not be parsed.
+
+        Rejected table rows count as parsing errors; lines of the raw text
+        fallback that are not data rows are expected and only summarized.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            diagnostics (RowDiagnostics): Rejected rows of the file
+            error_callback (callable, optional): Function to call on parsing errors
+
+        Returns:
+            bool: True if table rows were rejected
+        """
+        if not diagnostics.rejects:
+            return False
+        self.logger.warning(diagnostics.summary(pdf_path))
+        if not diagnostics.table_rejects():
+            return False
+        if error_callback:
+            error_callback()
+        return True
+
+    def _with_logger(self, logger):
+        """
+        Get a copy of the parser that logs to another logger and shares the page workers.
+
+        Args:
+            logger (Logger): Logger of the copy
+
+        Returns:
+            PDFParser: Parser copy
+        """
+        if self.page_jobs > 1:
+            self._start_page_pool()
+        parser = copy.copy(self)
+        parser.logger = logger
+        return parser
+
+    def capturing(self, log_level=None):
+        """
+        Get a copy of the parser whose log records are buffered instead of emitted.
+
+        The copy shares the page workers. Its records are kept in the returned
+        handler's records list, already formatted, for the caller to re-emit
+        or return once it knows whether the result is kept.
+
+        Args:
+            log_level (int, optional): Logging level of the copy; by default the
+                effective level of the parser's logger
+
+        Returns:
+            tuple: (PDFParser copy, logging.Handler whose records list holds the records)
+        """
+        if log_level is None:
+            log_level = self.logger.getEffectiveLevel()
+        logger, buffer = _capturing_logger(log_level)
+        return self._with_logger(logger), buffer
+
+    def _extract_with_fallback(self, pdf_path, error_callback=None, metrics=None, diagnostics=None):
+        """
+        Extract with the pdfminer backend, falling back to pdfplumber if that fails.
+
+        The pdfminer attempt's log records are held back and only emitted when
+        its result is kept: data was found and no parsing errors occurred.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+            diagnostics (RowDiagnostics, optional): Collects the rows that could not be parsed
+
+        Returns:
+            tuple: (DataFrame of extracted data, extracted date string, errors occurred boolean)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        if diagnostics is None:
+            diagnostics = RowDiagnostics()
+        parser, buffer = self.capturing()
+        attempt = FileMetrics(pdf_path)
+        attempt_diagnostics = RowDiagnostics(diagnostics.sample_size)
+        result = parser._extract(pdf_path, BACKEND_PDFMINER, metrics=attempt,
+                                 diagnostics=attempt_diagnostics)
+        df, extracted_date, errors_occurred = result
+
+        if df.empty or errors_occurred:
+            self.logger.info(
+                f"Fast extraction of {pdf_path} did not check out, falling back to pdfplumber"
+            )
+            metrics.merge(attempt, counters=False)
+            metrics.count(COUNTER_BACKEND_FALLBACKS)
+            return self._extract(pdf_path, BACKEND_PDFPLUMBER, error_callback, metrics, diagnostics)
+
+        metrics.merge(attempt)
+        diagnostics.merge(attempt_diagnostics)
+
+        for record in buffer.records:
+            record.name = self.logger.name
+            self.logger.handle(record)
+        return result
+
+    def _extract_and_compare(self, pdf_path, error_callback=None, metrics=None, diagnostics=None):
+        """
+        Extract with both backends and report the rows on which they differ.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in;
+                the pdfminer pass only adds its timings
+            diagnostics (RowDiagnostics, optional): Collects the rows of the pdfplumber
+                pass that could not be parsed
+
+        Returns:
+            tuple: pdfplumber's (DataFrame, extracted date string, errors occurred boolean)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        result = self._extract(pdf_path, BACKEND_PDFPLUMBER, error_callback, metrics, diagnostics)
+
+        parser, _ = self.capturing()
+        attempt = FileMetrics(pdf_path)
+        fast_df, fast_date, _ = parser._extract(pdf_path, BACKEND_PDFMINER, metrics=attempt)
+        metrics.merge(attempt, counters=False)
+
+        df, extracted_date, _ = result
+        differences = compare_frames(df, fast_df)
+        if fast_date != extracted_date:
+            self.logger.warning(f"Backends disagree on the date of {pdf_path}: "
+                                f"pdfplumber {extracted_date}, pdfminer {fast_date}")
+        if differences:
+            self.logger.warning(f"Backends disagree on {len(differences)} rows of {pdf_path}")
+            for source, row in differences:
+                self.logger.warning(f"Only extracted by {source}: {row}")
+        else:
+            self.logger.info(f"Backends agree on all {len(df)} rows of {pdf_path}")
+
+        return result
+
+    def _extract(self, pdf_path, backend, error_callback=None, metrics=None, diagnostics=None):
+        """
+        Extract the data of a PDF with one backend.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            backend (str): Name of the extraction backend
+            error_callback (callable, optional): Function to call on parsing errors
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+            diagnostics (RowDiagnostics, optional): Collects the rows that could not be parsed
+
+        Returns:
+            tuple: (DataFrame of extracted data, extracted date string, errors occurred boolean)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        if diagnostics is None:
+            diagnostics = RowDiagnostics()
+        extracted_date = None
         errors_occurred = False
 
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # First pass: find the date
-                for page in pdf.pages:
-                    text = page.extract_text()
-
-                    if HEADER_TEXT in text:
-                        extracted_date = extract_date_from_text(text)
-                        if extracted_date:
-                            self.logger.info(f"Extracted date: {extracted_date}")
-                            break
+            with metrics.stage(STAGE_OPEN):
+                document = open_document(pdf_path, backend)
+            with document as pdf:
+                # The date is printed in the header of the first page only
+                if pdf.pages:
+                    with metrics.stage(STAGE_HEADER):
+                        extracted_date = self.extract_header_date(pdf.pages[0])
+                    if extracted_date:
+                        self.logger.info(f"Extracted date: {extracted_date}")
 
                 # If no date found, use the current date
                 if not extracted_date:
@@ -140,72 +958,39 @@ class PDFParser:
                     self.logger.warning(f"No date found in PDF. Using current date: {extracted_date}")
                     errors_occurred = True
 
-                # Second pass: extract tabular data
-                for page_num, page in enumerate(pdf.pages, 1):
-                    # Try to extract as table first
-                    table = page.extract_table()
-
-                    if table:
-                        for i, row in enumerate(table):
-                            if row is None or len(row) == 0:
-                                continue
-
-                            # Skip the header row if detected
-                            if i == 0 and any(h in (row[0] or '') for h in ["Емитент", "Емисия"]):
-                                continue
-
-                            # Check if this is the footer row with emitent count
-                            row_text = " ".join(filter(None, row)).strip()
-                            count_match = PATTERN_EMITENT_COUNT.search(row_text)
-                            if count_match:
-                                emitent_count = int(count_match.group(1))
-                                self.logger.info(f"Found emitent count: {emitent_count}")
-                                continue
-
-                            # Join row contents if split across multiple cells
-                            row_data = " ".join(filter(None, row)).strip()
-
-                            # Parse row
-                            parsed_row = parse_row(row_data, self.logger)
-
-                            if parsed_row:
-                                extracted_data.append(parsed_row)
-                            else:
-                                self.logger.warning(f"Failed to parse ${pdf_path} row on page {page_num}: {row_data}")
-                                errors_occurred = True
-                                if error_callback:
-                                    error_callback()
-                    else:
-                        # If table extraction failed, try with raw text
-                        self.logger.warning(f"No table found on page {page_num}, trying with raw text")
-                        errors_occurred = True
-                        if error_callback:
-                            error_callback()
-
-                        text = page.extract_text()
-                        if text:
-                            lines = text.split('\n')
-
-                            for line in lines:
-                                # Skip header lines
-                                if any(h in line for h in ["Емитент", "Емисия", "Фрий флoут", "към дата"]):
-                                    continue
-
-                                # Check if this is the footer line with emitent count
-                                count_match = PATTERN_EMITENT_COUNT.search(line)
-                                if count_match:
-                                    emitent_count = int(count_match.group(1))
-                                    self.logger.info(f"Found emitent count: {emitent_count}")
-                                    continue
-
-                                # Try to parse as a data row
-                                parsed_row = parse_row(line, self.logger)
+                page_count = len(pdf.pages)
+                metrics.set(COUNTER_PAGES, page_count)
+                use_template = (
+                    self.template_cache is not None and backend == BACKEND_PDFPLUMBER and page_count
+                )
+                if self.page_jobs > 1 and page_count > 1:
+                    pages_result = self._extract_pages_in_parallel(
+                        pdf_path, page_count, error_callback, backend, metrics
+                    )
+                elif use_template:
+                    pages_result = self._extract_pages_with_template(
+                        pdf, pdf_path, error_callback, metrics
+                    )
+                else:
+                    pages_result = self._extract_pages(
+                        pdf.pages, 1, pdf_path, error_callback, metrics=metrics
+                    )
 
-                                if parsed_row:
-                                    extracted_data.append(parsed_row)
+            raw_rows, emitent_count, page_errors = pages_result
+            errors_occurred = errors_occurred or page_errors
 
-            # Create DataFrame
-            df = pd.DataFrame(extracted_data, columns=CSV_COLUMNS)
+            # Parse all rows in one batch into a typed DataFrame
+            with metrics.stage(STAGE_PARSE):
+                df, rejected = parse_rows([row_data for _, row_data, _ in raw_rows])
+            for position, _ in rejected:
+                page_num, row_data, from_table = raw_rows[position]
+                diagnostics.add(page_num, row_data, SOURCE_TABLE if from_table else SOURCE_TEXT)
+            if self._report_rejects(pdf_path, diagnostics, error_callback):
+                errors_occurred = True
+            metrics.set(COUNTER_ROWS_PARSED, len(df))
+            metrics.set(COUNTER_ROWS_REJECTED, diagnostics.table_rejects())
+            mismatch = bool(emitent_count) and not df.empty and len(df) != emitent_count
+            metrics.set(COUNTER_EMITENT_MISMATCH, int(mismatch))
 
             # Validate extraction
             if not df.empty:
@@ -230,4 +1015,6 @@ class PDFParser:
             errors_occurred = True
             if error_callback:
                 error_callback()
+            import pandas as pd
+
             return pd.DataFrame(), extracted_date, errors_occurred
\ No newline at end of file
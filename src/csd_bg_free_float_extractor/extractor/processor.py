@@ -2,14 +2,167 @@
 File processing logic for Bulgarian market data extraction.
 """
 
+import contextvars
+import csv
 import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+from ..constants import (
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF,
+    FAILED_DIRNAME,
+    HISTORY_FILENAME,
+    MANIFEST_FILENAME,
+    TEMPLATES_FILENAME
+)
+from .deltas import DeltaTracker
+from .diagnostics import REJECTS_SUFFIX, RowDiagnostics
+from .history import HistoryStore
+from .isolation import IsolatedWorker, IsolationError
+from .manifest import Manifest
+from .metrics import (
+    COUNTER_VALIDATION_VIOLATIONS,
+    STAGE_DELTAS,
+    STAGE_HEADER,
+    STAGE_HISTORY,
+    STAGE_TOTAL,
+    STAGE_VALIDATE,
+    FileMetrics,
+    write_stage
+)
+from .backends import BACKEND_PDFPLUMBER
 from .parser import PDFParser
+from .scheduler import ORDER_NEWEST, ORDERS, WorkScheduler, order_files, probe_date
+from .templates import TemplateCache
+from .utils import setup_logger
+from .validation import validate_frame
+from .writers import (
+    DEFAULT_FORMATS,
+    FORMAT_CSV,
+    BackgroundWriter,
+    check_formats,
+    date_lock,
+    output_paths,
+    parse_formats,
+    write_csv_rows,
+    write_outputs
+)
+
+
+# Processor owned by each worker process of the directory pool
+_worker_processor = None
+
+
+def _init_worker(input_dir, output_dir, logger_name, log_level, options):
+    """
+    Initialize a worker process of the directory processing pool.
+
+    Args:
+        input_dir (Path): Directory containing PDF files
+        output_dir (Path): Directory for output files
+        logger_name (str): Name of the logger to use in the worker
+        log_level (int): Logging level of the parent logger
+        options (dict): Keyword arguments for the worker's PDFProcessor
+    """
+    global _worker_processor
+    logger = setup_logger(logger_name, log_level)
+    _worker_processor = PDFProcessor(input_dir, output_dir, logger, **options)
+
+
+def _process_in_worker(pdf_path):
+    """
+    Process a single PDF file inside a pool worker.
+
+    Args:
+        pdf_path (Path): Path to the PDF file
+
+    Returns:
+        tuple: ((success status, extracted date, list of output paths), metrics as a dict)
+    """
+    metrics = FileMetrics(pdf_path)
+    try:
+        # Deltas are written by the parent once all files are stored
+        result = _worker_processor._process_pdf(pdf_path, update_deltas=False, metrics=metrics)
+    except Exception as e:
+        _worker_processor.logger.error(f"Unexpected error processing {pdf_path}: {str(e)}")
+        metrics.success = False
+        result = False, None, []
+    # Metrics are passed to the hooks by the parent
+    return result, metrics.to_dict()
+
+
+def resolve_jobs(jobs):
+    """
+    Resolve the requested number of worker processes.
+
+    Args:
+        jobs (int or None): Requested number of workers; 0 or less means all CPUs
+
+    Returns:
+        int: Number of worker processes to use
+    """
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+# Error log of the file processed in the current thread or task
+_current_error_log = contextvars.ContextVar("current_error_log", default=None)
+
+# Guards attaching the error log router to a logger
+_router_guard = threading.Lock()
+
+
+class _ErrorLogRouter(logging.Handler):
+    """
+    Handler passing each record to the error log of the file processed in the current context.
+
+    One router is attached to the logger for good. Since every file buffers
+    its own records, emitting does not take the handler's lock.
+    """
+
+    def handle(self, record):
+        error_log = _current_error_log.get()
+        if error_log is None or record.levelno < self.level or not self.filter(record):
+            return False
+        error_log.add(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+def _install_router(logger):
+    """
+    Attach the error log router to a logger unless it already has one.
+
+    Args:
+        logger (Logger): Logger instance
+    """
+    with _router_guard:
+        if not any(isinstance(handler, _ErrorLogRouter) for handler in logger.handlers):
+            logger.addHandler(_ErrorLogRouter(logging.WARNING))
 
 
 class LogHandler:
-    """Handles setting up and managing file-specific logging."""
+    """
+    Collects the errors logged while a file is processed and writes them to its error log.
+
+    Records are routed by context: the warnings and errors logged in the thread
+    or asyncio task that set up the handler (and in contexts copied from it)
+    go to this file only, so files processed concurrently do not write into
+    each other's logs. The error log is written once, by cleanup, and only if
+    an error was marked.
+    """
 
     def __init__(self, logger, output_dir):
         """
@@ -21,59 +174,82 @@ class LogHandler:
         """
         self.logger = logger
         self.output_dir = Path(output_dir)
-        self.file_handler = None
+        self.formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         self.error_log_path = None
         self.errors_logged = False
+        self.lines = []
+        self._token = None
 
     def setup_file_logger(self, filename):
         """
-        Set up a file logger for errors specific to a file.
+        Start collecting the errors of a file in the current context.
 
         Args:
             filename (str): Base filename for the log
 
         Returns:
-            logging.FileHandler: Configured file handler
+            LogHandler: This handler
         """
-        # Create a memory handler first that will only write to disk if errors occur
         self.error_log_path = self.output_dir / f"{filename}.errors.log"
-
-        # Using a custom handler that only creates the file when needed
-        self.file_handler = logging.FileHandler(self.error_log_path, mode='w', delay=True)
-        self.file_handler.setLevel(logging.WARNING)
-        file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        self.file_handler.setFormatter(file_format)
-        self.logger.addHandler(self.file_handler)
+        _install_router(self.logger)
+        self._token = _current_error_log.set(self)
 
         # Reset error tracking
         self.errors_logged = False
+        self.lines = []
+
+        return self
+
+    def add(self, record):
+        """
+        Buffer a record logged while the file is processed.
 
-        return self.file_handler
+        Args:
+            record (logging.LogRecord): Log record
+        """
+        self.lines.append(self.formatter.format(record))
 
     def mark_error(self):
         """Mark that an error has been logged."""
         self.errors_logged = True
 
+    def detach(self):
+        """Stop routing the records of the current context to this file."""
+        if self._token is None:
+            return
+        try:
+            _current_error_log.reset(self._token)
+        except ValueError:
+            # Called from a copy of the context the handler was set up in
+            _current_error_log.set(None)
+        self._token = None
+
     def cleanup(self):
-        """Clean up logging and remove empty log files."""
-        if self.file_handler:
-            self.logger.removeHandler(self.file_handler)
-            self.file_handler.close()
-            self.file_handler = None
+        """Stop collecting and write the error log if errors occurred."""
+        self.detach()
+        if not self.lines:
+            return
 
-            # Delete the error log file if no errors were logged
-            if not self.errors_logged and self.error_log_path and self.error_log_path.exists():
-                try:
-                    self.error_log_path.unlink()
-                    self.logger.info("No errors encountered - no error log file created")
-                except Exception as e:
-                    self.logger.info(f"Failed to remove empty error log: {str(e)}")
+        if not self.errors_logged:
+            self.logger.info("No errors encountered - no error log file created")
+        else:
+            try:
+                with open(self.error_log_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(self.lines) + "\n")
+            except OSError as e:
+                self.logger.warning(f"Failed to write error log {self.error_log_path}: {str(e)}")
+        self.lines = []
 
 
 class PDFProcessor:
     """Processes PDF files and exports results."""
 
-    def __init__(self, input_dir, output_dir, logger=None):
+    def __init__(self, input_dir, output_dir, logger=None, jobs=1, force=False, page_jobs=1,
+                 backend=BACKEND_PDFPLUMBER, templates=True, formats=DEFAULT_FORMATS,
+                 history=True, deltas=True, metrics_hooks=None, streaming=False,
+                 background_writes=True, recursive=False, order=ORDER_NEWEST, timeout=None,
+                 max_rss_mb=None, retries=DEFAULT_RETRIES, retry_backoff=DEFAULT_RETRY_BACKOFF,
+                 strict=False):
         """
         Initialize the processor.
 
@@ -81,78 +257,936 @@ class PDFProcessor:
             input_dir (str or Path): Directory containing PDF files
             output_dir (str or Path): Directory for output files
             logger (Logger, optional): Logger instance
+            jobs (int, optional): Number of worker processes used by process_directory;
+                0 or less uses all available CPUs
+            force (bool, optional): Reprocess files even if the manifest shows them unchanged
+            page_jobs (int, optional): Number of worker processes sharing the pages of a
+                single PDF; not used by the workers of the directory pool
+            backend (str, optional): Extraction backend of the parser, see PDFParser
+            templates (bool, optional): Reuse table geometry learned from earlier pages,
+                persisted in the output directory
+            formats (iterable, optional): Output formats to write, see writers.FORMATS;
+                the first one is the primary output returned for each file
+            history (bool, optional): Also store the extracted rows in the history
+                database in the output directory
+            deltas (bool, optional): Write the changes of each report against the
+                previous one to <date>.delta.csv; requires the history database
+            metrics_hooks (iterable, optional): Callables receiving the FileMetrics of
+                each processed file, e.g. a metrics.MetricsExporter
+            streaming (bool, optional): Stream the rows of each page straight to the
+                CSV file instead of building a DataFrame of the whole report, keeping
+                memory flat on very large documents; only the CSV format is supported
+            background_writes (bool, optional): When process_directory handles the files
+                in this process, write each file's outputs in a background thread while
+                the next file is parsed
+            recursive (bool, optional): Also find PDF files in the subdirectories of the
+                input directory, e.g. year/month folders of an archive
+            order (str, optional): Processing order of the files, see scheduler.ORDERS;
+                the newest report first by default
+            timeout (float, optional): Seconds the extraction of a file may take. With a
+                timeout or a memory limit, each file is extracted in an isolated worker
+                process that is killed when it exceeds a limit
+            max_rss_mb (float, optional): Megabytes of resident memory the worker
+                extracting a file may use
+            retries (int, optional): Times a killed file is retried before it is moved
+                to the failed directory of the output directory
+            retry_backoff (float, optional): Seconds before the first retry, doubled
+                for each further retry
+            strict (bool, optional): Reject a file whose extracted rows fail validation
+                instead of only logging the violations; streamed rows are not validated
+
+        Raises:
+            ValueError: If streaming is requested with other formats than CSV or with
+                strict validation, or the order is unknown
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.logger = logger or logging.getLogger(__name__)
+        self.jobs = resolve_jobs(jobs)
+        self.force = force
+        self.formats = parse_formats(formats)
+        check_formats(self.formats)
+        if streaming and self.formats != (FORMAT_CSV,):
+            raise ValueError("Streaming extraction writes CSV output only")
+        if streaming and strict:
+            raise ValueError("Streamed rows cannot be validated before they are written")
+        self.streaming = streaming
+        self.strict = strict
+        self.background_writes = background_writes
+        if order not in ORDERS:
+            raise ValueError(f"Unknown processing order: {order} (choose from {', '.join(ORDERS)})")
+        self.recursive = recursive
+        self.order = order
+        self.timeout = timeout
+        self.max_rss = int(max_rss_mb * 1024 * 1024) if max_rss_mb else None
+        self.isolated = bool(timeout or max_rss_mb)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        # Called with the path of a killed file when it is due for a retry
+        self.retry_callback = self.process_pdf_file
+        # Limit violations of the files waiting for a retry, by manifest key
+        self._failures = {}
+        self._failures_lock = threading.Lock()
+        # Isolated worker of process_pdf_file
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.metrics_hooks = list(metrics_hooks or [])
 
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Record of already processed inputs
+        self.manifest = Manifest(self.output_dir / MANIFEST_FILENAME, self.logger)
+
+        # Consolidated history of all report dates
+        self.history = (
+            HistoryStore(self.output_dir / HISTORY_FILENAME, self.logger) if history else None
+        )
+
+        # Day-over-day changes, computed from the reports in the history
+        self.deltas = (
+            DeltaTracker(self.history, self.output_dir, self.logger) if deltas and history else None
+        )
+
         # Initialize parser
-        self.parser = PDFParser(self.logger)
+        template_cache = (
+            TemplateCache(self.output_dir / TEMPLATES_FILENAME, self.logger) if templates else None
+        )
+        self.parser = PDFParser(
+            self.logger,
+            page_jobs=resolve_jobs(page_jobs),
+            backend=backend,
+            template_cache=template_cache
+        )
+
+        # Options passed on to the processors of the directory pool workers
+        self.worker_options = {
+            "backend": backend,
+            "templates": templates,
+            "formats": self.formats,
+            "history": history,
+            "deltas": False,
+            "streaming": streaming,
+            "strict": strict
+        }
+
+    def add_metrics_hook(self, hook):
+        """
+        Register a callable receiving the FileMetrics of each processed file.
+
+        Args:
+            hook (callable): Function taking a FileMetrics argument
+        """
+        self.metrics_hooks.append(hook)
+
+    def _emit_metrics(self, metrics):
+        """
+        Pass the metrics of a processed file to the registered hooks.
+
+        A failing hook is logged and does not affect the processing of the file.
+
+        Args:
+            metrics (FileMetrics): Metrics of the file
+        """
+        self.logger.debug(f"Timings of {metrics.path}: {metrics.summary()}")
+        for hook in self.metrics_hooks:
+            try:
+                hook(metrics)
+            except Exception as e:
+                self.logger.warning(f"Metrics hook failed for {metrics.path}: {str(e)}")
 
     def process_pdf_file(self, pdf_path):
         """
         Process a single PDF file and export the results.
 
+        Files whose content is unchanged since they were last processed, and whose
+        outputs in the requested formats still exist, are skipped unless the
+        processor was created with force.
+
         Args:
             pdf_path (str or Path): Path to the PDF file
 
         Returns:
-            tuple: (success status, output CSV path or None)
+            tuple: (success status, primary output path or None)
         """
         pdf_path = Path(pdf_path)
 
-        # Set up file-specific logging
+        entry = self._lookup_unchanged(pdf_path)
+        if entry:
+            return True, self._primary_output(entry)
+
+        if self.isolated:
+            return self._process_isolated(pdf_path)
+
+        metrics = FileMetrics(pdf_path)
+        success, extracted_date, outputs = self._process_pdf(pdf_path, metrics=metrics)
+        self._emit_metrics(metrics)
+        return self._record_result(pdf_path, success, extracted_date, outputs)
+
+    def discover_pdfs(self):
+        """
+        Find the PDF files in the input directory.
+
+        Files in the output directory are left out, in case it lies within the
+        input directory.
+
+        Returns:
+            list: Paths of the PDF files in sorted order
+        """
+        pattern = "**/*.pdf" if self.recursive else "*.pdf"
+        output_dir = self.output_dir.resolve()
+        return sorted(
+            path for path in self.input_dir.glob(pattern)
+            if path.is_file() and output_dir not in path.resolve().parents
+        )
+
+    def probe_date(self, pdf_path):
+        """
+        Probe the report date of a PDF file for ordering it.
+
+        The date recorded in the manifest is used if the file was processed
+        before; otherwise it is taken from the file name or the PDF header.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            date: Report date or None if it could not be determined
+        """
+        entry = self.manifest.entries.get(self.manifest.key(pdf_path))
+        if entry and entry.get("date"):
+            try:
+                return datetime.strptime(entry["date"], "%d-%m-%Y").date()
+            except ValueError:
+                pass
+        return probe_date(pdf_path, self.parser, self.logger)
+
+    def order_files(self, pdf_files):
+        """
+        Order PDF files in the processing order of the processor.
+
+        Args:
+            pdf_files (iterable): Paths of the PDF files
+
+        Returns:
+            list: Paths in processing order
+        """
+        return order_files(pdf_files, self.order, self.probe_date)
+
+    def create_scheduler(self):
+        """
+        Create a scheduler processing files one at a time in the processing order.
+
+        Files reported by the watcher are given to its submit_live method, which
+        queues them ahead of the backfill given to submit_backfill.
+
+        Files killed for exceeding a limit are queued on the scheduler again when
+        they are due for a retry.
+
+        The manifest is saved periodically while files are queued, see
+        Manifest.deferred, and once the queue is drained, rather than after every file.
+
+        Returns:
+            WorkScheduler: Scheduler calling process_pdf_file, not started yet
+        """
+        scheduler = WorkScheduler(self.process_pdf_file, self.order, self.probe_date, self.logger,
+                                  batch=self.manifest.deferred)
+        self.retry_callback = scheduler.put
+        return scheduler
+
+    def _isolated_worker(self):
+        """
+        Create a worker process extracting files under the limits of the processor.
+
+        The worker owns a processor like the workers of the directory pool.
+
+        Returns:
+            IsolatedWorker: Worker, started on first use
+        """
+        init_args = (
+            self.input_dir,
+            self.output_dir,
+            self.logger.name,
+            self.logger.getEffectiveLevel(),
+            self.worker_options
+        )
+        return IsolatedWorker(
+            _process_in_worker, _init_worker, init_args, self.timeout, self.max_rss, self.logger
+        )
+
+    def _run_isolated(self, worker, pdf_path):
+        """
+        Process a PDF file in an isolated worker and pass its metrics to the hooks.
+
+        Args:
+            worker (IsolatedWorker): Worker to run the file in
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            tuple: (success status, extracted date, output paths), or None if the
+                worker was killed for exceeding a limit
+        """
+        key = self.manifest.key(pdf_path)
+        start = time.perf_counter()
+        try:
+            result, metrics = worker.run(pdf_path)
+        except IsolationError as e:
+            self.logger.error(f"Stopped extracting {pdf_path}: {str(e)}")
+            with self._failures_lock:
+                self._failures.setdefault(key, []).append(str(e))
+            metrics = FileMetrics(pdf_path)
+            metrics.add_time(STAGE_TOTAL, time.perf_counter() - start)
+            metrics.success = False
+            self._emit_metrics(metrics)
+            return None
+
+        with self._failures_lock:
+            self._failures.pop(key, None)
+        self._emit_metrics(FileMetrics.from_dict(metrics))
+        return result
+
+    def _retry_delay(self, attempt):
+        """
+        Get the backoff before a retry.
+
+        Args:
+            attempt (int): Number of the retry, starting at 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        return self.retry_backoff * 2 ** (attempt - 1)
+
+    def _process_isolated(self, pdf_path):
+        """
+        Process a single PDF file in the isolated worker of the processor.
+
+        A file killed for exceeding a limit is handed to retry_callback after a
+        backoff, without blocking the files that follow, and quarantined once
+        its retries are used up.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            tuple: (success status, primary output path or None)
+        """
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = self._isolated_worker()
+            result = self._run_isolated(self._worker, pdf_path)
+
+        if result is None:
+            with self._failures_lock:
+                attempts = len(self._failures.get(self.manifest.key(pdf_path), []))
+            if attempts > self.retries:
+                self.quarantine(pdf_path)
+            else:
+                delay = self._retry_delay(attempts)
+                self.logger.info(f"Retrying {pdf_path} in {delay:g}s")
+                timer = threading.Timer(delay, self.retry_callback, [pdf_path])
+                timer.daemon = True
+                timer.start()
+            return False, None
+
+        success, extracted_date, outputs = result
+        if success and self.deltas:
+            # The worker only stores the report; its deltas are written here
+            with date_lock(extracted_date, self.output_dir):
+                self.deltas.update(extracted_date, self.history.read_report(extracted_date))
+        return self._record_result(pdf_path, success, extracted_date, outputs)
+
+    def quarantine(self, pdf_path):
+        """
+        Move a PDF file that kept exceeding the limits to the failed directory.
+
+        The reasons of each attempt are written to <name>.errors.log next to it.
+        If the file cannot be moved, e.g. from a read-only share, it is copied.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            Path: Path of the quarantined file, or None if it could not be saved
+        """
+        with self._failures_lock:
+            reasons = self._failures.pop(self.manifest.key(pdf_path), [])
+        failed_dir = self.output_dir / FAILED_DIRNAME
+        failed_dir.mkdir(exist_ok=True)
+        target = failed_dir / pdf_path.name
+
+        try:
+            shutil.move(str(pdf_path), target)
+        except OSError as e:
+            self.logger.warning(f"Failed to move {pdf_path}, copying it instead: {str(e)}")
+            try:
+                shutil.copy2(pdf_path, target)
+            except OSError as e:
+                self.logger.error(f"Failed to copy {pdf_path} to {failed_dir}: {str(e)}")
+                target = None
+
+        log_path = failed_dir / f"{pdf_path.stem}.errors.log"
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with open(log_path, "w", encoding="utf-8") as f:
+                for attempt, reason in enumerate(reasons, 1):
+                    f.write(f"{timestamp} - ERROR - Attempt {attempt} of {pdf_path}: {reason}\n")
+        except OSError as e:
+            self.logger.warning(f"Failed to write error log {log_path}: {str(e)}")
+
+        self.logger.error(
+            f"Quarantined {pdf_path} to {failed_dir} after {len(reasons)} failed attempts"
+        )
+        return target
+
+    def _lookup_unchanged(self, pdf_path):
+        """
+        Look up a PDF file in the manifest unless processing is forced.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            dict: Manifest entry if the file can be skipped, None otherwise
+        """
+        if self.force:
+            return None
+
+        entry = self.manifest.lookup(pdf_path)
+        if entry and not (self._has_outputs(entry) and self._has_history(entry)):
+            entry = None
+        if entry:
+            self.logger.info(f"Skipping unchanged PDF: {pdf_path}")
+        return entry
+
+    def _has_outputs(self, entry):
+        """
+        Check that a manifest entry holds an output for every requested format.
+
+        Args:
+            entry (dict): Manifest entry
+
+        Returns:
+            bool: True if no requested format is missing from the entry
+        """
+        wanted = output_paths(self.output_dir, entry["date"], self.formats)
+        recorded = set(entry.get("outputs", []))
+        return all(str(path) in recorded for path in wanted)
+
+    def _has_history(self, entry):
+        """
+        Check that the report date of a manifest entry is in the history store.
+
+        Args:
+            entry (dict): Manifest entry
+
+        Returns:
+            bool: True if the date is stored or the history store is disabled
+        """
+        return self.history is None or self.history.has_report(entry["date"])
+
+    def _primary_output(self, entry):
+        """
+        Get the primary output path of a manifest entry.
+
+        Args:
+            entry (dict): Manifest entry
+
+        Returns:
+            Path: Output path in the first requested format
+        """
+        return output_paths(self.output_dir, entry["date"], self.formats[:1])[0]
+
+    def _record_result(self, pdf_path, success, extracted_date, outputs):
+        """
+        Record a processed PDF file in the manifest.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            success (bool): Whether the file was processed successfully
+            extracted_date (str): Date extracted from the PDF
+            outputs (list): Paths of the written output files
+
+        Returns:
+            tuple: (success status, primary output path or None)
+        """
+        if not success:
+            return False, None
+
+        self.manifest.record(pdf_path, extracted_date, outputs)
+        return True, outputs[0]
+
+    def _process_pdf(self, pdf_path, update_deltas=True, metrics=None):
+        """
+        Extract data from a PDF file and write the output files.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            update_deltas (bool, optional): Write the deltas affected by the report
+            metrics (FileMetrics, optional): Metrics to record stage timings and counters in
+
+        Returns:
+            tuple: (success status, extracted date, list of output paths with the primary first)
+        """
+        if metrics is None:
+            metrics = FileMetrics(pdf_path)
+        with metrics.stage(STAGE_TOTAL):
+            result = self._extract_and_write(pdf_path, update_deltas, metrics)
+        metrics.success, metrics.date, _ = result
+        return result
+
+    def _extract_and_write(self, pdf_path, update_deltas, metrics):
+        """
+        Extract data from a PDF file and write the output files, recording metrics.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            update_deltas (bool): Write the deltas affected by the report
+            metrics (FileMetrics): Metrics to record stage timings and counters in
+
+        Returns:
+            tuple: (success status, extracted date, list of output paths with the primary first)
+        """
+        # Collect the errors of this file for its error log
         log_handler = LogHandler(self.logger, self.output_dir)
-        file_handler = log_handler.setup_file_logger(pdf_path.stem)
+        log_handler.setup_file_logger(pdf_path.stem)
+        try:
+            if self.streaming:
+                return self._stream_rows(pdf_path, update_deltas, metrics, log_handler)
+
+            df, extracted_date = self._extract(pdf_path, metrics, log_handler)
+            if df.empty:
+                return False, extracted_date, []
 
-        # Extract data with error tracking
+            outputs = self._write(pdf_path, df, extracted_date, update_deltas, metrics)
+            return True, extracted_date, outputs
+        finally:
+            log_handler.cleanup()
+
+    def _extract(self, pdf_path, metrics, log_handler):
+        """
+        Extract data from a PDF file.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            metrics (FileMetrics): Metrics to record stage timings and counters in
+            log_handler (LogHandler): Error log of the PDF
+
+        Returns:
+            tuple: (DataFrame of extracted data, extracted date)
+        """
+        diagnostics = RowDiagnostics()
         df, extracted_date, errors_occurred = self.parser.extract_data_from_pdf(
             pdf_path,
-            error_callback=log_handler.mark_error
+            error_callback=log_handler.mark_error,
+            metrics=metrics,
+            diagnostics=diagnostics
         )
-
-        # Clean up logging
-        log_handler.cleanup()
+        self._write_rejects(pdf_path, diagnostics)
 
         if df.empty:
             self.logger.error(f"No data extracted from {pdf_path}")
-            return False, None
+            return df, extracted_date
 
-        # Create output filenames based on extracted date
-        csv_filename = self.output_dir / f"{extracted_date}.csv"
-        excel_filename = self.output_dir / f"{extracted_date}.xlsx"
+        if not self._validate(pdf_path, df, metrics, log_handler):
+            return df.iloc[:0], extracted_date
+        return df, extracted_date
 
-        # Save to CSV with UTF-8 encoding (with BOM for Excel compatibility)
-        df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+    def _validate(self, pdf_path, df, metrics, log_handler):
+        """
+        Check the extracted rows of a PDF file and log their violations to its error log.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            df (DataFrame): Extracted data
+            metrics (FileMetrics): Metrics to record the validation time and violations in
+            log_handler (LogHandler): Error log of the PDF
 
-        # Also save to Excel for easier viewing
-        df.to_excel(excel_filename, index=False)
+        Returns:
+            bool: False if the file is rejected in strict mode, True otherwise
+        """
+        with metrics.stage(STAGE_VALIDATE):
+            result = validate_frame(df)
+        metrics.set(COUNTER_VALIDATION_VIOLATIONS, len(result))
+        if not result:
+            return True
 
-        self.logger.info(f"Saved {len(df)} records to {csv_filename} and {excel_filename}")
-        return True, csv_filename
+        self.logger.warning(result.summary(pdf_path))
+        for line in result.details():
+            self.logger.warning(line)
+        log_handler.mark_error()
 
-    def process_directory(self):
+        if self.strict:
+            self.logger.error(f"Rejected {pdf_path}: its rows failed validation")
+            return False
+        return True
+
+    def _write_rejects(self, pdf_path, diagnostics):
+        """
+        Write the rows of a PDF file that could not be parsed to its rejects file.
+
+        A rejects file left by an earlier run is removed if no rows were rejected.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            diagnostics (RowDiagnostics): Rejected rows of the file
+        """
+        path = self.output_dir / f"{pdf_path.stem}{REJECTS_SUFFIX}"
+        try:
+            if diagnostics.rejects:
+                diagnostics.write_rejects(path)
+                self.logger.info(f"Saved {len(diagnostics.rejects)} rejected rows to {path}")
+            elif path.exists():
+                path.unlink()
+        except OSError as e:
+            self.logger.warning(f"Failed to write rejected rows of {pdf_path}: {str(e)}")
+
+    def _write(self, pdf_path, df, extracted_date, update_deltas, metrics):
+        """
+        Write the output files of an extracted report and store it in the history.
+
+        The outputs, the history and the deltas of the date are updated under one
+        date lock, so two reports of the same date are stored one after the other.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            df (DataFrame): Extracted data
+            extracted_date (str): Date extracted from the PDF
+            update_deltas (bool): Write the deltas affected by the report
+            metrics (FileMetrics): Metrics to record stage timings and counters in
+
+        Returns:
+            list: Output paths with the primary first
+        """
+        with date_lock(extracted_date, self.output_dir):
+            # Output files are named after the extracted date
+            outputs = write_outputs(
+                df, self.output_dir, extracted_date, self.formats, metrics=metrics
+            )
+
+            if self.history:
+                with metrics.stage(STAGE_HISTORY):
+                    self.history.upsert(extracted_date, df, source=pdf_path.name)
+
+            if self.deltas and update_deltas:
+                with metrics.stage(STAGE_DELTAS):
+                    self.deltas.update(extracted_date, df)
+
+        self.logger.info(f"Saved {len(df)} records to {', '.join(str(path) for path in outputs)}")
+        return outputs
+
+    def _stream_rows(self, pdf_path, update_deltas, metrics, log_handler):
+        """
+        Stream the rows of a PDF file to its CSV output page by page.
+
+        The history store is then filled from the written CSV file, again one
+        row at a time. The CSV output, the history and the deltas of the date are
+        updated under one date lock.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            update_deltas (bool): Write the deltas affected by the report
+            metrics (FileMetrics): Metrics to record stage timings and counters in
+            log_handler (LogHandler): Error log of the PDF
+
+        Returns:
+            tuple: (success status, extracted date, list with the CSV output path)
+        """
+        self.logger.info(f"Processing PDF: {pdf_path}")
+        try:
+            with metrics.stage(STAGE_HEADER):
+                extracted_date = self.parser.read_date(pdf_path)
+        except Exception as e:
+            self.logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
+            log_handler.mark_error()
+            return False, None, []
+        if extracted_date:
+            self.logger.info(f"Extracted date: {extracted_date}")
+        else:
+            extracted_date = datetime.now().strftime("%d-%m-%Y")
+            self.logger.warning(f"No date found in PDF. Using current date: {extracted_date}")
+            log_handler.mark_error()
+
+        with date_lock(extracted_date, self.output_dir):
+            try:
+                output = output_paths(self.output_dir, extracted_date, self.formats)[0]
+                diagnostics = RowDiagnostics()
+                rows = self.parser.iter_rows(pdf_path, error_callback=log_handler.mark_error,
+                                             metrics=metrics, diagnostics=diagnostics)
+                with metrics.stage(write_stage(FORMAT_CSV)):
+                    count = write_csv_rows(rows, output, keep_empty=False)
+                self._write_rejects(pdf_path, diagnostics)
+            except Exception as e:
+                self.logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
+                log_handler.mark_error()
+                return False, None, []
+
+            if not count:
+                self.logger.error(f"No data extracted from {pdf_path}")
+                log_handler.mark_error()
+                return False, extracted_date, []
+
+            if self.history:
+                with metrics.stage(STAGE_HISTORY):
+                    with open(output, encoding="utf-8-sig", newline="") as f:
+                        reader = csv.reader(f)
+                        next(reader)
+                        self.history.upsert_rows(extracted_date, reader, source=pdf_path.name)
+
+            if self.deltas and update_deltas:
+                with metrics.stage(STAGE_DELTAS):
+                    self.deltas.update(extracted_date, self.history.read_report(extracted_date))
+
+        self.logger.info(f"Saved {count} records to {output}")
+        return True, extracted_date, [output]
+
+    def process_directory(self, jobs=None):
         """
         Process all PDF files in the input directory.
 
+        Files are processed in the processing order, by default the newest report
+        first, and found in subdirectories too if the processor is recursive. With
+        more than one job the files are spread across a process pool and the results
+        are gathered in the same order; with one job each file's outputs are written
+        in a background thread while the next file is parsed, unless disabled.
+        With a timeout or memory limit the files are extracted in isolated worker
+        processes instead, see _process_files_isolated. Unchanged files recorded in
+        the manifest are skipped unless forced. The deltas of the new reports are
+        written afterwards in date order.
+
+        Args:
+            jobs (int, optional): Number of worker processes, overriding the value
+                given to the constructor; 0 or less uses all available CPUs
+
         Returns:
             list: List of successfully processed output files
         """
         self.logger.info(f"Processing all PDFs in {self.input_dir}")
 
-        pdf_files = list(self.input_dir.glob("*.pdf"))
+        pdf_files = self.discover_pdfs()
 
         if not pdf_files:
             self.logger.warning(f"No PDF files found in {self.input_dir}")
             return []
 
+        with self.manifest.deferred():
+            results = {}
+            pending = []
+            for pdf_file in pdf_files:
+                entry = self._lookup_unchanged(pdf_file)
+                if entry:
+                    results[pdf_file] = (True, self._primary_output(entry))
+                else:
+                    pending.append(pdf_file)
+            pending = self.order_files(pending)
+
+            jobs = min(self.jobs if jobs is None else resolve_jobs(jobs), len(pending))
+
+            if self.isolated and pending:
+                processed = self._process_files_isolated(pending, jobs)
+            elif jobs > 1:
+                processed = self._process_files_in_pool(pending, jobs)
+            elif self.background_writes and not self.streaming and len(pending) > 1:
+                processed = self._process_files_with_writer(pending)
+            else:
+                processed = (self._process_and_emit(pdf_file) for pdf_file in pending)
+
+            stored_dates = []
+            for pdf_file, (success, extracted_date, outputs) in zip(pending, processed):
+                results[pdf_file] = self._record_result(pdf_file, success, extracted_date, outputs)
+                if success:
+                    stored_dates.append(extracted_date)
+
+        # Write the deltas of all new reports in one pass over the dates
+        if self.deltas:
+            self.deltas.build_chain(stored_dates)
+
         output_files = []
         for pdf_file in pdf_files:
-            success, output_file = self.process_pdf_file(pdf_file)
+            success, output_file = results[pdf_file]
             if success and output_file:
                 output_files.append(output_file)
 
-        return output_files
\ No newline at end of file
+        return output_files
+
+    def _process_and_emit(self, pdf_path):
+        """
+        Process a PDF file of a directory run and pass its metrics to the hooks.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            tuple: (success status, extracted date, output paths)
+        """
+        metrics = FileMetrics(pdf_path)
+        result = self._process_pdf(pdf_path, update_deltas=False, metrics=metrics)
+        self._emit_metrics(metrics)
+        return result
+
+    def _process_files_with_writer(self, pdf_files):
+        """
+        Process PDF files in this process, writing their outputs in a background thread.
+
+        While the outputs of one file are written and stored in the history, the
+        next file is already being parsed.
+
+        Args:
+            pdf_files (list): Paths of the PDF files to process
+
+        Returns:
+            list: (success status, extracted date, output paths) per file, in input order
+        """
+        with BackgroundWriter() as writer:
+            futures = [self._submit_pdf(pdf_file, writer) for pdf_file in pdf_files]
+        return [future.result() for future in futures]
+
+    def _submit_pdf(self, pdf_path, writer):
+        """
+        Extract data from a PDF file and queue the writing of its outputs.
+
+        The write job runs in a copy of the current context, so its errors still
+        go to the file's error log, which the job writes when it is done.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            writer (BackgroundWriter): Writer running the output jobs
+
+        Returns:
+            concurrent.futures.Future: (success status, extracted date, output paths)
+        """
+        metrics = FileMetrics(pdf_path)
+        start = time.perf_counter()
+        log_handler = LogHandler(self.logger, self.output_dir)
+        log_handler.setup_file_logger(pdf_path.stem)
+        try:
+            df, extracted_date = self._extract(pdf_path, metrics, log_handler)
+            if not df.empty:
+                return writer.submit(self._finish_in_background, pdf_path, df, extracted_date,
+                                     metrics, start, log_handler)
+        except BaseException:
+            log_handler.cleanup()
+            raise
+        finally:
+            log_handler.detach()
+
+        future = Future()
+        future.set_result(self._finish_in_background(pdf_path, None, extracted_date, metrics, start,
+                                                     log_handler))
+        return future
+
+    def _finish_in_background(self, pdf_path, df, extracted_date, metrics, start, log_handler):
+        """
+        Write the outputs of an extracted report and pass its metrics to the hooks.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+            df (DataFrame): Extracted data, or None if nothing was extracted
+            extracted_date (str): Date extracted from the PDF
+            metrics (FileMetrics): Metrics of the file
+            start (float): perf_counter value when processing of the file started
+            log_handler (LogHandler): Error log of the PDF
+
+        Returns:
+            tuple: (success status, extracted date, output paths)
+        """
+        result = False, extracted_date, []
+        if df is not None:
+            try:
+                outputs = self._write(pdf_path, df, extracted_date, False, metrics)
+                result = True, extracted_date, outputs
+            except Exception as e:
+                self.logger.error(f"Failed to write the outputs of {pdf_path}: {str(e)}")
+                log_handler.mark_error()
+        log_handler.cleanup()
+
+        metrics.add_time(STAGE_TOTAL, time.perf_counter() - start)
+        metrics.success, metrics.date, _ = result
+        self._emit_metrics(metrics)
+        return result
+
+    def _process_files_isolated(self, pdf_files, jobs):
+        """
+        Process PDF files in isolated worker processes under the limits of the processor.
+
+        Files killed for exceeding a limit are retried with backoff once the
+        other files are done, and quarantined when their retries are used up.
+
+        Args:
+            pdf_files (list): Paths of the PDF files to process
+            jobs (int): Number of worker processes
+
+        Returns:
+            list: (success status, extracted date, output paths) per file, in input order
+        """
+        self.logger.info(f"Processing {len(pdf_files)} PDFs in {jobs} isolated worker processes")
+
+        local = threading.local()
+        workers = []
+
+        def run(pdf_path):
+            worker = getattr(local, "worker", None)
+            if worker is None:
+                worker = local.worker = self._isolated_worker()
+                workers.append(worker)
+            return self._run_isolated(worker, pdf_path)
+
+        results = {}
+        remaining = list(pdf_files)
+        try:
+            with ThreadPoolExecutor(
+                max_workers=jobs, thread_name_prefix="isolated-extractor"
+            ) as executor:
+                for attempt in range(self.retries + 1):
+                    if attempt:
+                        delay = self._retry_delay(attempt)
+                        self.logger.info(f"Retrying {len(remaining)} PDFs in {delay:g}s")
+                        time.sleep(delay)
+                    for pdf_path, result in zip(remaining, list(executor.map(run, remaining))):
+                        if result is not None:
+                            results[pdf_path] = result
+                    remaining = [pdf_path for pdf_path in remaining if pdf_path not in results]
+                    if not remaining:
+                        break
+        finally:
+            for worker in workers:
+                worker.close()
+
+        for pdf_path in remaining:
+            self.quarantine(pdf_path)
+            results[pdf_path] = (False, None, [])
+        return [results[pdf_path] for pdf_path in pdf_files]
+
+    def _process_files_in_pool(self, pdf_files, jobs):
+        """
+        Process PDF files across a pool of worker processes.
+
+        Each worker owns its own processor, so per-file error logs are written
+        by the process that handled the file. The manifest is only updated, and
+        the metrics hooks only called, by the calling process. The workers are
+        spawned rather than forked, as the pool may be started while the watcher,
+        scheduler and writer threads are running.
+
+        Args:
+            pdf_files (list): Paths of the PDF files to process
+            jobs (int): Number of worker processes
+
+        Returns:
+            list: (success status, extracted date, output paths) per file, in input order
+        """
+        self.logger.info(f"Processing {len(pdf_files)} PDFs with {jobs} worker processes")
+
+        init_args = (
+            self.input_dir,
+            self.output_dir,
+            self.logger.name,
+            self.logger.getEffectiveLevel(),
+            self.worker_options
+        )
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=init_args,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = []
+            for result, metrics in executor.map(_process_in_worker, pdf_files):
+                self._emit_metrics(FileMetrics.from_dict(metrics))
+                results.append(result)
+            return results
@@ -0,0 +1,342 @@
+"""
+Time-series queries over the history database.
+
+Queries are answered from a compact index derived from the history store:
+one fixed-width record per stored row, sorted by emission code and report
+date, saved as a NumPy file and memory-mapped on load. Company names and
+emission codes are kept once in a JSON sidecar and referenced by number.
+The index is rebuilt whenever the data version of the store changes.
+"""
+
+import json
+import logging
+import os
+from datetime import date as Date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..constants import CSV_COLUMNS, HISTORY_FILENAME, HISTORY_INDEX_FILENAME
+from .history import HistoryStore, iso_date
+
+# Record layout of the index: report date as days since 1970-01-01, the
+# numbers of the emission code and company name, and the numeric columns
+INDEX_DTYPE = np.dtype([
+    ("date", "<i4"),
+    ("code", "<i4"),
+    ("company", "<i4"),
+    ("total_shares", "<i8"),
+    ("free_float", "<i8"),
+    ("shareholders", "<i8"),
+])
+
+# Column of the query results holding the report date
+DATE_COLUMN = "Date"
+
+
+def _day_number(report_date):
+    """
+    Convert a report date to days since 1970-01-01.
+
+    Args:
+        report_date (str): Date as DD-MM-YYYY or YYYY-MM-DD
+
+    Returns:
+        int: Day number
+    """
+    return (Date.fromisoformat(iso_date(report_date)) - Date(1970, 1, 1)).days
+
+
+class HistoryIndex:
+    """
+    Memory-mapped index of the history store answering history and as-of queries.
+
+    Example:
+        index = HistoryIndex.open("/path/to/output")
+        index.history(codes=["BG1100017174"], start="01-01-2023")
+        index.snapshot("28-02-2025")
+    """
+
+    def __init__(self, store, index_path=None, logger=None):
+        """
+        Initialize the index, building it if it is missing or out of date.
+
+        Args:
+            store (HistoryStore): History store the index is derived from
+            index_path (str or Path, optional): Path of the index metadata file;
+                next to the store by default
+            logger (Logger, optional): Logger instance
+        """
+        self.store = store
+        self.path = Path(index_path) if index_path else store.path.with_name(HISTORY_INDEX_FILENAME)
+        self.logger = logger or logging.getLogger(__name__)
+        self.version = None
+        self.records = np.empty(0, dtype=INDEX_DTYPE)
+        self.codes = []
+        self.companies = []
+        self._code_names = np.empty(0, dtype=object)
+        self._company_names = np.empty(0, dtype=object)
+        self._code_numbers = {}
+        self.refresh()
+
+    @classmethod
+    def open(cls, output_dir, logger=None):
+        """
+        Open the index of the history store in an output directory.
+
+        Args:
+            output_dir (str or Path): Output directory holding the history database
+            logger (Logger, optional): Logger instance
+
+        Returns:
+            HistoryIndex: Up to date index
+
+        Raises:
+            FileNotFoundError: If the directory holds no history database
+        """
+        path = Path(output_dir) / HISTORY_FILENAME
+        if not path.exists():
+            raise FileNotFoundError(f"No history database found: {path}")
+        return cls(HistoryStore(path, logger), logger=logger)
+
+    def refresh(self):
+        """
+        Load the index, rebuilding it first if the store changed since it was built.
+
+        Cheap when nothing changed, so it is called before every query.
+        """
+        version = self.store.version()
+        if version == self.version:
+            return
+
+        meta = self._read_meta()
+        if meta is None or meta["version"] != version:
+            meta = self._build()
+
+        records_path = self.path.with_name(meta["records"])
+        # Memory-mapping an empty file fails, so an empty index is read normally
+        self.records = np.load(records_path, mmap_mode="r" if meta["rows"] else None)
+        self.codes = meta["codes"]
+        self.companies = meta["companies"]
+        self._code_names = np.array(self.codes, dtype=object)
+        self._company_names = np.array(self.companies, dtype=object)
+        self._code_numbers = {code: number for number, code in enumerate(self.codes)}
+        self.version = meta["version"]
+
+    def _read_meta(self):
+        """
+        Read the index metadata.
+
+        Returns:
+            dict: Metadata or None if the index is missing or unreadable
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if not self.path.with_name(meta["records"]).exists():
+                return None
+            return meta
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _build(self):
+        """
+        Build the index from the store and write it to disk.
+
+        The records are written to a file named after the data version before
+        the metadata is atomically replaced, so readers never see a mix of two
+        versions; indexes of older versions are removed afterwards.
+
+        Returns:
+            dict: Metadata of the new index
+        """
+        # Read the version and the rows from the same snapshot of the store
+        connection = self.store.connection()
+        connection.execute("BEGIN")
+        try:
+            version = self.store.version()
+            rows = connection.execute(
+                "SELECT report_date, emission_code, company, total_shares, free_float, "
+                "shareholders FROM free_float ORDER BY emission_code, report_date"
+            ).fetchall()
+        finally:
+            connection.execute("COMMIT")
+
+        self.logger.info(f"Building history index for version {version} of {self.store.path}")
+
+        codes = sorted({row[1] for row in rows})
+        code_numbers = {code: number for number, code in enumerate(codes)}
+        companies = sorted({row[2] or "" for row in rows})
+        company_numbers = {company: number for number, company in enumerate(companies)}
+
+        records = np.empty(len(rows), dtype=INDEX_DTYPE)
+        if rows:
+            dates, row_codes, row_companies, total, free_float, shareholders = zip(*rows)
+            records["date"] = (
+                np.array(dates, dtype="datetime64[D]") - np.datetime64(0, "D")
+            ).astype("i4")
+            records["code"] = [code_numbers[code] for code in row_codes]
+            records["company"] = [company_numbers[company or ""] for company in row_companies]
+            records["total_shares"] = total
+            records["free_float"] = free_float
+            records["shareholders"] = shareholders
+
+        records_name = f"{self.path.stem}.{version}.npy"
+        records_path = self.path.with_name(records_name)
+        tmp_path = records_path.with_name(f"{records_name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, records)
+        os.replace(tmp_path, records_path)
+
+        meta = {
+            "version": version,
+            "records": records_name,
+            "rows": len(records),
+            "codes": codes,
+            "companies": companies
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+        for old_path in self.path.parent.glob(f"{self.path.stem}.*.npy"):
+            if old_path != records_path:
+                try:
+                    old_path.unlink()
+                except OSError:
+                    pass
+
+        return meta
+
+    def _code_slice(self, code_number):
+        """
+        Get the range of records of an emission code.
+
+        Args:
+            code_number (int): Number of the emission code
+
+        Returns:
+            tuple: (start, end) record positions
+        """
+        codes = self.records["code"]
+        return (int(np.searchsorted(codes, code_number, side="left")),
+                int(np.searchsorted(codes, code_number, side="right")))
+
+    def _match_companies(self, companies):
+        """
+        Find the numbers of the emission codes whose company name matches.
+
+        Args:
+            companies (list): Case-insensitive substrings of company names
+
+        Returns:
+            set: Numbers of the matching emission codes
+        """
+        patterns = [company.casefold() for company in companies]
+        numbers = [number for number, name in enumerate(self.companies)
+                   if any(pattern in name.casefold() for pattern in patterns)]
+        if not numbers:
+            return set()
+        mask = np.isin(self.records["company"], numbers)
+        return set(np.unique(self.records["code"][mask]).tolist())
+
+    def _frame(self, records):
+        """
+        Convert index records to a result DataFrame.
+
+        Args:
+            records (numpy.ndarray): Index records
+
+        Returns:
+            DataFrame: Rows with the report date and the CSV columns
+        """
+        company, code, total, free_float, shareholders = CSV_COLUMNS
+        dates = np.datetime64(0, "D") + records["date"].astype("timedelta64[D]")
+        return pd.DataFrame({
+            DATE_COLUMN: np.datetime_as_string(dates, unit="D"),
+            company: self._company_names[records["company"]],
+            code: self._code_names[records["code"]],
+            total: np.asarray(records["total_shares"], dtype="int64"),
+            free_float: np.asarray(records["free_float"], dtype="int64"),
+            shareholders: np.asarray(records["shareholders"], dtype="int64"),
+        })
+
+    def _selected_codes(self, codes, companies):
+        """
+        Find the numbers of the emission codes selected by a query.
+
+        Args:
+            codes (list): Emission codes, or None
+            companies (list): Case-insensitive substrings of company names, or None
+
+        Returns:
+            list: Sorted code numbers, or None if neither codes nor companies are given
+        """
+        if codes is None and companies is None:
+            return None
+
+        numbers = {self._code_numbers[code] for code in codes or [] if code in self._code_numbers}
+        if companies:
+            numbers |= self._match_companies(companies)
+        return sorted(numbers)
+
+    def history(self, codes=None, companies=None, start=None, end=None):
+        """
+        Get the history of emissions over a date range.
+
+        Args:
+            codes (list, optional): Emission codes
+            companies (list, optional): Case-insensitive substrings of company names
+            start (str, optional): First report date, inclusive
+            end (str, optional): Last report date, inclusive
+
+        Returns:
+            DataFrame: Rows ordered by emission code and report date; all
+                emissions if neither codes nor companies are given
+        """
+        self.refresh()
+
+        numbers = self._selected_codes(codes, companies)
+        if numbers is None:
+            records = self.records
+        elif numbers:
+            records = np.concatenate([
+                self.records[first:last] for first, last in map(self._code_slice, numbers)
+            ])
+        else:
+            records = self.records[:0]
+
+        mask = np.ones(len(records), dtype=bool)
+        if start is not None:
+            mask &= records["date"] >= _day_number(start)
+        if end is not None:
+            mask &= records["date"] <= _day_number(end)
+        return self._frame(records[mask])
+
+    def snapshot(self, as_of, codes=None, companies=None):
+        """
+        Get the report in effect on a date: the latest report on or before it.
+
+        Args:
+            as_of (str): Date of the snapshot
+            codes (list, optional): Emission codes
+            companies (list, optional): Case-insensitive substrings of company names
+
+        Returns:
+            DataFrame: Rows of the report, ordered by emission code; empty if
+                no report precedes the date
+        """
+        self.refresh()
+
+        dates = self.records["date"]
+        earlier = dates[dates <= _day_number(as_of)]
+        if not len(earlier):
+            return self._frame(self.records[:0])
+
+        mask = dates == earlier.max()
+        numbers = self._selected_codes(codes, companies)
+        if numbers is not None:
+            mask &= np.isin(self.records["code"], numbers)
+        return self._frame(self.records[mask])
@@ -0,0 +1,325 @@
+"""
+Ordering of the PDF files waiting to be processed.
+
+Files are ordered by their report date, newest first by default, so that
+the latest report of an archive is written before the backfill of older
+ones. The date is probed cheaply: from the file name when it holds one,
+otherwise from the header of the first page.
+
+WorkScheduler runs the files on a background thread in that order. Files
+reported by the watcher are queued as live work and taken before any queued
+backfill, so a new report never waits behind an archive being processed.
+A file that is already being parsed is finished first; preemption happens
+between files.
+"""
+
+import heapq
+import logging
+import re
+import threading
+from contextlib import ExitStack
+from datetime import date, datetime
+from pathlib import Path
+
+# Processing orders
+ORDER_NEWEST = "newest"
+ORDER_OLDEST = "oldest"
+ORDER_NAME = "name"
+ORDERS = (ORDER_NEWEST, ORDER_OLDEST, ORDER_NAME)
+
+# Priorities of queued work, lowest first
+PRIORITY_LIVE = 0
+PRIORITY_BACKFILL = 1
+
+# Dates in file names: DD-MM-YYYY (as the output files) or YYYY-MM-DD, with -, _ or . separators,
+# or YYYYMMDD
+_FILENAME_DATES = (
+    (re.compile(r"(?<!\d)(\d{2})[-_.](\d{2})[-_.](\d{4})(?!\d)"), (3, 2, 1)),
+    (re.compile(r"(?<!\d)(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})(?!\d)"), (1, 2, 3)),
+)
+
+
+def date_from_filename(name):
+    """
+    Find a report date in a file name.
+
+    Args:
+        name (str): File name
+
+    Returns:
+        date: Date in the name or None if it holds no valid date
+    """
+    for pattern, (year, month, day) in _FILENAME_DATES:
+        for match in pattern.finditer(name):
+            try:
+                return date(int(match.group(year)), int(match.group(month)), int(match.group(day)))
+            except ValueError:
+                continue
+    return None
+
+
+def probe_date(pdf_path, parser=None, logger=None):
+    """
+    Probe the report date of a PDF file without extracting it.
+
+    Args:
+        pdf_path (Path): Path to the PDF file
+        parser (PDFParser, optional): Parser reading the date from the header when
+            the file name holds none
+        logger (Logger, optional): Logger instance
+
+    Returns:
+        date: Report date or None if it could not be determined
+    """
+    pdf_path = Path(pdf_path)
+    found = date_from_filename(pdf_path.name)
+    if found or parser is None:
+        return found
+
+    try:
+        header_date = parser.read_date(pdf_path)
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).debug(
+            f"Could not probe the date of {pdf_path}: {str(e)}"
+        )
+        return None
+    if not header_date:
+        return None
+    return datetime.strptime(header_date, "%d-%m-%Y").date()
+
+
+def sort_key(pdf_path, report_date, order=ORDER_NEWEST):
+    """
+    Get the key ordering a file among the files of the same priority.
+
+    Files without a date come after the dated ones; ties are broken by path.
+
+    Args:
+        pdf_path (Path): Path to the PDF file
+        report_date (date): Probed report date or None
+        order (str, optional): One of ORDERS
+
+    Returns:
+        tuple: Sort key
+    """
+    if order == ORDER_NAME or report_date is None:
+        rank = (order != ORDER_NAME, 0)
+    elif order == ORDER_NEWEST:
+        rank = (False, -report_date.toordinal())
+    else:
+        rank = (False, report_date.toordinal())
+    return rank + (str(pdf_path),)
+
+
+def order_files(pdf_files, order=ORDER_NEWEST, probe=probe_date):
+    """
+    Order PDF files for processing.
+
+    Args:
+        pdf_files (iterable): Paths of the PDF files
+        order (str, optional): One of ORDERS
+        probe (callable, optional): Function returning the report date of a path;
+            not called for ORDER_NAME
+
+    Returns:
+        list: Paths in processing order
+
+    Raises:
+        ValueError: If the order is unknown
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown processing order: {order} (choose from {', '.join(ORDERS)})")
+    if order == ORDER_NAME:
+        return sorted(pdf_files)
+    return sorted(pdf_files, key=lambda path: sort_key(path, probe(path), order))
+
+
+class WorkScheduler:
+    """
+    Priority queue of PDF files processed one at a time on a background thread.
+
+    Live work is always taken before backfill; within a priority the files are
+    taken in the processing order. A file queued again is not duplicated, and a
+    queued backfill file reported by the watcher is promoted to live work.
+    """
+
+    def __init__(self, callback, order=ORDER_NEWEST, probe=probe_date, logger=None, batch=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            callback (callable): Function called with the Path of each file to process
+            order (str, optional): One of ORDERS
+            probe (callable, optional): Function returning the report date of a path
+            logger (Logger, optional): Logger instance
+            batch (callable, optional): Function returning a context manager that is
+                held from the first queued file until the queue is drained, e.g.
+                Manifest.deferred to save the manifest once per batch of files
+
+        Raises:
+            ValueError: If the order is unknown
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown processing order: {order} (choose from {', '.join(ORDERS)})")
+        self.callback = callback
+        self.order = order
+        self.probe = probe
+        self.logger = logger or logging.getLogger(__name__)
+        self.batch = batch
+
+        # Heap of (priority, sort key, path); entries no longer in _queued are stale
+        self._heap = []
+        # Path -> (priority, sort key) of the queued entry
+        self._queued = {}
+        self._busy = False
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def put(self, path, priority=PRIORITY_BACKFILL):
+        """
+        Queue a file, or raise the priority of a queued file.
+
+        Args:
+            path (str or Path): Path to the PDF file
+            priority (int, optional): PRIORITY_LIVE or PRIORITY_BACKFILL
+        """
+        path, entry = self._entry(path, priority)
+        with self._condition:
+            self._push(path, entry)
+            self._condition.notify_all()
+
+    def _entry(self, path, priority):
+        """
+        Probe a file and build its queue entry.
+
+        Args:
+            path (str or Path): Path to the PDF file
+            priority (int): PRIORITY_LIVE or PRIORITY_BACKFILL
+
+        Returns:
+            tuple: (Path, (priority, sort key))
+        """
+        path = Path(path)
+        report_date = None if self.order == ORDER_NAME else self.probe(path)
+        return path, (priority, sort_key(path, report_date, self.order))
+
+    def _push(self, path, entry):
+        """
+        Queue an entry unless the file is already queued as urgently; the caller holds the lock.
+
+        Args:
+            path (Path): Path to the PDF file
+            entry (tuple): (priority, sort key)
+        """
+        queued = self._queued.get(path)
+        if queued is not None and queued <= entry:
+            return
+        self._queued[path] = entry
+        heapq.heappush(self._heap, entry + (path,))
+
+    def submit_live(self, path):
+        """
+        Queue a file reported by the watcher ahead of any backfill.
+
+        Args:
+            path (str or Path): Path to the PDF file
+        """
+        self.put(path, PRIORITY_LIVE)
+
+    def submit_backfill(self, paths):
+        """
+        Queue existing files behind any live work.
+
+        All files are probed first and queued at once, so a running scheduler
+        takes them in the processing order rather than in the order given.
+
+        Args:
+            paths (iterable): Paths of the PDF files
+
+        Returns:
+            int: Number of queued files
+        """
+        entries = [self._entry(path, PRIORITY_BACKFILL) for path in paths]
+        with self._condition:
+            for path, entry in entries:
+                self._push(path, entry)
+            self._condition.notify_all()
+        return len(entries)
+
+    def __len__(self):
+        """Return the number of queued files."""
+        with self._condition:
+            return len(self._queued)
+
+    def start(self):
+        """Start the background processing thread."""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="pdf-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background processing thread after the current file, dropping queued files."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def join(self, timeout=None):
+        """
+        Wait until every queued file has been processed.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait
+
+        Returns:
+            bool: True if the queue is empty and no file is being processed
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queued and not self._busy, timeout)
+
+    def _next(self):
+        """
+        Wait for the most urgent queued file.
+
+        Returns:
+            Path: Next file to process, None when stopping
+        """
+        with self._condition:
+            while not self._stopping:
+                while self._heap:
+                    priority, key, path = heapq.heappop(self._heap)
+                    if self._queued.get(path) == (priority, key):
+                        del self._queued[path]
+                        self._busy = True
+                        return path
+                self._condition.wait()
+            return None
+
+    def _run(self):
+        """Process queued files until stopped."""
+        with ExitStack() as batch:
+            batching = False
+            while True:
+                path = self._next()
+                if path is None:
+                    return
+
+                if self.batch is not None and not batching:
+                    batch.enter_context(self.batch())
+                    batching = True
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    self.logger.error(f"Error processing {path}: {str(e)}")
+                finally:
+                    with self._condition:
+                        drained = not self._queued
+                    if drained and batching:
+                        batch.close()
+                        batching = False
+                    with self._condition:
+                        self._busy = False
+                        self._condition.notify_all()
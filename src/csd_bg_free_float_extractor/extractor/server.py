@@ -0,0 +1,354 @@
+"""
+Local HTTP service extracting uploaded PDF reports.
+
+Other systems POST a PDF to ``/extract`` and get its rows back as JSON or
+CSV, together with the extracted date and a summary of the errors, instead
+of copying the file to the watched share and polling for the CSV output.
+
+The extraction runs in a pool of worker processes started with the server.
+Each worker imports pandas and pdfplumber and builds its PDFParser once, so a
+request only pays for parsing the document. Uploads are parsed from memory;
+nothing is written to the output directory.
+"""
+
+import csv
+import io
+import json
+import logging
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ..constants import CSV_COLUMNS
+from .backends import BACKEND_PDFPLUMBER
+from .diagnostics import RowDiagnostics
+from .metrics import FileMetrics
+from .parser import PDFParser
+from .utils import setup_logger
+from .validation import ValidationResult, validate_frame
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# Largest accepted upload; the daily reports are well below 10 MB
+DEFAULT_MAX_UPLOAD = 50 * 1024 * 1024
+
+# Response formats
+FORMAT_JSON = "json"
+FORMAT_CSV = "csv"
+
+# Parser owned by each worker process of the service
+_worker_parser = None
+
+
+class UploadedPdf(io.BytesIO):
+    """In-memory PDF upload that reads as its file name in log messages."""
+
+    def __init__(self, data, name):
+        """
+        Wrap the uploaded bytes.
+
+        Args:
+            data (bytes): PDF file content
+            name (str): File name given by the client
+        """
+        super().__init__(data)
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+def _init_worker(logger_name, log_level, backend):
+    """
+    Initialize a worker process, importing the extraction dependencies up front.
+
+    Args:
+        logger_name (str): Name of the logger to use in the worker
+        log_level (int): Logging level of the parent logger
+        backend (str): Extraction backend of the parser
+    """
+    global _worker_parser
+    import pandas  # noqa: F401
+    import pdfplumber  # noqa: F401
+
+    _worker_parser = PDFParser(setup_logger(logger_name, log_level), backend=backend)
+
+
+def _warm_up():
+    """
+    Do nothing; submitted once per worker so that all workers start with the server.
+
+    Returns:
+        bool: True
+    """
+    return True
+
+
+def extract_upload(data, filename):
+    """
+    Extract the rows of an uploaded PDF in a worker process.
+
+    Args:
+        data (bytes): PDF file content
+        filename (str): File name given by the client
+
+    Returns:
+        dict: Extraction result with the file name, extracted date, success and
+            errors flags, warning and error messages, rejected row counts per
+            category, validation violation counts per check, and the rows as
+            dicts with the CSV columns
+    """
+    parser, buffer = _worker_parser.capturing()
+    logger = parser.logger
+    metrics = FileMetrics(filename)
+    diagnostics = RowDiagnostics()
+
+    try:
+        df, extracted_date, errors_occurred = parser.extract_data_from_pdf(
+            UploadedPdf(data, filename), metrics=metrics, diagnostics=diagnostics
+        )
+    except Exception as e:
+        logger.error(f"Error processing PDF {filename}: {str(e)}")
+        df, extracted_date, errors_occurred = None, None, True
+
+    rows = []
+    validation = ValidationResult()
+    if df is not None and not df.empty:
+        validation = validate_frame(df)
+        if validation:
+            logger.warning(validation.summary(filename))
+            for line in validation.details():
+                logger.warning(line)
+        rows = [
+            dict(zip(CSV_COLUMNS, (company, code, int(total), int(free_float), int(shareholders))))
+            for company, code, total, free_float, shareholders
+            in df.itertuples(index=False, name=None)
+        ]
+
+    # The records are also logged by the worker, like the records of a processed file
+    for record in buffer.records:
+        record.name = _worker_parser.logger.name
+        _worker_parser.logger.handle(record)
+
+    return {
+        "file": filename,
+        "date": extracted_date,
+        "success": bool(rows),
+        "errors_occurred": bool(errors_occurred),
+        "errors": [
+            record.getMessage() for record in buffer.records if record.levelno >= logging.WARNING
+        ],
+        "rejected_rows": diagnostics.by_category(),
+        "violations": validation.by_check(),
+        "rows": rows,
+    }
+
+
+def rows_to_csv(rows):
+    """
+    Format extracted rows as CSV text with the output file's columns.
+
+    Args:
+        rows (list): Row dicts with the CSV columns
+
+    Returns:
+        str: CSV text including the header
+    """
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of an ExtractionServer."""
+
+    server_version = "csd-bg-free-float-extractor"
+
+    def log_message(self, format, *args):
+        self.server.service.logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status, body, content_type, headers=None):
+        """
+        Send a complete response.
+
+        Args:
+            status (HTTPStatus): Response status
+            body (str): Response body
+            content_type (str): MIME type of the body
+            headers (dict, optional): Additional response headers
+        """
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data, ensure_ascii=False), "application/json")
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+        self._send_json(HTTPStatus.OK, {"status": "ok", "workers": self.server.service.jobs})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/extract":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+
+        query = parse_qs(url.query)
+        filename = (
+            query.get("filename", [None])[0] or self.headers.get("X-Filename") or "upload.pdf"
+        )
+        response_format = query.get("format", [None])[0]
+        if response_format is None:
+            accept = self.headers.get("Accept", "")
+            response_format = FORMAT_CSV if "text/csv" in accept else FORMAT_JSON
+        if response_format not in (FORMAT_JSON, FORMAT_CSV):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Unknown format: {response_format}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length <= 0:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST, {"error": "The request body must hold the PDF file"}
+            )
+            return
+        if length > self.server.service.max_upload:
+            max_upload = self.server.service.max_upload
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            {"error": f"Uploads are limited to {max_upload} bytes"})
+            self.close_connection = True
+            return
+
+        try:
+            result = self.server.service.extract(self.rfile.read(length), filename)
+        except Exception as e:
+            self.server.service.logger.error(f"Failed to extract upload {filename}: {str(e)}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"file": filename, "error": str(e)})
+            return
+
+        status = HTTPStatus.OK if result["success"] else HTTPStatus.UNPROCESSABLE_ENTITY
+        if response_format == FORMAT_JSON:
+            self._send_json(status, result)
+            return
+        self._send(status, rows_to_csv(result["rows"]), "text/csv", {
+            "X-Report-Date": result["date"] or "",
+            "X-Errors": str(len(result["errors"])),
+        })
+
+
+class ExtractionServer:
+    """HTTP service extracting uploaded PDFs in warm worker processes."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, jobs=1, backend=BACKEND_PDFPLUMBER,
+                 max_upload=DEFAULT_MAX_UPLOAD, logger=None):
+        """
+        Initialize the service.
+
+        Args:
+            host (str, optional): Address to listen on; localhost by default
+            port (int, optional): Port to listen on; 0 picks a free port
+            jobs (int, optional): Number of worker processes; 0 or less means all CPUs
+            backend (str, optional): Extraction backend of the workers
+            max_upload (int, optional): Largest accepted upload in bytes
+            logger (Logger, optional): Logger instance
+        """
+        from .processor import resolve_jobs
+
+        self.host = host
+        self.port = port
+        self.jobs = resolve_jobs(jobs)
+        self.backend = backend
+        self.max_upload = max_upload
+        self.logger = logger or logging.getLogger(__name__)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._httpd = None
+
+    def _start_pool(self):
+        """Start the worker processes and wait until each has imported its dependencies."""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, wait
+
+        # Spawned rather than forked, as the server threads may be running
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.logger.name, self.logger.getEffectiveLevel(), self.backend)
+        )
+        wait([self._pool.submit(_warm_up) for _ in range(self.jobs)])
+
+    def start(self):
+        """
+        Start the worker processes and bind the HTTP server.
+
+        Returns:
+            tuple: (host, port) the server listens on
+        """
+        self._start_pool()
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.service = self
+        self.host, self.port = self._httpd.server_address[:2]
+        self.logger.info(f"Serving extraction on http://{self.host}:{self.port}/extract "
+                         f"with {self.jobs} worker(s)")
+        return self.host, self.port
+
+    def extract(self, data, filename):
+        """
+        Extract an uploaded PDF in a worker process.
+
+        A worker that died (e.g. on a crash in a PDF library) takes the pool
+        down with it; the pool is then restarted for the following requests.
+
+        Args:
+            data (bytes): PDF file content
+            filename (str): File name given by the client
+
+        Returns:
+            dict: Extraction result as returned by extract_upload
+        """
+        pool = self._pool
+        try:
+            return pool.submit(extract_upload, data, filename).result()
+        except BrokenProcessPool:
+            self.logger.error(f"A worker died while extracting {filename}, restarting the workers")
+            with self._pool_lock:
+                if self._pool is pool:
+                    pool.shutdown(wait=False)
+                    self._start_pool()
+            raise
+
+    def serve_forever(self):
+        """Handle requests until interrupted, then stop the workers."""
+        if self._httpd is None:
+            self.start()
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the HTTP server and the worker processes."""
+        if self._httpd is not None:
+            self._httpd.server_close()
+            self._httpd = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,254 @@
+"""
+Cached table geometry for reports that share the same layout.
+
+Every report from the Central Depository uses the same table layout, so the
+column boundaries and table bounding box learned from one page are reused on
+later pages and files. With a template, characters are assigned to cells by
+their coordinates: the columns come from the template and the rows from the
+page's horizontal rules, which avoids pdfplumber's table detection and
+per-cell character lookup.
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_right
+from pathlib import Path
+
+from .backends import group_lines
+
+# Tolerance (in points) when merging boundaries and rules at the same position
+GEOMETRY_TOLERANCE = 1
+# Fraction of the table width a horizontal rule must cover to separate rows
+MIN_RULE_COVERAGE = 0.5
+
+
+def layout_fingerprint(pdf):
+    """
+    Compute a fingerprint of a document's layout.
+
+    Args:
+        pdf (pdfplumber.PDF): Open document
+
+    Returns:
+        str: Fingerprint built from the first page size and the producing software
+    """
+    page = pdf.pages[0]
+    metadata = pdf.metadata or {}
+    return "|".join([
+        f"{round(page.width)}x{round(page.height)}",
+        str(metadata.get("Producer", "")),
+        str(metadata.get("Creator", ""))
+    ])
+
+
+def _merge_positions(positions):
+    """
+    Sort positions and merge those closer than the geometry tolerance.
+
+    Args:
+        positions (iterable): Coordinates in points
+
+    Returns:
+        list: Sorted distinct coordinates
+    """
+    merged = []
+    for position in sorted(positions):
+        if not merged or position - merged[-1] > GEOMETRY_TOLERANCE:
+            merged.append(position)
+    return merged
+
+
+class TableTemplate:
+    """Column boundaries and bounding box of the report table."""
+
+    def __init__(self, columns, bbox):
+        """
+        Initialize the template.
+
+        Args:
+            columns (list): x positions of the column boundaries, from left to right
+            bbox (tuple): Table bounding box (x0, top, x1, bottom) where it was learned
+        """
+        self.columns = list(columns)
+        self.bbox = tuple(bbox)
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Learn a template from a table found by pdfplumber.
+
+        Args:
+            table (pdfplumber.table.Table): Table found on a page
+
+        Returns:
+            TableTemplate: Template or None if the table has fewer than two columns
+        """
+        columns = _merge_positions(
+            [cell[0] for cell in table.cells] + [cell[2] for cell in table.cells]
+        )
+        if len(columns) < 3:
+            return None
+        return cls(columns, table.bbox)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a template from its stored form.
+
+        Args:
+            data (dict): Stored template
+
+        Returns:
+            TableTemplate: Template
+        """
+        return cls(data["columns"], data["bbox"])
+
+    def to_dict(self):
+        """
+        Get the stored form of the template.
+
+        Returns:
+            dict: Column boundaries and bounding box
+        """
+        return {"columns": self.columns, "bbox": list(self.bbox)}
+
+    def _row_boundaries(self, page):
+        """
+        Find the horizontal rules of a page that separate table rows.
+
+        Args:
+            page (pdfplumber.page.Page): Page to read
+
+        Returns:
+            list: y positions (from the top) of the row boundaries
+        """
+        x0, x1 = self.columns[0], self.columns[-1]
+        coverage = {}
+        for edge in page.horizontal_edges:
+            covered = min(edge["x1"], x1) - max(edge["x0"], x0)
+            if covered > 0:
+                top = round(edge["top"])
+                coverage[top] = coverage.get(top, 0) + covered
+
+        minimum = MIN_RULE_COVERAGE * (x1 - x0)
+        return _merge_positions(top for top, covered in coverage.items() if covered >= minimum)
+
+    def extract_table(self, page):
+        """
+        Extract the table of a page using the template's columns.
+
+        Args:
+            page (pdfplumber.page.Page): Page to read
+
+        Returns:
+            list: Rows as lists of cell strings (None for empty cells), or None
+                if the page has no row rules within the template's columns
+        """
+        rows_y = self._row_boundaries(page)
+        if len(rows_y) < 2:
+            return None
+
+        column_count = len(self.columns) - 1
+        cells = {}
+        for char in page.chars:
+            x = (char["x0"] + char["x1"]) / 2
+            y = (char["top"] + char["bottom"]) / 2
+            column = bisect_right(self.columns, x) - 1
+            row = bisect_right(rows_y, y) - 1
+            if 0 <= column < column_count and 0 <= row < len(rows_y) - 1:
+                cells.setdefault((row, column), []).append(
+                    (char["text"], char["x0"], char["x1"], char["top"], char["bottom"])
+                )
+
+        table = []
+        for row in range(len(rows_y) - 1):
+            texts = []
+            for column in range(column_count):
+                chars = cells.get((row, column))
+                if chars:
+                    lines = group_lines(chars)
+                    texts.append(
+                        "\n".join(" ".join(word.text for word in words) for words in lines)
+                    )
+                else:
+                    texts.append(None)
+            if any(texts):
+                table.append(texts)
+
+        return table or None
+
+
+class TemplateCache:
+    """Table templates keyed by layout fingerprint, kept in memory and optionally on disk."""
+
+    def __init__(self, path=None, logger=None):
+        """
+        Initialize the cache and load any stored templates.
+
+        Args:
+            path (str or Path, optional): Path of the JSON file storing the templates
+            logger (Logger, optional): Logger instance
+        """
+        self.path = Path(path) if path else None
+        self.logger = logger or logging.getLogger(__name__)
+        self.templates = {}
+        self.load()
+
+    def load(self):
+        """Load the stored templates, starting empty if the file is missing or unreadable."""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+            self.templates = {key: TableTemplate.from_dict(value) for key, value in stored.items()}
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable table templates {self.path}: {str(e)}")
+            self.templates = {}
+
+    def save(self):
+        """Write the templates to disk atomically."""
+        if not self.path:
+            return
+
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {key: template.to_dict() for key, template in self.templates.items()}, f, indent=1
+            )
+        os.replace(tmp_path, self.path)
+
+    def get(self, fingerprint):
+        """
+        Get the template of a layout.
+
+        Args:
+            fingerprint (str): Layout fingerprint
+
+        Returns:
+            TableTemplate: Template or None if none was learned
+        """
+        return self.templates.get(fingerprint)
+
+    def put(self, fingerprint, template):
+        """
+        Store the template of a layout.
+
+        Args:
+            fingerprint (str): Layout fingerprint
+            template (TableTemplate): Learned template
+        """
+        self.templates[fingerprint] = template
+        self.save()
+
+    def discard(self, fingerprint):
+        """
+        Forget the template of a layout so it is learned again.
+
+        Args:
+            fingerprint (str): Layout fingerprint
+        """
+        if self.templates.pop(fingerprint, None) is not None:
+            self.save()
@@ -0,0 +1,178 @@
+"""
+Consistency checks of an extracted report.
+
+A row that matched the row pattern can still be wrong: numbers split at
+the wrong place, a free float larger than the total shares, an emission code
+with a mistyped ISIN check digit, or the same code on two rows. The checks
+run as column operations over the whole DataFrame (the ISIN Luhn checksum
+included), so they stay cheap on every file of a large backfill.
+"""
+
+from collections import Counter
+
+# Violated checks
+CHECK_FREE_FLOAT = "free_float_exceeds_total"
+CHECK_SHAREHOLDERS = "shareholders_exceed_total"
+CHECK_ISIN = "invalid_isin"
+CHECK_DUPLICATE = "duplicate_code"
+
+# Violations listed one by one in the error log of a file
+DEFAULT_MAX_REPORTED = 50
+
+ISIN_LENGTH = 12
+
+
+def isin_valid(codes):
+    """
+    Check emission codes as ISINs: format and Luhn check digit.
+
+    An ISIN is two letters, nine letters or digits and a check digit. For the
+    checksum each letter is replaced by two digits (A = 10 ... Z = 35) and the
+    Luhn algorithm is applied to the resulting digit string. All codes are
+    checked at once on a matrix of their characters.
+
+    Args:
+        codes (array-like): Emission codes
+
+    Returns:
+        numpy.ndarray: Boolean array, True for the valid codes
+    """
+    import numpy as np
+
+    codes = np.asarray(codes, dtype=str)
+    count = len(codes)
+    if not count:
+        return np.zeros(0, dtype=bool)
+
+    # Code points of the first ISIN_LENGTH characters, zero-padded
+    chars = (
+        codes.astype(f"<U{ISIN_LENGTH}")
+        .view(np.uint32)
+        .reshape(count, ISIN_LENGTH)
+        .astype(np.int64)
+    )
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    is_letter = (chars >= ord("A")) & (chars <= ord("Z"))
+    well_formed = (
+        (np.char.str_len(codes) == ISIN_LENGTH)
+        & is_letter[:, :2].all(axis=1)
+        & (is_letter | is_digit)[:, 2:-1].all(axis=1)
+        & is_digit[:, -1]
+    )
+
+    values = np.where(is_letter, chars - (ord("A") - 10), np.where(is_digit, chars - ord("0"), 0))
+    tens, ones = np.divmod(values, 10)
+    widths = 1 + is_letter
+
+    # Position of each character's last digit, counted from the right of the digit string;
+    # Luhn doubles the digits at odd positions
+    position = np.cumsum(widths[:, ::-1], axis=1)[:, ::-1] - widths
+    ones_doubled = position % 2 == 1
+
+    def luhn(digits, doubled):
+        return np.where(doubled, 2 * digits - 9 * (digits >= 5), digits)
+
+    total = luhn(ones, ones_doubled) + np.where(is_letter, luhn(tens, ~ones_doubled), 0)
+    return well_formed & (total.sum(axis=1) % 10 == 0)
+
+
+class ValidationResult:
+    """Rows of one extracted report that failed a consistency check."""
+
+    def __init__(self, violations=None):
+        """
+        Initialize the result.
+
+        Args:
+            violations (list, optional): Violation dicts with the row number (1-based),
+                check, emission code and company
+        """
+        self.violations = list(violations or [])
+
+    def __len__(self):
+        """Return the number of violations."""
+        return len(self.violations)
+
+    def by_check(self):
+        """
+        Count the violations per check.
+
+        Returns:
+            dict: Check -> number of violating rows
+        """
+        return dict(Counter(violation["check"] for violation in self.violations))
+
+    def summary(self, pdf_path):
+        """
+        Describe the violations of a file in one message.
+
+        Args:
+            pdf_path (Path): Path to the PDF file
+
+        Returns:
+            str: Totals per check
+        """
+        checks = ", ".join(f"{check} {count}" for check, count in sorted(self.by_check().items()))
+        return f"Found {len(self.violations)} validation violations in {pdf_path} ({checks})"
+
+    def details(self, limit=DEFAULT_MAX_REPORTED):
+        """
+        Describe the violations one per line.
+
+        Args:
+            limit (int, optional): Maximum number of violations described
+
+        Returns:
+            list: Messages, with a last line counting the violations left out
+        """
+        lines = [
+            f"Row {violation['row']} ({violation['emission_code']}, {violation['company']}): "
+            f"{violation['check']}"
+            for violation in self.violations[:limit]
+        ]
+        more = len(self.violations) - limit
+        if more > 0:
+            lines.append(f"... {more} more validation violations")
+        return lines
+
+
+def validate_frame(df):
+    """
+    Check an extracted report for inconsistent rows.
+
+    Checks that the free float and the number of shareholders do not exceed
+    the total shares, that every emission code is a valid ISIN and that no
+    code appears on more than one row.
+
+    Args:
+        df (DataFrame): Extracted data with CSV_COLUMNS
+
+    Returns:
+        ValidationResult: Violations in row order; a row violating several
+            checks is listed once per check
+    """
+    import numpy as np
+
+    total_shares = df["Total Shares"].to_numpy()
+    codes = df["Emission Code"]
+    masks = (
+        (CHECK_FREE_FLOAT, df["Free Float"].to_numpy() > total_shares),
+        (CHECK_SHAREHOLDERS, df["Shareholders"].to_numpy() > total_shares),
+        (CHECK_ISIN, ~isin_valid(codes.to_numpy(dtype=str))),
+        (CHECK_DUPLICATE, codes.duplicated(keep=False).to_numpy()),
+    )
+
+    # Only the violating rows are turned into Python objects
+    violations = []
+    companies = df["Company"].to_numpy()
+    code_values = codes.to_numpy()
+    for check, mask in masks:
+        for position in np.flatnonzero(mask):
+            violations.append({
+                "row": int(position) + 1,
+                "check": check,
+                "emission_code": code_values[position],
+                "company": companies[position]
+            })
+    violations.sort(key=lambda violation: violation["row"])
+    return ValidationResult(violations)
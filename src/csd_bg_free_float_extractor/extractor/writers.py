@@ -0,0 +1,456 @@
+"""
+Output sinks writing extracted data to files.
+
+Each format is written to ``<date>.<extension>`` in the output directory:
+
+- ``csv``: UTF-8 CSV with BOM for Excel compatibility (the default).
+- ``parquet``: Parquet file with a typed schema (requires pyarrow).
+- ``arrow``: Arrow IPC (Feather v2) file with the same schema (requires pyarrow).
+- ``xlsx``: Excel workbook, streamed row by row with openpyxl's write-only mode.
+
+Every file is written under a temporary name and renamed into place when
+complete, so readers never see a partially written output, and the outputs
+of one report date are written by one thread at a time. Where fcntl is
+available a ``.locks/<date>.lock`` file in the output directory extends this
+to the worker processes of a pool; elsewhere the writes are serialized within
+a process only. BackgroundWriter runs the writes in a dedicated thread so
+parsing can continue meanwhile.
+"""
+
+import contextvars
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from ..constants import CSV_COLUMNS, LOCKS_DIRNAME
+from .metrics import write_stage
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+FORMAT_XLSX = "xlsx"
+FORMATS = (FORMAT_CSV, FORMAT_PARQUET, FORMAT_ARROW, FORMAT_XLSX)
+DEFAULT_FORMATS = (FORMAT_CSV,)
+
+# File extension of each format
+EXTENSIONS = {
+    FORMAT_CSV: ".csv",
+    FORMAT_PARQUET: ".parquet",
+    FORMAT_ARROW: ".arrow",
+    FORMAT_XLSX: ".xlsx",
+}
+
+# Suffix of the file locked while the outputs of a report date are written
+LOCK_SUFFIX = ".lock"
+
+# Locks serializing the writes of each report date within the process, kept
+# while a thread holds or waits for them
+_date_locks = {}
+_date_locks_guard = threading.Lock()
+
+
+class _DateLock:
+    """Reentrant lock of one report date, held across processes through a lock file."""
+
+    def __init__(self):
+        """Create the unlocked lock."""
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+        # Threads holding or waiting for the lock, counted once per acquire
+        self.users = 0
+
+    @contextmanager
+    def hold(self, lock_path=None):
+        """
+        Hold the lock for the duration of the block.
+
+        The lock file is locked by the outermost holder only: flock locks of
+        one process on separate descriptors of a file exclude each other.
+
+        Args:
+            lock_path (Path, optional): File locked with fcntl.flock while the
+                thread lock is held; None to lock within the process only
+        """
+        with self._lock:
+            if not self._depth and lock_path is not None and fcntl is not None:
+                lock_path.parent.mkdir(exist_ok=True)
+                lock_file = open(lock_path, "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                except BaseException:
+                    lock_file.close()
+                    raise
+                self._file = lock_file
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth and self._file is not None:
+                    # Closing the file releases its lock
+                    self._file.close()
+                    self._file = None
+
+
+@contextmanager
+def date_lock(report_date, output_dir=None):
+    """
+    Hold the lock serializing the writes of a report date.
+
+    Two PDFs with the same extracted date write the same output files; holding
+    this lock keeps their writes from interleaving. With an output directory
+    the lock also excludes other processes, such as the workers of a pool,
+    by locking ``.locks/<date>.lock`` in it where fcntl is available; on other
+    platforms only the threads of one process are serialized. The lock is
+    reentrant, and forgotten by the process once no thread holds or waits
+    for it.
+
+    Args:
+        report_date (str): Report date
+        output_dir (Path, optional): Directory of the outputs holding the lock directory
+    """
+    with _date_locks_guard:
+        lock = _date_locks.get(report_date)
+        if lock is None:
+            lock = _date_locks[report_date] = _DateLock()
+        lock.users += 1
+    lock_path = None
+    if output_dir is not None:
+        lock_path = output_dir / LOCKS_DIRNAME / f"{report_date}{LOCK_SUFFIX}"
+    try:
+        with lock.hold(lock_path):
+            yield
+    finally:
+        with _date_locks_guard:
+            lock.users -= 1
+            if not lock.users:
+                del _date_locks[report_date]
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Provide a temporary path that replaces the target file when the block succeeds.
+
+    The temporary file is created next to the target, so the final rename is
+    atomic; if the block fails, or does not create the temporary file, the
+    target is left untouched.
+
+    Args:
+        path (Path): Target file path
+
+    Yields:
+        Path: Temporary path to write to
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        if tmp_path.exists():
+            os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def parse_formats(value):
+    """
+    Parse a comma separated list of output formats.
+
+    Args:
+        value (str or iterable): Format names, e.g. "csv,parquet"
+
+    Returns:
+        tuple: Distinct format names in the given order
+
+    Raises:
+        ValueError: If a format is unknown or none is given
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+
+    formats = []
+    for name in value:
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in FORMATS:
+            raise ValueError(f"Unknown output format: {name} (choose from {', '.join(FORMATS)})")
+        if name not in formats:
+            formats.append(name)
+
+    if not formats:
+        raise ValueError("At least one output format is required")
+    return tuple(formats)
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for the columnar formats.
+
+    Returns:
+        tuple: (pyarrow module, pyarrow.parquet module, pyarrow.feather module)
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow output require pyarrow: "
+            "pip install 'csd_bg_free_float_extractor[parquet]'"
+        ) from e
+    return pyarrow, pyarrow.parquet, pyarrow.feather
+
+
+def check_formats(formats):
+    """
+    Check that the dependencies of the output formats are installed.
+
+    Args:
+        formats (iterable): Format names
+
+    Raises:
+        ImportError: If a required optional dependency is missing
+    """
+    if FORMAT_PARQUET in formats or FORMAT_ARROW in formats:
+        _import_pyarrow()
+
+
+def arrow_schema(report_date=None):
+    """
+    Build the Arrow schema of the extracted table.
+
+    Args:
+        report_date (str, optional): Report date stored in the schema metadata
+
+    Returns:
+        pyarrow.Schema: Schema with string company/code columns and int64 counts
+    """
+    pa, _, _ = _import_pyarrow()
+    company, code, total, free_float, shareholders = CSV_COLUMNS
+    metadata = {"report_date": report_date} if report_date else None
+    return pa.schema([
+        pa.field(company, pa.string()),
+        pa.field(code, pa.string()),
+        pa.field(total, pa.int64()),
+        pa.field(free_float, pa.int64()),
+        pa.field(shareholders, pa.int64()),
+    ], metadata=metadata)
+
+
+def _arrow_table(df, report_date):
+    """
+    Convert extracted data to an Arrow table with the typed schema.
+
+    Args:
+        df (DataFrame): Extracted data
+        report_date (str): Report date
+
+    Returns:
+        pyarrow.Table: Typed table
+    """
+    pa, _, _ = _import_pyarrow()
+    return pa.Table.from_pandas(df, schema=arrow_schema(report_date), preserve_index=False)
+
+
+def write_csv(df, path, report_date=None):
+    """
+    Write extracted data to a CSV file.
+
+    Args:
+        df (DataFrame): Extracted data
+        path (Path): Output file path
+        report_date (str, optional): Report date (unused)
+    """
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def write_csv_rows(records, path, keep_empty=True):
+    """
+    Write rows to a CSV file as they are produced.
+
+    The rows are written one by one, so memory does not depend on their number.
+    The file matches write_csv's output and is renamed into place when complete,
+    so a failing row source leaves no partial file.
+
+    Args:
+        records (iterable): Row dicts with the CSV columns, e.g. from PDFParser.iter_rows
+        path (Path): Output file path
+        keep_empty (bool, optional): Write a header-only file if there are no rows;
+            otherwise an existing file is left untouched
+
+    Returns:
+        int: Number of written rows
+    """
+    count = 0
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, lineterminator=os.linesep)
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        if not count and not keep_empty:
+            tmp_path.unlink()
+    return count
+
+
+def write_parquet(df, path, report_date=None):
+    """
+    Write extracted data to a Parquet file.
+
+    Args:
+        df (DataFrame): Extracted data
+        path (Path): Output file path
+        report_date (str, optional): Report date stored in the file metadata
+    """
+    _, parquet, _ = _import_pyarrow()
+    parquet.write_table(_arrow_table(df, report_date), path)
+
+
+def write_arrow(df, path, report_date=None):
+    """
+    Write extracted data to an Arrow IPC (Feather v2) file.
+
+    Args:
+        df (DataFrame): Extracted data
+        path (Path): Output file path
+        report_date (str, optional): Report date stored in the file metadata
+    """
+    _, _, feather = _import_pyarrow()
+    feather.write_feather(_arrow_table(df, report_date), path)
+
+
+def write_xlsx(df, path, report_date=None):
+    """
+    Write extracted data to an Excel workbook.
+
+    Rows are streamed with openpyxl's write-only mode instead of building the
+    whole sheet in memory as DataFrame.to_excel does.
+
+    Args:
+        df (DataFrame): Extracted data
+        path (Path): Output file path
+        report_date (str, optional): Report date used as the sheet title
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(report_date or "Sheet1")
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(path)
+
+
+WRITERS = {
+    FORMAT_CSV: write_csv,
+    FORMAT_PARQUET: write_parquet,
+    FORMAT_ARROW: write_arrow,
+    FORMAT_XLSX: write_xlsx,
+}
+
+
+def output_paths(output_dir, report_date, formats):
+    """
+    Get the output file paths of a report.
+
+    Args:
+        output_dir (Path): Directory for output files
+        report_date (str): Report date used as the file name
+        formats (iterable): Format names
+
+    Returns:
+        list: Output paths in the order of the formats
+    """
+    return [output_dir / f"{report_date}{EXTENSIONS[name]}" for name in formats]
+
+
+def write_outputs(df, output_dir, report_date, formats=DEFAULT_FORMATS, metrics=None):
+    """
+    Write extracted data in each of the requested formats.
+
+    Args:
+        df (DataFrame): Extracted data
+        output_dir (Path): Directory for output files
+        report_date (str): Report date used as the file name
+        formats (iterable, optional): Format names
+        metrics (FileMetrics, optional): Metrics recording the time spent in each writer
+
+    Returns:
+        list: Paths of the written files in the order of the formats
+    """
+    paths = output_paths(output_dir, report_date, formats)
+    with date_lock(report_date, output_dir):
+        for name, path in zip(formats, paths):
+            with atomic_path(path) as tmp_path:
+                if metrics is None:
+                    WRITERS[name](df, tmp_path, report_date)
+                else:
+                    with metrics.stage(write_stage(name)):
+                        WRITERS[name](df, tmp_path, report_date)
+    return paths
+
+
+class BackgroundWriter:
+    """
+    Dedicated thread running output writes while the caller parses the next file.
+
+    Jobs run one at a time in submission order, each in a copy of the context
+    it was submitted from. At most max_pending jobs are queued or running;
+    submit blocks beyond that, which bounds the number of extracted reports
+    held in memory while they wait to be written.
+    """
+
+    def __init__(self, max_pending=2):
+        """
+        Start the writer thread.
+
+        Args:
+            max_pending (int, optional): Maximum number of queued or running jobs
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a write job, waiting while the queue is full.
+
+        Args:
+            function (callable): Job to run in the writer thread
+            *args: Positional arguments of the job
+            **kwargs: Keyword arguments of the job
+
+        Returns:
+            concurrent.futures.Future: Result of the job
+        """
+        self._slots.acquire()
+        try:
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, function, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        """Wait for the queued jobs and stop the writer thread."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
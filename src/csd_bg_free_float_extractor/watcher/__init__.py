@@ -1,7 +1,46 @@
 """
 File system watcher module for Bulgarian PDF extractor.
+
+The public names are imported from their submodules on first access, so the
+polling scanner can be used without importing watchdog.
 """
 
-from .handler import PdfFileHandler
+import importlib
+
+# Submodule defining each public name
+_EXPORTS = {
+    'DebounceQueue': 'debounce',
+    'PdfFileHandler': 'handler',
+    'PollingScanner': 'poller',
+    'StatIndex': 'poller',
+    'scan_directory': 'poller'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Import a public name from its submodule on first access.
+
+    Args:
+        name (str): Attribute name
+
+    Returns:
+        object: The public class or function
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    List the module attributes, including the public names not imported yet.
 
-__all__ = ['PdfFileHandler']
\ No newline at end of file
+    Returns:
+        list: Attribute names
+    """
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,144 @@
+"""
+Coalescing work queue that processes files once they have stopped changing.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from ..constants import DEFAULT_QUIET_PERIOD
+
+
+def _stat_signature(path):
+    """
+    Get the size and modification time of a file.
+
+    Args:
+        path (Path): Path to the file
+
+    Returns:
+        tuple: (size, mtime in nanoseconds) or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class DebounceQueue:
+    """
+    Queue of file paths keyed by path, processed on a background thread.
+
+    Repeated events for the same path are coalesced. A path is handed to the
+    callback once no event arrived for the quiet period and its size and
+    modification time did not change over that period.
+    """
+
+    def __init__(self, callback, quiet_period=DEFAULT_QUIET_PERIOD, logger=None):
+        """
+        Initialize the queue.
+
+        Args:
+            callback (callable): Function called with the Path of each stable file
+            quiet_period (float, optional): Seconds a file must stay unchanged
+            logger (Logger, optional): Logger instance
+        """
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.logger = logger or logging.getLogger(__name__)
+
+        # Path -> [deadline, (size, mtime) when last seen]
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def put(self, path):
+        """
+        Add a path to the queue or postpone it if it is already queued.
+
+        Never blocks on processing, so it is safe to call from the observer thread.
+
+        Args:
+            path (str or Path): Path of the changed file
+        """
+        path = Path(path)
+        signature = _stat_signature(path)
+        with self._condition:
+            self._pending[path] = [time.monotonic() + self.quiet_period, signature]
+            self._condition.notify()
+
+    def __len__(self):
+        """Return the number of queued paths."""
+        with self._condition:
+            return len(self._pending)
+
+    def start(self):
+        """Start the background processing thread."""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="pdf-debounce-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background processing thread, dropping paths that are still queued."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _next_due(self):
+        """
+        Wait until a queued path reaches its deadline.
+
+        Returns:
+            list: Paths whose quiet period has elapsed, empty when stopping
+        """
+        with self._condition:
+            while not self._stopping:
+                now = time.monotonic()
+                due = [path for path, (deadline, _) in self._pending.items() if deadline <= now]
+                if due:
+                    return due
+
+                timeout = None
+                if self._pending:
+                    timeout = min(deadline for deadline, _ in self._pending.values()) - now
+                self._condition.wait(timeout)
+            return []
+
+    def _run(self):
+        """Process paths whose quiet period has elapsed until stopped."""
+        while True:
+            due = self._next_due()
+            if not due:
+                return
+
+            for path in due:
+                signature = _stat_signature(path)
+                with self._condition:
+                    pending = self._pending.get(path)
+                    if pending is None or pending[0] > time.monotonic():
+                        # Removed or postponed by a new event in the meantime
+                        continue
+
+                    if signature is None:
+                        del self._pending[path]
+                        self.logger.debug(f"Queued file disappeared: {path}")
+                        continue
+
+                    if signature != pending[1]:
+                        # Still being written: wait another quiet period
+                        self._pending[path] = [time.monotonic() + self.quiet_period, signature]
+                        continue
+
+                    del self._pending[path]
+
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    self.logger.error(f"Error processing {path}: {str(e)}")
@@ -7,20 +7,43 @@ from pathlib import Path
 
 from watchdog.events import FileSystemEventHandler
 
+from ..constants import DEFAULT_QUIET_PERIOD
+from .debounce import DebounceQueue
+
 
 class PdfFileHandler(FileSystemEventHandler):
-    """Handler for PDF file system events."""
+    """
+    Handler for PDF file system events.
+
+    Events are only queued here; the files are processed on the queue's own
+    thread once they have stopped changing, so the observer thread never
+    blocks on parsing.
+    """
 
-    def __init__(self, processor):
+    def __init__(self, processor, quiet_period=DEFAULT_QUIET_PERIOD, callback=None):
         """
         Initialize the handler.
 
         Args:
             processor (PDFProcessor): Processor instance for PDFs
+            quiet_period (float, optional): Seconds a file must stay unchanged before processing
+            callback (callable, optional): Function called with the Path of each stable
+                file; the processor's process_pdf_file by default
         """
         super().__init__()
         self.processor = processor
         self.logger = processor.logger or logging.getLogger(__name__)
+        self.queue = DebounceQueue(
+            callback or processor.process_pdf_file, quiet_period, self.logger
+        )
+
+    def start(self):
+        """Start processing queued files."""
+        self.queue.start()
+
+    def stop(self):
+        """Stop processing queued files."""
+        self.queue.stop()
 
     def on_created(self, event):
         """
@@ -31,7 +54,7 @@ class PdfFileHandler(FileSystemEventHandler):
         """
         if not event.is_directory and event.src_path.lower().endswith('.pdf'):
             self.logger.info(f"New PDF detected: {event.src_path}")
-            self.processor.process_pdf_file(Path(event.src_path))
+            self.queue.put(Path(event.src_path))
 
     def on_modified(self, event):
         """
@@ -41,5 +64,16 @@ class PdfFileHandler(FileSystemEventHandler):
             event (FileSystemEvent): The file system event
         """
         if not event.is_directory and event.src_path.lower().endswith('.pdf'):
-            self.logger.info(f"Modified PDF detected: {event.src_path}")
-            self.processor.process_pdf_file(Path(event.src_path))
\ No newline at end of file
+            self.logger.debug(f"Modified PDF detected: {event.src_path}")
+            self.queue.put(Path(event.src_path))
+
+    def on_moved(self, event):
+        """
+        Handle file move events, e.g. uploads renamed from a temporary name.
+
+        Args:
+            event (FileSystemEvent): The file system event
+        """
+        if not event.is_directory and event.dest_path.lower().endswith('.pdf'):
+            self.logger.info(f"PDF moved into place: {event.dest_path}")
+            self.queue.put(Path(event.dest_path))
@@ -0,0 +1,279 @@
+"""
+Polling directory scanner for file systems without change notifications.
+
+Network shares (SMB/NFS mounts on a NAS) often never deliver inotify events,
+so the input directory is scanned periodically instead and compared with a
+persisted index of file sizes and modification times. The index also lists
+the detected files that may not have been processed yet, so that a file
+detected just before the service stopped is still processed after a restart.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from ..constants import DEFAULT_QUIET_PERIOD, SCAN_INDEX_FILENAME
+from .debounce import DebounceQueue
+
+
+def scan_directory(directory, recursive=False, exclude=None):
+    """
+    Take a snapshot of the PDF files in a directory.
+
+    Uses os.scandir so each file costs a single stat call.
+
+    Args:
+        directory (str or Path): Directory to scan
+        recursive (bool, optional): Also scan the subdirectories
+        exclude (str or Path, optional): Subdirectory left out of a recursive scan,
+            e.g. the output directory
+
+    Returns:
+        dict: File name (relative path for files in subdirectories) -> [size, mtime in nanoseconds]
+    """
+    snapshot = {}
+    exclude = os.path.realpath(exclude) if exclude is not None else None
+    pending = [("", directory)]
+    while pending:
+        prefix, current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                try:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        if os.path.realpath(entry.path) != exclude:
+                            pending.append((f"{prefix}{entry.name}/", entry.path))
+                        continue
+                    if not entry.name.lower().endswith('.pdf') or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    # Removed between listing and stat
+                    continue
+                snapshot[f"{prefix}{entry.name}"] = [stat.st_size, stat.st_mtime_ns]
+    return snapshot
+
+
+class StatIndex:
+    """Persistent index of the file sizes and modification times seen in a directory."""
+
+    def __init__(self, path, logger=None):
+        """
+        Initialize the index and load it from disk if it exists.
+
+        Args:
+            path (str or Path): Path of the index JSON file
+            logger (Logger, optional): Logger instance
+        """
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries = {}
+        # Names of detected files not known to be processed yet
+        self.pending = set()
+        self.loaded = self.load()
+
+    def load(self):
+        """
+        Load the index from disk.
+
+        Returns:
+            bool: True if a previously saved index was loaded
+        """
+        if not self.path.exists():
+            return False
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("files", {})
+            self.pending = set(data.get("pending", []))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable scan index {self.path}: {str(e)}")
+            self.entries = {}
+            self.pending = set()
+            return False
+        return True
+
+    def save(self):
+        """Write the index to disk atomically."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries, "pending": sorted(self.pending)}, f)
+        os.replace(tmp_path, self.path)
+
+    def diff(self, snapshot):
+        """
+        Compare a snapshot with the index.
+
+        Args:
+            snapshot (dict): Snapshot from scan_directory
+
+        Returns:
+            tuple: (names of new or changed files, names of removed files)
+        """
+        changed = [name for name, signature in snapshot.items()
+                   if self.entries.get(name) != signature]
+        removed = [name for name in self.entries if name not in snapshot]
+        return changed, removed
+
+    def update(self, snapshot, changed, removed, pending=False):
+        """
+        Apply the differences of a snapshot to the index.
+
+        Args:
+            snapshot (dict): Snapshot from scan_directory
+            changed (list): Names of new or changed files
+            removed (list): Names of removed files
+            pending (bool, optional): Record the changed files as waiting to be processed
+        """
+        for name in changed:
+            self.entries[name] = snapshot[name]
+        for name in removed:
+            del self.entries[name]
+        if pending:
+            self.pending.update(changed)
+        self.pending.difference_update(removed)
+
+
+class PollingScanner:
+    """
+    Periodically scans the input directory and queues new or changed PDF files.
+
+    The stat index is persisted in the output directory. On startup the
+    directory is reconciled against it, so files dropped while the service
+    was down are picked up, and detected files that the processor's manifest
+    does not show as processed are queued again. Without a saved index the
+    current files are only recorded, as with the event based watcher.
+    """
+
+    def __init__(self, processor, interval, quiet_period=DEFAULT_QUIET_PERIOD, index_path=None,
+                 callback=None, recursive=False):
+        """
+        Initialize the scanner.
+
+        Args:
+            processor (PDFProcessor): Processor instance for PDFs
+            interval (float): Seconds between two scans
+            quiet_period (float, optional): Seconds a file must stay unchanged before processing
+            index_path (str or Path, optional): Path of the persisted stat index
+            callback (callable, optional): Function called with the Path of each stable
+                file; the processor's process_pdf_file by default
+            recursive (bool, optional): Also scan the subdirectories of the input directory
+        """
+        self.processor = processor
+        self.directory = processor.input_dir
+        self.interval = interval
+        self.logger = processor.logger or logging.getLogger(__name__)
+        self.recursive = recursive
+        self.queue = DebounceQueue(
+            callback or processor.process_pdf_file, quiet_period, self.logger
+        )
+        self.index = StatIndex(
+            index_path or processor.output_dir / SCAN_INDEX_FILENAME, self.logger
+        )
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _scan(self):
+        """
+        Take a snapshot of the input directory, and of its subdirectories if recursive.
+
+        Returns:
+            dict: Snapshot from scan_directory
+        """
+        return scan_directory(self.directory, self.recursive, self.processor.output_dir)
+
+    def scan_once(self):
+        """
+        Scan the directory once and queue new or changed PDF files.
+
+        Returns:
+            list: Paths of the queued files
+        """
+        try:
+            snapshot = self._scan()
+        except OSError as e:
+            self.logger.warning(f"Failed to scan {self.directory}: {str(e)}")
+            return []
+
+        changed, removed = self.index.diff(snapshot)
+        if not changed and not removed:
+            return []
+
+        self._prune_pending()
+        self.index.update(snapshot, changed, removed, pending=True)
+        self.index.save()
+
+        queued = []
+        for name in changed:
+            path = self.directory / name
+            self.logger.info(f"New or changed PDF detected: {path}")
+            self.queue.put(path)
+            queued.append(path)
+        return queued
+
+    def _prune_pending(self):
+        """
+        Drop the pending files that were processed or removed since they were detected.
+
+        Returns:
+            list: Names of the files still waiting to be processed
+        """
+        for name in sorted(self.index.pending):
+            path = self.directory / name
+            if not path.exists() or self.processor.manifest.lookup(path):
+                self.index.pending.discard(name)
+        return sorted(self.index.pending)
+
+    def reconcile(self):
+        """
+        Bring the index up to date when starting.
+
+        Files detected before the service stopped but not processed are queued
+        again, along with the files changed while it was stopped.
+
+        Returns:
+            list: Paths of the files queued for catch-up processing
+        """
+        if self.index.loaded:
+            queued = []
+            for name in self._prune_pending():
+                path = self.directory / name
+                self.logger.info(f"Resuming PDF detected before the last stop: {path}")
+                self.queue.put(path)
+                queued.append(path)
+            self.index.save()
+
+            queued += [path for path in self.scan_once() if path not in queued]
+            if queued:
+                self.logger.info(f"Catching up on {len(queued)} PDFs changed while stopped")
+            return queued
+
+        snapshot = self._scan()
+        self.index.update(snapshot, list(snapshot), [])
+        self.index.save()
+        self.logger.info(f"Indexed {len(snapshot)} existing PDFs in {self.directory}")
+        return []
+
+    def start(self):
+        """Reconcile with the saved index and start polling on a background thread."""
+        self.queue.start()
+        self.reconcile()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="pdf-polling-scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and processing queued files."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.queue.stop()
+
+    def _run(self):
+        """Scan the directory every interval until stopped."""
+        while not self._stop_event.wait(self.interval):
+            self.scan_once()
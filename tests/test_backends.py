@@ -0,0 +1,96 @@
+"""
+Tests for the extraction backends.
+"""
+
+import unittest
+
+from csd_bg_free_float_extractor.extractor.backends import (
+    group_lines,
+    rows_from_lines,
+    open_document,
+)
+from csd_bg_free_float_extractor.extractor.parser import parse_row
+
+
+def _chars(text, x, top, width=5, height=8):
+    """Lay out the characters of a text from left to right."""
+    return [
+        (char, x + i * width, x + (i + 1) * width, top, top + height) for i, char in enumerate(text)
+    ]
+
+
+class TestGroupLines(unittest.TestCase):
+    """Test grouping characters into lines of words."""
+
+    def test_words_split_on_spaces_and_gaps(self):
+        """Test that words are split on space characters and horizontal gaps."""
+        chars = _chars("АД БГ", 10, 100) + _chars("BG1100017174", 200, 101)
+        lines = group_lines(chars)
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual([word.text for word in lines[0]], ["АД", "БГ", "BG1100017174"])
+
+    def test_lines_sorted_top_to_bottom(self):
+        """Test that lines are ordered from the top of the page."""
+        chars = _chars("второ", 10, 120) + _chars("първо", 10, 100)
+        lines = group_lines(chars)
+
+        self.assertEqual([[word.text for word in line] for line in lines], [["първо"], ["второ"]])
+
+
+class TestRowsFromLines(unittest.TestCase):
+    """Test building table rows from lines of words."""
+
+    def _lines(self, *lines):
+        """Build lines from (cells, top) pairs with cells at fixed column offsets."""
+        chars = []
+        for cells, top in lines:
+            for x, cell in zip((10, 200, 300, 380, 460), cells):
+                if cell:
+                    chars.extend(_chars(cell, x, top))
+        return group_lines(chars)
+
+    def test_rows_and_footer(self):
+        """Test that header lines are dropped and data and footer rows are kept."""
+        lines = self._lines(
+            (["Емитент", "Емисия", "Акции", "Фрий", "Брой"], 50),
+            (["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"], 70),
+            (["1 Брой емитенти"], 90),
+        )
+        rows = rows_from_lines(lines)
+
+        self.assertEqual(rows, [
+            ["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"],
+            ["1 Брой емитенти"],
+        ])
+
+    def test_multiline_company_name(self):
+        """Test that a continuation line is appended to the company name."""
+        lines = self._lines(
+            (["БПД Индустриален Фонд", "BG1100008157", "7900000", "0", "1"], 70),
+            (["Имоти АДСИЦ"], 80),
+        )
+        rows = rows_from_lines(lines)
+
+        self.assertEqual(
+            rows, [["БПД Индустриален Фонд\nИмоти АДСИЦ", "BG1100008157", "7900000", "0", "1"]]
+        )
+        self.assertEqual(parse_row(" ".join(filter(None, rows[0])))["Company"],
+                         "БПД Индустриален Фонд Имоти АДСИЦ")
+
+    def test_no_rows(self):
+        """Test that a page without data rows has no table."""
+        self.assertIsNone(rows_from_lines(self._lines((["Някакъв текст"], 50),)))
+
+
+class TestOpenDocument(unittest.TestCase):
+    """Test opening documents with a backend."""
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            open_document("test.pdf", "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
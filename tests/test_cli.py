@@ -2,11 +2,17 @@
 Tests for the command-line interface.
 """
 
+import io
+import shutil
+import tempfile
 import unittest
 import sys
-from unittest.mock import patch
+from contextlib import redirect_stderr
+from unittest.mock import MagicMock, patch
 
-from csd_bg_free_float_extractor.cli import parse_arguments
+from benchmarks.startup import heavy_imports
+from csd_bg_free_float_extractor import cli
+from csd_bg_free_float_extractor.cli import parse_arguments, parse_serve_arguments
 
 
 class TestCLI(unittest.TestCase):
@@ -28,6 +34,7 @@ class TestCLI(unittest.TestCase):
             self.assertTrue(args.watch)
             self.assertTrue(args.process)
             self.assertFalse(getattr(args, 'verbose', False))
+            self.assertEqual(args.jobs, 1)
 
     def test_parse_arguments_verbose(self):
         """Test argument parsing with verbose flag."""
@@ -63,6 +70,115 @@ class TestCLI(unittest.TestCase):
             self.assertTrue(args.process)
             self.assertTrue(args.verbose)
 
+    def test_parse_serve_arguments(self):
+        """Test the arguments of the serve subcommand."""
+        args = parse_serve_arguments(["--port", "9000", "--jobs", "4", "--max-upload-mb", "5"])
+
+        self.assertEqual(args.host, "127.0.0.1")
+        self.assertEqual(args.port, 9000)
+        self.assertEqual(args.jobs, 4)
+        self.assertEqual(args.max_upload_mb, 5)
+
+    def test_parse_arguments_jobs(self):
+        """Test argument parsing with the number of worker processes."""
+        test_args = [
+            "--input", "/path/to/input",
+            "--output", "/path/to/output",
+            "--jobs", "8"
+        ]
+
+        with patch.object(sys, 'argv', ['program'] + test_args):
+            args = parse_arguments()
+
+            self.assertEqual(args.jobs, 8)
+
+    def test_parse_arguments_watch_options(self):
+        """Test argument parsing with watcher options."""
+        test_args = [
+            "--input", "/path/to/input",
+            "--output", "/path/to/output",
+            "--watch", "--quiet-period", "5", "--poll-interval", "30"
+        ]
+
+        with patch.object(sys, 'argv', ['program'] + test_args):
+            args = parse_arguments()
+
+            self.assertEqual(args.quiet_period, 5.0)
+            self.assertEqual(args.poll_interval, 30.0)
+
+    def test_parse_arguments_formats(self):
+        """Test argument parsing with output formats."""
+        test_args = [
+            "--input", "/path/to/input",
+            "--output", "/path/to/output",
+            "--formats", "csv, parquet,xlsx"
+        ]
+
+        with patch.object(sys, 'argv', ['program'] + test_args):
+            args = parse_arguments()
+
+            self.assertEqual(args.formats, ("csv", "parquet", "xlsx"))
+
+    def test_parse_arguments_strict(self):
+        """Test argument parsing with strict validation."""
+        args = parse_arguments(["--input", "/path/to/input", "--output", "/path/to/output"])
+        self.assertFalse(args.strict)
+
+        args = parse_arguments(
+            ["--input", "/path/to/input", "--output", "/path/to/output", "--strict"]
+        )
+        self.assertTrue(args.strict)
+
+    def test_backfill_uses_jobs(self):
+        """Test that the backfill runs on the parallel directory path with several jobs."""
+        processor = MagicMock(jobs=4)
+        scheduler = MagicMock()
+
+        with patch.object(cli.threading, "Thread") as thread:
+            cli._start_backfill(processor, scheduler)
+
+        self.assertEqual(thread.call_args.kwargs["args"], (processor,))
+        thread.return_value.start.assert_called_once()
+        scheduler.submit_backfill.assert_not_called()
+
+        cli._run_backfill(processor)
+        processor.process_directory.assert_called_once_with()
+
+    def test_backfill_single_job_is_scheduled(self):
+        """Test that with one job the backfill is queued behind the watched files."""
+        processor = MagicMock(jobs=1)
+        scheduler = MagicMock()
+
+        cli._start_backfill(processor, scheduler)
+
+        scheduler.submit_backfill.assert_called_once_with(processor.discover_pdfs.return_value)
+
+    def test_conflicting_options_exit_with_error(self):
+        """Test that options the processor rejects end with a message rather than a traceback."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        for options in (["--stream", "--strict"], ["--stream", "--formats", "csv,xlsx"]):
+            with self.subTest(options=options):
+                stderr = io.StringIO()
+                with redirect_stderr(stderr):
+                    code = cli.main(["--input", temp_dir, "--output", temp_dir] + options)
+
+                self.assertEqual(code, 1)
+                self.assertIn("Error: Stream", stderr.getvalue())
+
+    def test_sigterm_interrupts_the_run(self):
+        """Test that SIGTERM unwinds the run like Ctrl+C, so the manifest is saved."""
+        with patch("csd_bg_free_float_extractor.extractor.processor.PDFProcessor") as processor, \
+                patch.object(cli.signal, "signal") as install:
+            code = cli.main(["--input", "/path/to/input", "--output", "/path/to/output"])
+
+        self.assertEqual(code, 0)
+        install.assert_called_once_with(cli.signal.SIGTERM, cli._interrupt)
+        processor.return_value.process_directory.assert_called_once_with()
+        with self.assertRaises(KeyboardInterrupt):
+            cli._interrupt(cli.signal.SIGTERM, None)
+
     @patch('argparse.ArgumentParser.parse_args')
     def test_missing_required_arguments(self, mock_parse_args):
         """Test that required arguments are enforced."""
@@ -72,6 +188,10 @@ class TestCLI(unittest.TestCase):
         with self.assertRaises(SystemExit):
             parse_arguments()
 
+    def test_startup_does_not_import_heavy_modules(self):
+        """Test that parsing the arguments does not import pandas, pdfplumber or watchdog."""
+        self.assertEqual(heavy_imports(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Tests for the day-over-day deltas.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.extractor.deltas import DeltaTracker, compute_delta
+from csd_bg_free_float_extractor.extractor.history import HistoryStore
+
+
+def _frame(rows):
+    """Build a DataFrame like the one returned by the parser."""
+    return pd.DataFrame(
+        rows, columns=["Company", "Emission Code", "Total Shares", "Free Float", "Shareholders"]
+    )
+
+
+class TestComputeDelta(unittest.TestCase):
+    """Test comparing two reports."""
+
+    def test_compute_delta(self):
+        """Test changed, listed and delisted emissions."""
+        previous = _frame(
+            [["A АД", "BG1", 100, 50, 10], ["B АД", "BG2", 200, 80, 20], ["C АД", "BG3", 1, 1, 1]]
+        )
+        current = _frame(
+            [["A АД", "BG1", 100, 55, 12], ["B АД", "BG2", 200, 80, 20], ["D АД", "BG4", 9, 9, 9]]
+        )
+
+        delta = compute_delta(previous, current)
+
+        self.assertEqual(delta["Emission Code"].tolist(), ["BG1", "BG3", "BG4"])
+        self.assertEqual(delta["Change"].tolist(), ["changed", "delisted", "listed"])
+        self.assertEqual(delta["Company"].tolist(), ["A АД", "C АД", "D АД"])
+        self.assertEqual(delta["Free Float Change"].iloc[0], 5)
+        self.assertEqual(delta["Shareholders Change"].iloc[0], 2)
+        self.assertTrue(pd.isna(delta["Free Float"].iloc[1]))
+        self.assertTrue(pd.isna(delta["Previous Free Float"].iloc[2]))
+
+    def test_compute_delta_unchanged(self):
+        """Test that identical reports have an empty delta."""
+        report = _frame([["A АД", "BG1", 100, 50, 10]])
+        self.assertTrue(compute_delta(report, report).empty)
+
+
+class TestDeltaTracker(unittest.TestCase):
+    """Test writing the deltas of stored reports."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.history = HistoryStore(self.output_dir / "history.sqlite")
+        self.tracker = DeltaTracker(self.history, self.output_dir)
+        self.reports = {
+            "26-02-2025": _frame([["A АД", "BG1", 100, 50, 10]]),
+            "27-02-2025": _frame([["A АД", "BG1", 100, 51, 10]]),
+            "28-02-2025": _frame([["A АД", "BG1", 100, 53, 10]]),
+        }
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.history.close()
+        shutil.rmtree(self.output_dir)
+
+    def _free_float_change(self, date):
+        """Read the free float change of a delta file."""
+        delta = pd.read_csv(self.output_dir / f"{date}.delta.csv", encoding="utf-8-sig")
+        return delta["Free Float Change"].tolist()
+
+    def test_update_out_of_order(self):
+        """Test that a late report also updates the delta of the report after it."""
+        for date in ("26-02-2025", "28-02-2025", "27-02-2025"):
+            self.history.upsert(date, self.reports[date])
+            self.tracker.update(date, self.reports[date])
+
+        self.assertFalse((self.output_dir / "26-02-2025.delta.csv").exists())
+        self.assertEqual(self._free_float_change("27-02-2025"), [1])
+        self.assertEqual(self._free_float_change("28-02-2025"), [2])
+
+    def test_build_chain_reads_each_report_once(self):
+        """Test writing the whole delta chain in one pass."""
+        for date, report in self.reports.items():
+            self.history.upsert(date, report)
+
+        with patch.object(self.history, "read_report", wraps=self.history.read_report) as read:
+            written = self.tracker.build_chain(self.reports)
+
+        self.assertEqual(len(written), 2)
+        self.assertEqual(read.call_count, 3)
+        self.assertEqual(self._free_float_change("28-02-2025"), [2])
+
+        # Nothing is written again when all deltas exist and no report changed
+        self.assertEqual(self.tracker.build_chain(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the aggregated diagnostics of rows that could not be parsed.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from csd_bg_free_float_extractor.extractor.diagnostics import (
+    CATEGORY_EMPTY,
+    CATEGORY_FORMAT,
+    CATEGORY_NO_CODE,
+    CATEGORY_NUMBERS,
+    SOURCE_TABLE,
+    SOURCE_TEXT,
+    RowDiagnostics,
+    classify_row
+)
+
+
+class TestClassifyRow(unittest.TestCase):
+    """Test finding out why a row was rejected."""
+
+    def test_categories(self):
+        """Test each failure category."""
+        self.assertEqual(classify_row(""), CATEGORY_EMPTY)
+        self.assertEqual(classify_row(None), CATEGORY_EMPTY)
+        self.assertEqual(classify_row("Страница 2 от 3"), CATEGORY_NO_CODE)
+        self.assertEqual(classify_row("АДВАНС ЕАД BG1100017174 1000 200"), CATEGORY_NUMBERS)
+        self.assertEqual(classify_row("BG1100017174 1000 200 30"), CATEGORY_FORMAT)
+
+
+class TestRowDiagnostics(unittest.TestCase):
+    """Test counting, summarizing and writing rejected rows."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_counts_by_page_and_category(self):
+        """Test that rejected rows are counted per page and category."""
+        diagnostics = RowDiagnostics()
+        diagnostics.add(1, "Страница 1")
+        diagnostics.add(1, "Страница 1 от 2")
+        diagnostics.add(2, "АДВАНС BG1100017174 1000", SOURCE_TEXT)
+
+        self.assertEqual(diagnostics.counts[(1, CATEGORY_NO_CODE)], 2)
+        self.assertEqual(diagnostics.by_category(), {CATEGORY_NO_CODE: 2, CATEGORY_NUMBERS: 1})
+        self.assertEqual(diagnostics.table_rejects(), 2)
+
+    def test_summary_samples_rows(self):
+        """Test that the summary quotes only the first rows."""
+        diagnostics = RowDiagnostics(sample_size=2)
+        for number in range(4):
+            diagnostics.add(3, f"row {number}")
+
+        summary = diagnostics.summary("report.pdf")
+
+        self.assertIn("Skipped 4 rows of report.pdf", summary)
+        self.assertIn("page 3: missing_emission_code 4", summary)
+        self.assertIn("row 0 | row 1 | ... 2 more", summary)
+        self.assertNotIn("row 2", summary)
+
+    def test_merge(self):
+        """Test adding the rows of a kept extraction attempt."""
+        diagnostics = RowDiagnostics()
+        attempt = RowDiagnostics()
+        diagnostics.add(1, "a")
+        attempt.add(1, "b")
+
+        diagnostics.merge(attempt)
+
+        self.assertEqual(diagnostics.counts[(1, CATEGORY_NO_CODE)], 2)
+        self.assertEqual([reject["row"] for reject in diagnostics.rejects], ["a", "b"])
+
+    def test_write_rejects(self):
+        """Test that every rejected row is written as a JSON line."""
+        diagnostics = RowDiagnostics(sample_size=1)
+        diagnostics.add(1, "АДВАНС BG1100017174 1000", SOURCE_TABLE)
+        diagnostics.add(2, "", SOURCE_TEXT)
+        path = self.temp_dir / "report.rejects.jsonl"
+
+        diagnostics.write_rejects(path)
+
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(lines, [
+            {"page": 1, "source": SOURCE_TABLE, "category": CATEGORY_NUMBERS,
+             "row": "АДВАНС BG1100017174 1000"},
+            {"page": 2, "source": SOURCE_TEXT, "category": CATEGORY_EMPTY, "row": ""},
+        ])
+        self.assertEqual(list(self.temp_dir.glob(".*.tmp")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for the history store.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.extractor.history import HistoryStore, iso_date
+
+
+def _frame(rows):
+    """Build a DataFrame like the one returned by the parser."""
+    return pd.DataFrame(
+        rows, columns=["Company", "Emission Code", "Total Shares", "Free Float", "Shareholders"]
+    )
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Test storing extracted reports in the history database."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = HistoryStore(Path(self.temp_dir) / "history.sqlite")
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _rows(self):
+        """Read all stored rows."""
+        return self.store.connection().execute(
+            "SELECT report_date, emission_code, free_float FROM free_float "
+            "ORDER BY report_date, emission_code"
+        ).fetchall()
+
+    def test_iso_date(self):
+        """Test converting report dates to ISO format."""
+        self.assertEqual(iso_date("28-02-2025"), "2025-02-28")
+        self.assertEqual(iso_date("2025-02-28"), "2025-02-28")
+        with self.assertRaises(ValueError):
+            iso_date("28.02.2025")
+
+    def test_upsert_is_idempotent(self):
+        """Test that storing a report again replaces its rows."""
+        first = _frame([["A АД", "BG1", 100, 50, 10], ["B АД", "BG2", 200, 80, 20]])
+        self.store.upsert("27-02-2025", first, source="a.pdf")
+        self.store.upsert("28-02-2025", first, source="b.pdf")
+        self.store.upsert("28-02-2025", _frame([["A АД", "BG1", 100, 60, 11]]), source="b.pdf")
+
+        self.assertEqual(self._rows(), [
+            ("2025-02-27", "BG1", 50),
+            ("2025-02-27", "BG2", 80),
+            ("2025-02-28", "BG1", 60),
+        ])
+        self.assertEqual(self.store.report_dates(), ["2025-02-27", "2025-02-28"])
+        self.assertTrue(self.store.has_report("28-02-2025"))
+        self.assertFalse(self.store.has_report("01-03-2025"))
+        self.assertEqual(self.store.version(), 3)
+
+    def test_upsert_rolls_back_on_error(self):
+        """Test that a failed write leaves the stored rows unchanged."""
+        self.store.upsert("28-02-2025", _frame([["A АД", "BG1", 100, 50, 10]]))
+
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction() as connection:
+                connection.execute("DELETE FROM free_float")
+                raise RuntimeError("write failed")
+
+        self.assertEqual(self._rows(), [("2025-02-28", "BG1", 50)])
+        self.assertEqual(self.store.version(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for extracting files in isolated worker processes.
+"""
+
+import os
+import time
+import unittest
+
+from csd_bg_free_float_extractor.extractor.isolation import (
+    IsolatedWorker,
+    IsolationError,
+    rss_bytes
+)
+
+
+def _initialize():
+    """Prepare a worker; nothing to do."""
+
+
+def _run(task):
+    """Run a test task in the worker."""
+    action, value = task
+    if action == "echo":
+        return value
+    if action == "sleep":
+        time.sleep(value)
+        return value
+    if action == "allocate":
+        block = bytearray(value * 1024 * 1024)
+        time.sleep(5)
+        return len(block)
+    if action == "raise":
+        raise ValueError(value)
+    os._exit(value)
+
+
+class TestIsolatedWorker(unittest.TestCase):
+    """Test running calls in a child process under limits."""
+
+    def test_result_and_reuse(self):
+        """Test that calls return their results and share one process."""
+        with IsolatedWorker(_run, _initialize, timeout=30) as worker:
+            self.assertEqual(worker.run(("echo", 1)), 1)
+            pid = worker._process.pid
+            self.assertEqual(worker.run(("echo", "two")), "two")
+            self.assertEqual(worker._process.pid, pid)
+
+    def test_timeout_kills_and_restarts(self):
+        """Test that a call exceeding the timeout is killed and the next call gets a new worker."""
+        with IsolatedWorker(_run, _initialize, timeout=0.5) as worker:
+            worker.run(("echo", None))
+            pid = worker._process.pid
+            start = time.monotonic()
+            with self.assertRaisesRegex(IsolationError, "Timed out"):
+                worker.run(("sleep", 30))
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertIsNone(worker._process)
+
+            self.assertEqual(worker.run(("echo", 3)), 3)
+            self.assertNotEqual(worker._process.pid, pid)
+
+    @unittest.skipIf(
+        rss_bytes(os.getpid()) is None, "resident memory cannot be read on this platform"
+    )
+    def test_memory_limit(self):
+        """Test that a call exceeding the memory limit is killed."""
+        with IsolatedWorker(_run, _initialize, timeout=30, max_rss=200 * 1024 * 1024) as worker:
+            with self.assertRaisesRegex(IsolationError, "memory limit"):
+                worker.run(("allocate", 400))
+
+    def test_crash_and_error(self):
+        """Test that a dying worker and a failing call are reported."""
+        with IsolatedWorker(_run, _initialize, timeout=30) as worker:
+            with self.assertRaisesRegex(IsolationError, "exit code 3"):
+                worker.run(("exit", 3))
+            with self.assertRaisesRegex(IsolationError, "ValueError: broken"):
+                worker.run(("raise", "broken"))
+
+
+if __name__ == '__main__':
+    unittest.main()
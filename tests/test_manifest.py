@@ -0,0 +1,106 @@
+"""
+Tests for the manifest of processed files.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from csd_bg_free_float_extractor.extractor.manifest import Manifest, file_hash
+
+
+class TestManifest(unittest.TestCase):
+    """Test the manifest of processed files."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "report.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.4 content")
+        self.output_path = self.temp_dir / "28-02-2025.csv"
+        self.output_path.write_text("data")
+        self.manifest_path = self.temp_dir / ".manifest.json"
+        self.manifest = Manifest(self.manifest_path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_lookup_unknown_file(self):
+        """Test that an unrecorded file is not found."""
+        self.assertIsNone(self.manifest.lookup(self.pdf_path))
+
+    def test_record_and_lookup(self):
+        """Test that a recorded file is found after reloading the manifest."""
+        self.manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+
+        entry = Manifest(self.manifest_path).lookup(self.pdf_path)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry["date"], "28-02-2025")
+        self.assertEqual(entry["sha256"], file_hash(self.pdf_path))
+        self.assertEqual(entry["outputs"], [str(self.output_path)])
+
+    def test_lookup_changed_content(self):
+        """Test that a file with new content is not found."""
+        self.manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+        self.pdf_path.write_bytes(b"%PDF-1.4 other content")
+
+        self.assertIsNone(self.manifest.lookup(self.pdf_path))
+
+    def test_lookup_touched_file(self):
+        """Test that a file with a new timestamp but the same content is found."""
+        self.manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+        stat = os.stat(self.pdf_path)
+        os.utime(self.pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertIsNotNone(self.manifest.lookup(self.pdf_path))
+
+    def test_lookup_missing_outputs(self):
+        """Test that a file whose outputs were removed is not found."""
+        self.manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+        self.output_path.unlink()
+
+        self.assertIsNone(self.manifest.lookup(self.pdf_path))
+
+    def test_deferred_save(self):
+        """Test that saving is deferred until the end of the block."""
+        with self.manifest.deferred():
+            self.manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+            self.assertFalse(self.manifest_path.exists())
+
+        self.assertTrue(self.manifest_path.exists())
+
+
+    def test_deferred_save_is_periodic(self):
+        """Test that a deferred manifest is saved every few changes and when interrupted."""
+        manifest = Manifest(self.manifest_path, save_changes=2)
+        second_pdf = self.temp_dir / "other.pdf"
+        second_pdf.write_bytes(b"%PDF-1.4 other")
+
+        with self.assertRaises(KeyboardInterrupt):
+            with manifest.deferred():
+                manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+                self.assertFalse(self.manifest_path.exists())
+                manifest.record(second_pdf, "28-02-2025", [self.output_path])
+                self.assertEqual(len(Manifest(self.manifest_path).entries), 2)
+
+                self.pdf_path.write_bytes(b"%PDF-1.4 changed")
+                manifest.record(self.pdf_path, "01-03-2025", [self.output_path])
+                raise KeyboardInterrupt
+
+        entry = Manifest(self.manifest_path).lookup(self.pdf_path)
+        self.assertEqual(entry["date"], "01-03-2025")
+
+    def test_deferred_save_after_interval(self):
+        """Test that a deferred manifest is saved on a change once the interval has passed."""
+        manifest = Manifest(self.manifest_path, save_seconds=0)
+
+        with manifest.deferred():
+            manifest.record(self.pdf_path, "28-02-2025", [self.output_path])
+            self.assertTrue(self.manifest_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
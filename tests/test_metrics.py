@@ -0,0 +1,96 @@
+"""
+Tests for the per-file metrics and their export.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from csd_bg_free_float_extractor.extractor.metrics import FileMetrics, MetricsExporter
+
+
+class TestFileMetrics(unittest.TestCase):
+    """Test recording stage timings and counters."""
+
+    def test_stages_and_counters(self):
+        """Test that repeated stages and counters accumulate."""
+        metrics = FileMetrics("report.pdf")
+        with metrics.stage("tables"):
+            pass
+        metrics.add_time("tables", 1.5)
+        metrics.count("fallback_pages")
+        metrics.count("fallback_pages", 2)
+        metrics.set("pages", 4)
+
+        self.assertGreaterEqual(metrics.stages["tables"], 1.5)
+        self.assertEqual(metrics.counters, {"fallback_pages": 3, "pages": 4})
+
+    def test_merge_without_counters(self):
+        """Test that a discarded attempt only adds its timings."""
+        metrics = FileMetrics("report.pdf")
+        attempt = FileMetrics("report.pdf")
+        attempt.add_time("open", 0.5)
+        attempt.set("rows_parsed", 10)
+
+        metrics.merge(attempt, counters=False)
+
+        self.assertEqual(metrics.stages, {"open": 0.5})
+        self.assertEqual(metrics.counters, {})
+
+    def test_dict_round_trip(self):
+        """Test that metrics survive the trip from a worker process."""
+        metrics = FileMetrics("report.pdf")
+        metrics.date = "28-02-2025"
+        metrics.success = True
+        metrics.add_time("parse", 0.25)
+        metrics.set("rows_parsed", 2)
+
+        copy = FileMetrics.from_dict(json.loads(json.dumps(metrics.to_dict())))
+
+        self.assertEqual(copy.to_dict(), metrics.to_dict())
+
+
+class TestMetricsExporter(unittest.TestCase):
+    """Test exporting metrics as JSON summaries and a Prometheus textfile."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def _metrics(self, name, success=True):
+        """Build the metrics of a processed file."""
+        metrics = FileMetrics(self.temp_dir / f"{name}.pdf")
+        metrics.success = success
+        metrics.add_time("total", 2.0)
+        metrics.set("rows_parsed", 100)
+        return metrics
+
+    def test_export(self):
+        """Test that each file gets a JSON summary and the textfile holds totals."""
+        textfile = self.temp_dir / "extractor.prom"
+        exporter = MetricsExporter(self.temp_dir / "metrics", textfile)
+
+        exporter(self._metrics("a"))
+        exporter(self._metrics("b", success=False))
+
+        summary = json.loads((self.temp_dir / "metrics" / "a.json").read_text())
+        self.assertEqual(summary["counters"], {"rows_parsed": 100})
+        self.assertTrue((self.temp_dir / "metrics" / "b.json").exists())
+
+        text = textfile.read_text()
+        self.assertIn('free_float_extractor_files_total{status="success"} 1', text)
+        self.assertIn('free_float_extractor_files_total{status="failure"} 1', text)
+        self.assertIn('free_float_extractor_stage_seconds_total{stage="total"} 4.000000', text)
+        self.assertIn('free_float_extractor_events_total{counter="rows_parsed"} 200', text)
+        self.assertIn("free_float_extractor_last_file_rows_per_second 50.000", text)
+        self.assertEqual(list(self.temp_dir.glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,18 @@ Tests for the PDF parser functionality.
 
 import unittest
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
-from csd_bg_free_float_extractor.extractor.parser import parse_row, extract_date_from_text, PDFParser
+import pandas as pd
+
+from csd_bg_free_float_extractor.constants import CSV_COLUMNS, HEADER_TEXT, PATTERN_ROW
+from csd_bg_free_float_extractor.extractor.diagnostics import RowDiagnostics
+from csd_bg_free_float_extractor.extractor.metrics import FileMetrics
+from csd_bg_free_float_extractor.extractor.parser import (
+    parse_row, parse_rows, split_row, extract_date_from_text, compare_frames, PDFParser,
+    _normalize_row, _tokenize_row
+)
 
 
 class TestParseRow(unittest.TestCase):
@@ -56,6 +66,104 @@ class TestParseRow(unittest.TestCase):
         self.assertIsNone(parse_row(row, self.logger))
 
 
+class TestParseRows(unittest.TestCase):
+    """Test the vectorized batch row parsing."""
+
+    ROWS = [
+        '235 ХОЛДИНГС АД BG1100017174 5109000 2583625 41',
+        'БПД Индустриален Фонд за Недвижими BG1100008157 7900000 0 1\nИмоти"АДСИЦ',
+        'БПД Индустриален Фонд\nза Недвижими Имоти BG1100008157 7900000 0 1',
+        'BG1100008157 7900000 0 1\nБПД АДСИЦ',
+        '  АЛФА  АД   BG1100000001   100 50 3',
+        'АЛФА АД BG1100000001 100 50 3 ',
+        'Invalid Data Here',
+        'АЛФА АД BG1100000001 100 50',
+        '',
+        None,
+    ]
+
+    def test_matches_parse_row(self):
+        """Test that batch parsing gives the same records as parse_row."""
+        df, rejected = parse_rows(self.ROWS)
+        expected = [parse_row(row) for row in self.ROWS]
+
+        self.assertEqual(df.to_dict("records"), [row for row in expected if row])
+        self.assertEqual([position for position, _ in rejected],
+                         [position for position, row in enumerate(expected) if row is None])
+
+    def test_typed_columns(self):
+        """Test that numeric columns are built as integers."""
+        df, _ = parse_rows(self.ROWS[:1])
+
+        self.assertEqual(list(df.columns), CSV_COLUMNS)
+        self.assertEqual(str(df["Total Shares"].dtype), "int64")
+        self.assertEqual(df["Free Float"].iat[0], 2583625)
+
+    def test_rejected_rows_are_reported(self):
+        """Test that each row that does not match is logged individually."""
+        logger = MagicMock()
+        _, rejected = parse_rows(
+            [
+                "Invalid Data Here",
+                "235 ХОЛДИНГС АД BG1100017174 5109000 2583625 41",
+                "Other invalid row",
+            ],
+            logger,
+        )
+
+        self.assertEqual(rejected, [(0, 'Invalid Data Here'), (2, 'Other invalid row')])
+        self.assertEqual(logger.warning.call_count, 2)
+
+    def test_empty_batch(self):
+        """Test parsing an empty batch."""
+        df, rejected = parse_rows([])
+
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), CSV_COLUMNS)
+        self.assertEqual(rejected, [])
+
+
+class TestSplitRow(unittest.TestCase):
+    """Test that the right-anchored tokenizer reads rows like the regex."""
+
+    ROWS = TestParseRows.ROWS[:-1] + [
+        'ХОЛДИНГ BG 2024 BG11 BGN 100 BG1100000001 100 50 3',
+        'ХОЛДИНГ 1 2 3 BG1100000001 100 50 3',
+        'ХОЛДИНГ BG1100000001 100 50 3 АД',
+        'ХОЛДИНГ BG 100 50 3',
+        'ХОЛДИНГ XX1100000001 100 50 3',
+        'ХОЛДИНГ BG1100000001 100 5² 3',
+        'ХОЛДИНГ BG1100000001 100 ٥٠ 3',
+        'ХОЛДИНГ\u00a0АД\tBG1100000001\u00a0100 50 3',
+        '   BG1100000001 100 50 3',
+        'АЛФА АД BG1100000001 100 50 3\n',
+        'АЛФА\nАД BG1100000001 100 50 3',
+    ]
+
+    @staticmethod
+    def regex_fields(row):
+        match = PATTERN_ROW.match(row)
+        if match is None:
+            return None
+        return (match.group("company").strip(),) + match.groups()[1:]
+
+    def test_same_fields_as_regex(self):
+        """Test that split_row gives the regex's fields on valid and adversarial rows."""
+        for row in self.ROWS:
+            with self.subTest(row=row):
+                self.assertEqual(split_row(row), self.regex_fields(row))
+                if "\n" in row:
+                    normalized = _normalize_row(row)
+                    self.assertEqual(split_row(normalized), self.regex_fields(normalized))
+
+    def test_tokenizer_decides_table_rows(self):
+        """Test that single-line table rows do not fall back to the regex."""
+        self.assertEqual(_tokenize_row('235 ХОЛДИНГС АД BG1100017174 5109000 2583625 41'),
+                         ('235 ХОЛДИНГС АД', 'BG1100017174', '5109000', '2583625', '41'))
+        self.assertEqual(_tokenize_row('Invalid Data Here'), ())
+        self.assertIsNone(_tokenize_row('   BG1100000001 100 50 3'))
+
+
 class TestExtractDate(unittest.TestCase):
     """Test the date extraction functionality."""
 
@@ -94,6 +202,267 @@ class TestPDFParser(unittest.TestCase):
         self.assertIsNotNone(self.parser)
         self.assertEqual(self.parser.logger, self.logger)
 
+    def test_capturing(self):
+        """Test that a capturing copy buffers its records and leaves the parser's logger."""
+        parser, buffer = self.parser.capturing(logging.INFO)
+
+        parser.logger.info("held back")
+
+        self.assertIsNot(parser.logger, self.logger)
+        self.assertIs(self.parser.logger, self.logger)
+        self.assertEqual([record.getMessage() for record in buffer.records], ["held back"])
+
+    @staticmethod
+    def _make_page(table=None, text=None, header_text=None):
+        """Create a fake pdfplumber page."""
+        page = MagicMock()
+        page.width, page.height = 595, 842
+        page.extract_table.return_value = table
+        page.extract_text.return_value = text
+        page.crop.return_value.extract_text.return_value = header_text
+        return page
+
+    def _mock_pdf(self, pages):
+        """Patch pdfplumber.open to return a document with the given pages."""
+        pdf = MagicMock()
+        pdf.pages = pages
+        pdf.__enter__.return_value = pdf
+        return patch('pdfplumber.open', return_value=pdf)
+
+    def test_extract_single_pass(self):
+        """Test that tables are parsed without extracting page text."""
+        header = f"{HEADER_TEXT} 28-02-2025"
+        first = self._make_page(
+            table=[
+                ["Емитент", "Емисия"],
+                ["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"],
+            ],
+            header_text=header,
+        )
+        second = self._make_page(
+            table=[["АЛФА АД", "BG1100000001", "100", "50", "3"], ["2 Брой емитенти"]]
+        )
+
+        with self._mock_pdf([first, second]):
+            df, extracted_date, errors_occurred = self.parser.extract_data_from_pdf("test.pdf")
+
+        self.assertEqual(extracted_date, "28-02-2025")
+        self.assertFalse(errors_occurred)
+        self.assertEqual(list(df["Emission Code"]), ["BG1100017174", "BG1100000001"])
+        first.crop.assert_called_once()
+        second.crop.assert_not_called()
+        first.extract_text.assert_not_called()
+        second.extract_text.assert_not_called()
+
+    def test_iter_rows_releases_pages(self):
+        """Test that rows are yielded page by page and each page is released after use."""
+        first = self._make_page(
+            table=[
+                ["Емитент", "Емисия"],
+                ["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"],
+            ]
+        )
+        second = self._make_page(
+            table=[["АЛФА АД", "BG1100000001", "100", "50", "3"], ["2 Брой емитенти"]]
+        )
+        metrics = FileMetrics("test.pdf")
+
+        with self._mock_pdf([first, second]):
+            rows = self.parser.iter_rows("test.pdf", metrics=metrics)
+            first_row = next(rows)
+            # The second page is not read before the first page's rows are consumed
+            second.extract_table.assert_not_called()
+            first.close.assert_called_once()
+            remaining = list(rows)
+
+        self.assertEqual(first_row["Emission Code"], "BG1100017174")
+        self.assertEqual([row["Emission Code"] for row in remaining], ["BG1100000001"])
+        second.close.assert_called_once()
+        self.assertEqual(metrics.counters["rows_parsed"], 2)
+        self.assertEqual(metrics.counters["emitent_count_mismatch"], 0)
+
+    def test_extract_text_fallback_reads_page_once(self):
+        """Test that a page without a table has its text extracted only once."""
+        page = self._make_page(
+            text="235 ХОЛДИНГС АД BG1100017174 5109000 2583625 41\n1 Брой емитенти",
+            header_text="Some header without a date"
+        )
+        error_callback = MagicMock()
+        metrics = FileMetrics("test.pdf")
+
+        with self._mock_pdf([page]):
+            df, extracted_date, errors_occurred = self.parser.extract_data_from_pdf(
+                "test.pdf", error_callback=error_callback, metrics=metrics
+            )
+
+        self.assertEqual(len(df), 1)
+        self.assertTrue(errors_occurred)
+        self.assertIsNotNone(extracted_date)
+        page.extract_text.assert_called_once()
+        error_callback.assert_called()
+
+        self.assertEqual(
+            metrics.counters,
+            {
+                "pages": 1,
+                "fallback_pages": 1,
+                "rows_parsed": 1,
+                "rows_rejected": 0,
+                "emitent_count_mismatch": 0,
+            },
+        )
+        self.assertEqual(
+            set(metrics.stages), {"open", "header", "tables", "text_fallback", "parse"}
+        )
+
+    def test_rejected_rows_are_summarized(self):
+        """Test that malformed table rows are collected and reported once per file."""
+        page = self._make_page(
+            table=[
+                ["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"],
+                ["АЛФА АД", "BG1100000001", "100"],
+                ["БЕТА АД", "BG1100000002", "200"],
+            ],
+            header_text=f"{HEADER_TEXT} 28-02-2025",
+        )
+        error_callback = MagicMock()
+        metrics = FileMetrics("test.pdf")
+        diagnostics = RowDiagnostics()
+
+        with self._mock_pdf([page]), self.assertLogs(self.parser.logger, logging.WARNING) as logs:
+            df, _, errors_occurred = self.parser.extract_data_from_pdf(
+                "test.pdf", error_callback=error_callback, metrics=metrics, diagnostics=diagnostics
+            )
+
+        self.assertEqual(len(df), 1)
+        self.assertTrue(errors_occurred)
+        self.assertEqual(error_callback.call_count, 1)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("Skipped 2 rows of test.pdf", logs.output[0])
+        self.assertEqual(diagnostics.by_category(), {"missing_numbers": 2})
+        self.assertEqual(metrics.counters["rows_rejected"], 2)
+
+    def test_template_misfit_is_relearned(self):
+        """Test that a template producing different rows is dropped and not used."""
+        table = [["235 ХОЛДИНГС АД", "BG1100017174", "5109000", "2583625", "41"],
+                 ["АЛФА АД", "BG1100000001", "100", "50", "3"], ["2 Брой емитенти"]]
+        page = self._make_page(table=table)
+        template = MagicMock()
+        template.extract_table.return_value = [table[0], table[2]]
+        cache = MagicMock()
+        cache.get.return_value = template
+        parser = PDFParser(self.logger, template_cache=cache)
+
+        with self._mock_pdf([page]), patch(
+                'csd_bg_free_float_extractor.extractor.parser.layout_fingerprint',
+                return_value="layout"):
+            df, _, errors_occurred = parser.extract_data_from_pdf("test.pdf")
+
+        self.assertEqual(len(df), 2)
+        template.extract_table.assert_called_once_with(page)
+        cache.discard.assert_called_once_with("layout")
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            PDFParser(self.logger, backend="unknown")
+
+    def test_pdfminer_falls_back_to_pdfplumber(self):
+        """Test that a failed pdfminer extraction is redone with pdfplumber."""
+        parser = PDFParser(self.logger, backend="pdfminer")
+        frame = pd.DataFrame([{"Emission Code": "BG1100017174"}])
+        results = {
+            "pdfminer": (pd.DataFrame(), "28-02-2025", True),
+            "pdfplumber": (frame, "28-02-2025", False),
+        }
+
+        def extract_with(self, pdf_path, backend, error_callback=None, metrics=None,
+                         diagnostics=None):
+            return results[backend]
+
+        with patch.object(PDFParser, "_extract", autospec=True,
+                          side_effect=extract_with) as extract:
+            metrics = FileMetrics("test.pdf")
+            df, extracted_date, errors_occurred = parser.extract_data_from_pdf(
+                "test.pdf", metrics=metrics
+            )
+
+        self.assertIs(df, frame)
+        self.assertFalse(errors_occurred)
+        self.assertEqual(
+            [call.args[2] for call in extract.call_args_list], ["pdfminer", "pdfplumber"]
+        )
+        self.assertEqual(metrics.counters["backend_fallbacks"], 1)
+
+    def test_compare_frames(self):
+        """Test finding rows extracted by only one backend."""
+        row = {
+            "Company": "А",
+            "Emission Code": "BG1",
+            "Total Shares": 1,
+            "Free Float": 1,
+            "Shareholders": 1,
+        }
+        other = dict(row, **{"Emission Code": "BG2"})
+
+        differences = compare_frames(pd.DataFrame([row, other]), pd.DataFrame([row]))
+        self.assertEqual(len(differences), 1)
+        self.assertEqual(differences[0][0], "pdfplumber")
+        self.assertEqual(differences[0][1]["Emission Code"], "BG2")
+        self.assertEqual(compare_frames(pd.DataFrame([row]), pd.DataFrame([row])), [])
+
+
+class TestPageParallelExtraction(unittest.TestCase):
+    """Test splitting the pages of a document across workers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.logger = logging.getLogger('test_logger')
+        self.logger.setLevel(logging.ERROR)  # Suppress warnings during tests
+        self.parser = PDFParser(self.logger, page_jobs=3)
+        # Threads stand in for the worker processes
+        self.parser._page_pool = ThreadPoolExecutor(max_workers=3)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.parser.close()
+
+    @staticmethod
+    def _fake_page_range(pdf_path, first_page, last_page, log_level, backend):
+        """Return one row per page and the footer count on the last page."""
+        rows = [(page, f"row {page}", True) for page in range(first_page, last_page + 1)]
+        count = 7 if last_page == 7 else None
+        errors = 1 if first_page == 1 else 0
+        record = logging.makeLogRecord(
+            {
+                "msg": f"pages {first_page}-{last_page}",
+                "levelno": logging.ERROR,
+                "levelname": "ERROR",
+            }
+        )
+        return rows, count, errors, [record]
+
+    def test_merges_pages_in_order(self):
+        """Test that worker results are merged in page order."""
+        error_callback = MagicMock()
+        handler = MagicMock(level=logging.NOTSET)
+        self.logger.addHandler(handler)
+
+        try:
+            with patch('csd_bg_free_float_extractor.extractor.parser._extract_page_range',
+                       side_effect=self._fake_page_range):
+                rows, emitent_count, errors_occurred = self.parser._extract_pages_in_parallel(
+                    "test.pdf", 7, error_callback
+                )
+        finally:
+            self.logger.removeHandler(handler)
+
+        self.assertEqual([row[0] for row in rows], list(range(1, 8)))
+        self.assertEqual(emitent_count, 7)
+        self.assertTrue(errors_occurred)
+        self.assertEqual(error_callback.call_count, 1)
+        self.assertEqual(handler.handle.call_count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -7,8 +7,16 @@ from pathlib import Path
 import tempfile
 import shutil
 import logging
+import threading
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
 
-from csd_bg_free_float_extractor.extractor.processor import PDFProcessor, LogHandler
+import pandas as pd
+
+from csd_bg_free_float_extractor.extractor.isolation import IsolationError
+from csd_bg_free_float_extractor.extractor import processor as processor_module
+from csd_bg_free_float_extractor.extractor.metrics import FileMetrics
+from csd_bg_free_float_extractor.extractor.processor import PDFProcessor, LogHandler, resolve_jobs
 
 
 class TestLogHandler(unittest.TestCase):
@@ -26,6 +34,7 @@ class TestLogHandler(unittest.TestCase):
 
     def tearDown(self):
         """Clean up test fixtures."""
+        self.log_handler.cleanup()
         shutil.rmtree(self.temp_dir)
 
     def test_setup_file_logger(self):
@@ -76,6 +85,30 @@ class TestLogHandler(unittest.TestCase):
         # File should still exist
         self.assertTrue(log_file.exists())
 
+    def test_concurrent_files_do_not_share_logs(self):
+        """Test that files processed in parallel threads only log into their own error file."""
+        barrier = threading.Barrier(3)
+
+        def process(name):
+            log_handler = LogHandler(self.logger, self.output_dir)
+            log_handler.setup_file_logger(name)
+            barrier.wait()
+            self.logger.warning(f"Problem in {name}")
+            barrier.wait()
+            log_handler.mark_error()
+            log_handler.cleanup()
+
+        threads = [threading.Thread(target=process, args=(name,)) for name in ("a", "b", "c")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name in ("a", "b", "c"):
+            lines = (self.output_dir / f"{name}.errors.log").read_text().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertTrue(lines[0].endswith(f"Problem in {name}"))
+
 
 class TestPDFProcessor(unittest.TestCase):
     """Test the PDF processor functionality."""
@@ -111,6 +144,287 @@ class TestPDFProcessor(unittest.TestCase):
         output_files = self.processor.process_directory()
         self.assertEqual(len(output_files), 0)
 
+    def _extracted_frame(self):
+        """Build a DataFrame like the one returned by the parser."""
+        return pd.DataFrame([{
+            "Company": "235 ХОЛДИНГС АД",
+            "Emission Code": "BG1100017174",
+            "Total Shares": 5109000,
+            "Free Float": 2583625,
+            "Shareholders": 41
+        }])
+
+    def test_process_pdf_file_skips_unchanged(self):
+        """Test that an unchanged file is not parsed again."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+
+        with patch.object(self.processor.parser, "extract_data_from_pdf",
+                          return_value=(self._extracted_frame(), "28-02-2025", False)) as extract:
+            first = self.processor.process_pdf_file(pdf_path)
+            second = self.processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(first, (True, Path(self.output_dir) / "28-02-2025.csv"))
+        self.assertEqual(second, first)
+        self.assertEqual(extract.call_count, 1)
+        self.assertTrue(self.processor.history.has_report("28-02-2025"))
+
+    def test_process_pdf_file_force(self):
+        """Test that forcing reprocesses an unchanged file."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, force=True)
+
+        with patch.object(processor.parser, "extract_data_from_pdf",
+                          return_value=(self._extracted_frame(), "28-02-2025", False)) as extract:
+            processor.process_pdf_file(pdf_path)
+            processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(extract.call_count, 2)
+
+    def test_process_pdf_file_new_format(self):
+        """Test that an unchanged file is processed again for a newly requested format."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        processor = PDFProcessor(
+            self.input_dir, self.output_dir, self.logger, formats=("xlsx", "csv")
+        )
+
+        with patch.object(self.processor.parser, "extract_data_from_pdf",
+                          return_value=(self._extracted_frame(), "28-02-2025", False)):
+            self.processor.process_pdf_file(pdf_path)
+
+        with patch.object(processor.parser, "extract_data_from_pdf",
+                          return_value=(self._extracted_frame(), "28-02-2025", False)) as extract:
+            result = processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(result, (True, Path(self.output_dir) / "28-02-2025.xlsx"))
+        self.assertTrue((Path(self.output_dir) / "28-02-2025.xlsx").exists())
+
+    def test_metrics_hooks(self):
+        """Test that the metrics of a processed file are passed to the hooks."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        received = []
+        self.processor.add_metrics_hook(received.append)
+
+        with patch.object(self.processor.parser, "extract_data_from_pdf",
+                          return_value=(self._extracted_frame(), "28-02-2025", False)):
+            self.processor.process_pdf_file(pdf_path)
+            self.processor.process_pdf_file(pdf_path)
+
+        # The unchanged file is skipped the second time
+        self.assertEqual(len(received), 1)
+        metrics = received[0]
+        self.assertTrue(metrics.success)
+        self.assertEqual(metrics.date, "28-02-2025")
+        self.assertIn("write_csv", metrics.stages)
+        self.assertIn("history", metrics.stages)
+        self.assertIn("total", metrics.stages)
+
+    def test_report_is_stored_under_the_date_lock(self):
+        """Test that the outputs, history and deltas of a date are updated under one lock."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        events = []
+
+        @contextmanager
+        def recording_lock(report_date, output_dir=None):
+            events.append(("lock", report_date))
+            yield
+            events.append(("unlock", report_date))
+
+        with patch.object(processor_module, "date_lock", recording_lock), \
+                patch.object(self.processor.history, "upsert",
+                             side_effect=lambda *args, **kwargs: events.append("history")), \
+                patch.object(self.processor.deltas, "update",
+                             side_effect=lambda *args: events.append("deltas")), \
+                patch.object(self.processor.parser, "extract_data_from_pdf",
+                             return_value=(self._extracted_frame(), "28-02-2025", False)):
+            self.processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(events, [
+            ("lock", "28-02-2025"), "history", "deltas", ("unlock", "28-02-2025")
+        ])
+
+    def test_streaming(self):
+        """Test that streamed rows are written to the CSV file and stored in the history."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, streaming=True)
+        rows = self._extracted_frame().to_dict("records")
+
+        with patch.object(processor.parser, "read_date", return_value="28-02-2025"), \
+                patch.object(processor.parser, "iter_rows", return_value=iter(rows)):
+            result = processor.process_pdf_file(pdf_path)
+
+        output = Path(self.output_dir) / "28-02-2025.csv"
+        self.assertEqual(result, (True, output))
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output, encoding="utf-8-sig"), self._extracted_frame()
+        )
+        pd.testing.assert_frame_equal(
+            processor.history.read_report("28-02-2025"), self._extracted_frame()
+        )
+
+        with self.assertRaises(ValueError):
+            PDFProcessor(
+                self.input_dir, self.output_dir, self.logger, streaming=True, formats=("xlsx",)
+            )
+
+    def test_streaming_no_rows_keeps_existing_report(self):
+        """Test that a streamed PDF without rows does not replace the report of its date."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        output = Path(self.output_dir) / "28-02-2025.csv"
+        output.write_text("existing report", encoding="utf-8")
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, streaming=True)
+
+        with patch.object(processor.parser, "read_date", return_value="28-02-2025"), \
+                patch.object(processor.parser, "iter_rows", return_value=iter([])):
+            result = processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(result, (False, None))
+        self.assertEqual(output.read_text(encoding="utf-8"), "existing report")
+        with self.assertRaises(ValueError):
+            PDFProcessor(self.input_dir, self.output_dir, self.logger, streaming=True, strict=True)
+
+    def test_validation_violations(self):
+        """Test that violations go to the error log and reject the file in strict mode."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 content")
+        logger = logging.getLogger('test_validation_logger')
+        logger.setLevel(logging.WARNING)
+        df = pd.concat([self._extracted_frame()] * 2, ignore_index=True)
+        error_log = Path(self.output_dir) / "report.errors.log"
+
+        processor = PDFProcessor(self.input_dir, self.output_dir, logger, history=False)
+        with patch.object(
+            processor.parser, "extract_data_from_pdf", return_value=(df, "28-02-2025", False)
+        ):
+            result = processor.process_pdf_file(pdf_path)
+
+        self.assertEqual(result, (True, Path(self.output_dir) / "28-02-2025.csv"))
+        self.assertIn(
+            "Row 2 (BG1100017174, 235 ХОЛДИНГС АД): duplicate_code",
+            error_log.read_text(encoding="utf-8"),
+        )
+        error_log.unlink()
+
+        strict = PDFProcessor(
+            self.input_dir, self.output_dir, logger, history=False, force=True, strict=True
+        )
+        with patch.object(
+            strict.parser, "extract_data_from_pdf", return_value=(df, "01-03-2025", False)
+        ):
+            result = strict.process_pdf_file(pdf_path)
+
+        self.assertFalse(result[0])
+        self.assertFalse((Path(self.output_dir) / "01-03-2025.csv").exists())
+        self.assertIn("Rejected", error_log.read_text(encoding="utf-8"))
+
+    def test_process_directory_background_writes(self):
+        """Test that outputs written in the background are returned in input order."""
+        for name in ("a", "b"):
+            (Path(self.input_dir) / f"{name}.pdf").write_bytes(f"%PDF-1.4 {name}".encode())
+        results = [
+            (self._extracted_frame(), "27-02-2025", False),
+            (self._extracted_frame(), "28-02-2025", False),
+        ]
+
+        with patch.object(self.processor.parser, "extract_data_from_pdf", side_effect=results):
+            output_files = self.processor.process_directory()
+
+        self.assertEqual(output_files, [Path(self.output_dir) / "27-02-2025.csv",
+                                        Path(self.output_dir) / "28-02-2025.csv"])
+        self.assertEqual(self.processor.history.report_dates(), ["2025-02-27", "2025-02-28"])
+        self.assertFalse(list(Path(self.output_dir).glob("*.tmp")))
+
+    def test_recursive_discovery_newest_first(self):
+        """Test that nested archives are found and ordered by the dates in their names."""
+        for relative in (
+            "2024/12/31-12-2024.pdf",
+            "2025/02/28-02-2025.pdf",
+            "2025/01/15-01-2025.pdf",
+        ):
+            path = Path(self.input_dir) / relative
+            path.parent.mkdir(parents=True)
+            path.write_bytes(b"%PDF-1.4")
+        (Path(self.input_dir) / "top.pdf").write_bytes(b"%PDF-1.4")
+
+        self.assertEqual(self.processor.discover_pdfs(), [Path(self.input_dir) / "top.pdf"])
+
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, recursive=True)
+        with patch.object(processor.parser, "read_date", return_value=None):
+            ordered = processor.order_files(processor.discover_pdfs())
+
+        self.assertEqual([path.name for path in ordered],
+                         ["28-02-2025.pdf", "15-01-2025.pdf", "31-12-2024.pdf", "top.pdf"])
+
+    def test_isolated_file_is_retried_and_quarantined(self):
+        """Test that a file killed on every attempt ends up in the failed directory."""
+        pdf_path = Path(self.input_dir) / "huge.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 huge")
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, timeout=1, retries=2,
+                                 retry_backoff=0)
+        worker = MagicMock()
+        worker.run.side_effect = IsolationError("Timed out after 1s")
+
+        with patch.object(processor, "_isolated_worker", return_value=worker):
+            output_files = processor.process_directory()
+
+        self.assertEqual(output_files, [])
+        self.assertEqual(worker.run.call_count, 3)
+        worker.close.assert_called_once()
+        self.assertFalse(pdf_path.exists())
+        failed_dir = Path(self.output_dir) / "failed"
+        self.assertTrue((failed_dir / "huge.pdf").exists())
+        log_lines = (failed_dir / "huge.errors.log").read_text().splitlines()
+        self.assertEqual(len(log_lines), 3)
+        self.assertIn("Attempt 3 of", log_lines[2])
+        self.assertIn("Timed out after 1s", log_lines[2])
+
+    def test_isolated_retry_succeeds(self):
+        """Test that a file killed once is processed on its retry."""
+        pdf_path = Path(self.input_dir) / "report.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 report")
+        output = Path(self.output_dir) / "28-02-2025.csv"
+        output.write_text("Company\n")
+        processor = PDFProcessor(self.input_dir, self.output_dir, self.logger, max_rss_mb=100,
+                                 retry_backoff=0, history=False)
+        worker = MagicMock()
+        worker.run.side_effect = [IsolationError("Exceeded the memory limit"),
+                                  ((True, "28-02-2025", [output]), FileMetrics(pdf_path).to_dict())]
+
+        with patch.object(processor, "_isolated_worker", return_value=worker):
+            output_files = processor.process_directory()
+
+        self.assertEqual(output_files, [output])
+        self.assertTrue(pdf_path.exists())
+        self.assertFalse((Path(self.output_dir) / "failed").exists())
+
+    def test_resolve_jobs(self):
+        """Test resolving the number of worker processes."""
+        self.assertEqual(resolve_jobs(None), 1)
+        self.assertEqual(resolve_jobs(4), 4)
+        self.assertGreaterEqual(resolve_jobs(0), 1)
+
+    def test_process_directory_parallel_error_logs(self):
+        """Test that each file gets its own error log when processed in a pool."""
+        for name in ("a", "b", "c"):
+            (Path(self.input_dir) / f"{name}.pdf").write_bytes(b"not a pdf")
+
+        output_files = self.processor.process_directory(jobs=2)
+        self.assertEqual(output_files, [])
+
+        for name in ("a", "b", "c"):
+            log_file = Path(self.output_dir) / f"{name}.errors.log"
+            self.assertTrue(log_file.exists())
+            self.assertIn(f"{name}.pdf", log_file.read_text())
+            for other in {"a", "b", "c"} - {name}:
+                self.assertNotIn(f"{other}.pdf", log_file.read_text())
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Tests for the history queries.
+"""
+
+import io
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.cli import main
+from csd_bg_free_float_extractor.extractor.history import HistoryStore
+from csd_bg_free_float_extractor.extractor.query import HistoryIndex
+
+
+def _frame(rows):
+    """Build a DataFrame like the one returned by the parser."""
+    return pd.DataFrame(
+        rows, columns=["Company", "Emission Code", "Total Shares", "Free Float", "Shareholders"]
+    )
+
+
+class TestHistoryIndex(unittest.TestCase):
+    """Test querying the history through the memory-mapped index."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.store = HistoryStore(self.output_dir / "history.sqlite")
+        self.store.upsert("26-02-2025", _frame([
+            ["АЛФА ХОЛДИНГ АД", "BG1", 100, 50, 10],
+            ["БЕТА АД", "BG2", 200, 80, 20],
+        ]))
+        self.store.upsert("28-02-2025", _frame([
+            ["АЛФА ХОЛДИНГ АД", "BG1", 100, 55, 12],
+            ["ГАМА АД", "BG3", 300, 90, 30],
+        ]))
+        self.index = HistoryIndex.open(self.output_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.store.close()
+        self.index.store.close()
+        shutil.rmtree(self.output_dir)
+
+    def test_history(self):
+        """Test the history of an emission over a date range."""
+        df = self.index.history(codes=["BG1"])
+        self.assertEqual(df["Date"].tolist(), ["2025-02-26", "2025-02-28"])
+        self.assertEqual(df["Free Float"].tolist(), [50, 55])
+        self.assertEqual(df["Company"].tolist(), ["АЛФА ХОЛДИНГ АД"] * 2)
+
+        df = self.index.history(codes=["BG1", "BG3", "BG9"], start="27-02-2025")
+        self.assertEqual(df["Emission Code"].tolist(), ["BG1", "BG3"])
+
+        df = self.index.history(companies=["холдинг", "бета"], end="2025-02-26")
+        self.assertEqual(df["Emission Code"].tolist(), ["BG1", "BG2"])
+
+        self.assertTrue(self.index.history(codes=["BG9"]).empty)
+
+    def test_snapshot(self):
+        """Test the report in effect on a date."""
+        self.assertEqual(
+            self.index.snapshot("27-02-2025")["Emission Code"].tolist(), ["BG1", "BG2"]
+        )
+        self.assertEqual(
+            self.index.snapshot("01-03-2025")["Emission Code"].tolist(), ["BG1", "BG3"]
+        )
+        self.assertEqual(
+            self.index.snapshot("01-03-2025", codes=["BG3"])["Free Float"].tolist(), [90]
+        )
+        self.assertTrue(self.index.snapshot("01-01-2025").empty)
+
+    def test_rebuilt_after_store_changes(self):
+        """Test that the index follows new reports and is reused when unchanged."""
+        self.store.upsert("28-02-2025", _frame([["АЛФА ХОЛДИНГ АД", "BG1", 100, 60, 12]]))
+
+        self.assertEqual(self.index.history(codes=["BG1"])["Free Float"].tolist(), [50, 60])
+        self.assertEqual(len(list(self.output_dir.glob(".history-index.*.npy"))), 1)
+
+        reopened = HistoryIndex.open(self.output_dir)
+        self.assertEqual(reopened.version, self.index.version)
+        self.assertEqual(reopened.history()["Free Float"].tolist(), [50, 60, 80])
+        reopened.store.close()
+
+    def test_query_command(self):
+        """Test the query subcommand."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            exit_code = main(["query", "--output", str(self.output_dir), "--code", "BG3"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(output.getvalue().splitlines(), [
+            "Date,Company,Emission Code,Total Shares,Free Float,Shareholders",
+            "2025-02-28,ГАМА АД,BG3,300,90,30",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests for the ordering and scheduling of PDF files.
+"""
+
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from csd_bg_free_float_extractor.extractor.manifest import Manifest
+from csd_bg_free_float_extractor.extractor.scheduler import (
+    ORDER_NAME,
+    ORDER_NEWEST,
+    ORDER_OLDEST,
+    WorkScheduler,
+    date_from_filename,
+    order_files,
+    probe_date
+)
+
+
+class TestProbeDate(unittest.TestCase):
+    """Test probing the report date of a file."""
+
+    def test_date_from_filename(self):
+        """Test the supported date formats in file names."""
+        self.assertEqual(date_from_filename("ff_28-02-2025.pdf"), date(2025, 2, 28))
+        self.assertEqual(date_from_filename("2025-02-28.pdf"), date(2025, 2, 28))
+        self.assertEqual(date_from_filename("report_20250228.pdf"), date(2025, 2, 28))
+        self.assertEqual(date_from_filename("28.02.2025.pdf"), date(2025, 2, 28))
+        self.assertIsNone(date_from_filename("report.pdf"))
+        self.assertIsNone(date_from_filename("31-02-2025.pdf"))
+
+    def test_header_fallback(self):
+        """Test that the header is only read when the file name holds no date."""
+        parser = MagicMock()
+        parser.read_date.return_value = "14-03-2025"
+
+        self.assertEqual(probe_date(Path("report.pdf"), parser), date(2025, 3, 14))
+        self.assertEqual(probe_date(Path("01-01-2024.pdf"), parser), date(2024, 1, 1))
+        parser.read_date.assert_called_once_with(Path("report.pdf"))
+
+    def test_unreadable_header(self):
+        """Test that a file whose header cannot be read has no date."""
+        parser = MagicMock()
+        parser.read_date.side_effect = ValueError("not a pdf")
+
+        self.assertIsNone(probe_date(Path("report.pdf"), parser))
+
+
+class TestOrderFiles(unittest.TestCase):
+    """Test ordering files by report date."""
+
+    def setUp(self):
+        """Set up files with and without dates."""
+        self.files = [Path("b/01-03-2025.pdf"), Path("a/undated.pdf"), Path("c/15-01-2025.pdf"),
+                      Path("d/28-02-2025.pdf")]
+        self.probe = lambda path: date_from_filename(path.name)
+
+    def test_newest_first(self):
+        """Test that undated files come last."""
+        self.assertEqual([path.name for path in order_files(self.files, ORDER_NEWEST, self.probe)],
+                         ["01-03-2025.pdf", "28-02-2025.pdf", "15-01-2025.pdf", "undated.pdf"])
+
+    def test_oldest_first(self):
+        """Test ordering the oldest report first."""
+        self.assertEqual([path.name for path in order_files(self.files, ORDER_OLDEST, self.probe)],
+                         ["15-01-2025.pdf", "28-02-2025.pdf", "01-03-2025.pdf", "undated.pdf"])
+
+    def test_by_name(self):
+        """Test that ordering by name does not probe dates."""
+        probe = MagicMock()
+        self.assertEqual(order_files(self.files, ORDER_NAME, probe), sorted(self.files))
+        probe.assert_not_called()
+
+    def test_unknown_order(self):
+        """Test that an unknown order is rejected."""
+        with self.assertRaises(ValueError):
+            order_files(self.files, "random")
+
+
+class TestWorkScheduler(unittest.TestCase):
+    """Test the priority queue of live and backfill work."""
+
+    def setUp(self):
+        """Set up a scheduler recording the processed files."""
+        self.processed = []
+        self.scheduler = WorkScheduler(
+            self.processed.append, probe=lambda path: date_from_filename(path.name)
+        )
+
+    def tearDown(self):
+        """Stop the scheduler."""
+        self.scheduler.stop()
+
+    def test_live_work_preempts_backfill(self):
+        """Test that a watched file is taken before queued backfill."""
+        self.scheduler.submit_backfill([Path("01-01-2024.pdf"), Path("01-01-2025.pdf")])
+        self.scheduler.submit_live(Path("01-06-2023.pdf"))
+        self.scheduler.start()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual([path.name for path in self.processed],
+                         ["01-06-2023.pdf", "01-01-2025.pdf", "01-01-2024.pdf"])
+
+    def test_live_work_during_backfill(self):
+        """Test that a file reported while a backfill file is processed is taken next."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def process(path):
+            self.processed.append(path)
+            if len(self.processed) == 1:
+                started.set()
+                release.wait(5)
+
+        self.scheduler.callback = process
+        self.scheduler.submit_backfill(
+            [Path("01-01-2025.pdf"), Path("01-01-2024.pdf"), Path("01-01-2023.pdf")]
+        )
+        self.scheduler.start()
+        self.assertTrue(started.wait(5))
+        self.scheduler.submit_live(Path("live.pdf"))
+        release.set()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual([path.name for path in self.processed],
+                         ["01-01-2025.pdf", "live.pdf", "01-01-2024.pdf", "01-01-2023.pdf"])
+
+    def test_backfill_to_running_scheduler_is_ordered(self):
+        """Test that a backfill given to a running scheduler starts with the newest file."""
+        self.scheduler.start()
+        self.scheduler.submit_backfill(
+            [Path("01-01-2023.pdf"), Path("01-01-2025.pdf"), Path("01-01-2024.pdf")]
+        )
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual([path.name for path in self.processed],
+                         ["01-01-2025.pdf", "01-01-2024.pdf", "01-01-2023.pdf"])
+
+    def test_batch_is_held_until_the_queue_is_drained(self):
+        """Test that the batch context is entered once for all queued files."""
+        events = []
+
+        class Batch:
+            def __enter__(self):
+                events.append("enter")
+
+            def __exit__(self, *exc_info):
+                events.append("exit")
+
+        self.scheduler.callback = lambda path: events.append(path.name)
+        self.scheduler.batch = Batch
+        self.scheduler.submit_backfill([Path("01-01-2024.pdf"), Path("01-01-2023.pdf")])
+        self.scheduler.start()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual(events, ["enter", "01-01-2024.pdf", "01-01-2023.pdf", "exit"])
+
+    def test_manifest_batch_is_saved_before_the_queue_is_drained(self):
+        """Test that a manifest deferred for the batch is saved while files keep arriving."""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        manifest_path = temp_dir / ".manifest.json"
+        manifest = Manifest(manifest_path, save_changes=2)
+        pdf_files = [temp_dir / f"01-01-{year}.pdf" for year in (2024, 2023, 2022)]
+        for pdf_file in pdf_files:
+            pdf_file.write_bytes(b"%PDF-1.4")
+        saved = []
+
+        def process(path):
+            manifest.record(path, path.stem, [])
+            saved.append(len(Manifest(manifest_path).entries))
+
+        self.scheduler.callback = process
+        self.scheduler.batch = manifest.deferred
+        self.scheduler.submit_backfill(pdf_files)
+        self.scheduler.start()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual(saved, [0, 2, 2])
+        self.assertEqual(len(Manifest(manifest_path).entries), 3)
+
+    def test_queued_file_is_not_duplicated(self):
+        """Test that queuing a file again promotes it instead of adding it twice."""
+        self.scheduler.submit_backfill([Path("01-01-2024.pdf"), Path("01-01-2023.pdf")])
+        self.scheduler.submit_live(Path("01-01-2023.pdf"))
+        self.scheduler.submit_backfill([Path("01-01-2023.pdf")])
+        self.assertEqual(len(self.scheduler), 2)
+        self.scheduler.start()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual(
+            [path.name for path in self.processed], ["01-01-2023.pdf", "01-01-2024.pdf"]
+        )
+
+    def test_failing_file_does_not_stop_the_queue(self):
+        """Test that an error processing one file is logged and the next file processed."""
+        callback = MagicMock(side_effect=[RuntimeError("broken"), None])
+        self.scheduler.callback = callback
+        self.scheduler.logger = MagicMock()
+        self.scheduler.submit_backfill([Path("01-01-2024.pdf"), Path("01-01-2023.pdf")])
+        self.scheduler.start()
+
+        self.assertTrue(self.scheduler.join(timeout=5))
+        self.assertEqual(callback.call_count, 2)
+        self.scheduler.logger.error.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests for the HTTP extraction service.
+"""
+
+import json
+import logging
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.constants import CSV_COLUMNS
+from csd_bg_free_float_extractor.extractor import server
+from csd_bg_free_float_extractor.extractor.parser import PDFParser
+from csd_bg_free_float_extractor.extractor.server import (
+    ExtractionServer,
+    extract_upload,
+    rows_to_csv
+)
+
+
+class TestExtractUpload(unittest.TestCase):
+    """Test extracting an upload in a worker."""
+
+    def setUp(self):
+        """Set up a worker parser."""
+        self.logger = logging.getLogger('test_server')
+        self.logger.setLevel(logging.ERROR)
+        self.parser = PDFParser(self.logger)
+        # Shared with the capturing copies of the parser
+        self.parser.extract_data_from_pdf = MagicMock()
+        patcher = patch.object(server, "_worker_parser", self.parser)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rows_and_date(self):
+        """Test that the rows are returned with native integers."""
+        df = pd.DataFrame(
+            [["235 ХОЛДИНГС АД", "BG1100017174", 5109000, 2583625, 41]], columns=CSV_COLUMNS
+        )
+        self.parser.extract_data_from_pdf.return_value = (df, "28-02-2025", False)
+
+        result = extract_upload(b"%PDF-1.4", "report.pdf")
+
+        upload = self.parser.extract_data_from_pdf.call_args.args[0]
+        self.assertEqual(upload.read(), b"%PDF-1.4")
+        self.assertEqual(str(upload), "report.pdf")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["date"], "28-02-2025")
+        self.assertEqual(result["rows"], [{
+            "Company": "235 ХОЛДИНГС АД", "Emission Code": "BG1100017174",
+            "Total Shares": 5109000, "Free Float": 2583625, "Shareholders": 41
+        }])
+        self.assertEqual(result["violations"], {})
+        json.dumps(result)
+
+    def test_failure_is_reported(self):
+        """Test that an extraction error is returned instead of raised."""
+        self.parser.extract_data_from_pdf.side_effect = ValueError("broken file")
+
+        result = extract_upload(b"not a pdf", "broken.pdf")
+
+        self.assertFalse(result["success"])
+        self.assertTrue(result["errors_occurred"])
+        self.assertEqual(result["errors"], ["Error processing PDF broken.pdf: broken file"])
+
+
+class TestExtractionServer(unittest.TestCase):
+    """Test the HTTP interface, with threads standing in for the worker processes."""
+
+    def setUp(self):
+        """Start a server on a free port."""
+        self.logger = logging.getLogger('test_server')
+        self.logger.setLevel(logging.ERROR)
+        self.result = {
+            "file": "report.pdf", "date": "28-02-2025", "success": True, "errors_occurred": False,
+            "errors": [], "rejected_rows": {},
+            "rows": [{"Company": "А", "Emission Code": "BG1", "Total Shares": 3,
+                      "Free Float": 2, "Shareholders": 1}],
+        }
+        self.uploads = []
+
+        def extract(data, filename):
+            self.uploads.append((data, filename))
+            return self.result
+
+        patcher = patch.object(server, "extract_upload", side_effect=extract)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = ExtractionServer(port=0, max_upload=1024, logger=self.logger)
+        with patch.object(ExtractionServer, "_start_pool",
+                          lambda service: setattr(service, "_pool", ThreadPoolExecutor(1))):
+            host, port = self.server.start()
+        self.connection = HTTPConnection(host, port, timeout=10)
+        self.addCleanup(self.connection.close)
+
+        executor = ThreadPoolExecutor(1)
+        executor.submit(self.server.serve_forever)
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(lambda: self.server._httpd and self.server._httpd.shutdown())
+
+    def _request(self, method, path, body=None, headers=None):
+        self.connection.request(method, path, body=body, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read().decode("utf-8")
+
+    def test_extract_json(self):
+        """Test uploading a PDF and getting its rows as JSON."""
+        response, body = self._request("POST", "/extract?filename=report.pdf", b"%PDF-1.4")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body), self.result)
+        self.assertEqual(self.uploads, [(b"%PDF-1.4", "report.pdf")])
+
+    def test_extract_csv(self):
+        """Test getting the rows as CSV with the date in a header."""
+        response, body = self._request("POST", "/extract", b"%PDF-1.4", {"Accept": "text/csv"})
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("X-Report-Date"), "28-02-2025")
+        self.assertEqual(body, rows_to_csv(self.result["rows"]))
+        self.assertEqual(self.uploads[0][1], "upload.pdf")
+
+    def test_no_rows(self):
+        """Test that a PDF without rows is answered as unprocessable."""
+        self.result = dict(self.result, success=False, rows=[])
+
+        response, _ = self._request("POST", "/extract", b"%PDF-1.4")
+
+        self.assertEqual(response.status, 422)
+
+    def test_rejected_requests(self):
+        """Test empty and oversized uploads and unknown paths."""
+        self.assertEqual(self._request("POST", "/extract", b"")[0].status, 400)
+        self.assertEqual(self._request("POST", "/other", b"x")[0].status, 404)
+        self.assertEqual(self._request("GET", "/health")[0].status, 200)
+        self.assertEqual(self._request("POST", "/extract", b"x" * 2048)[0].status, 413)
+        self.assertEqual(self.uploads, [])
+
+
+class TestRowsToCsv(unittest.TestCase):
+    """Test formatting rows as CSV."""
+
+    def test_header_and_rows(self):
+        """Test that the CSV has the output file's columns."""
+        csv_text = rows_to_csv([{"Company": "А, АД", "Emission Code": "BG1", "Total Shares": 3,
+                                 "Free Float": 2, "Shareholders": 1}])
+
+        self.assertEqual(csv_text, "Company,Emission Code,Total Shares,Free Float,Shareholders\n"
+                                   "\"А, АД\",BG1,3,2,1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+End-to-end extraction tests on synthetic reports.
+"""
+
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from csd_bg_free_float_extractor.extractor.parser import PDFParser
+
+try:
+    import reportlab
+    from benchmarks.generate import find_font, generate_report
+    find_font()
+except (ImportError, FileNotFoundError):
+    reportlab = None
+
+from benchmarks.run import compare
+
+
+@unittest.skipIf(reportlab is None, "reportlab or a Cyrillic font is not available")
+class TestSyntheticReports(unittest.TestCase):
+    """Test extracting generated reports without mocking pdfplumber."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate a report spread over several pages."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.pdf_path = Path(cls.temp_dir) / "report.pdf"
+        cls.rows = generate_report(cls.pdf_path, rows=40, pages=3, report_date="14-03-2025")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the generated report."""
+        shutil.rmtree(cls.temp_dir)
+
+    def _assert_extracted(self, backend):
+        """Check that a backend extracts exactly the generated rows."""
+        logger = logging.getLogger("test_logger")
+        df, extracted_date, errors_occurred = PDFParser(
+            logger, backend=backend
+        ).extract_data_from_pdf(self.pdf_path)
+
+        self.assertEqual(extracted_date, "14-03-2025")
+        self.assertFalse(errors_occurred)
+        self.assertEqual(list(df.itertuples(index=False, name=None)), self.rows)
+
+    def test_pdfplumber_backend(self):
+        """Test the pdfplumber backend, including wrapped company names."""
+        self._assert_extracted("pdfplumber")
+
+    def test_pdfminer_backend(self):
+        """Test the pdfminer backend."""
+        self._assert_extracted("pdfminer")
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Test comparing benchmark results with a baseline."""
+
+    def test_compare(self):
+        """Test that slowdowns and memory growth beyond the tolerance are reported."""
+        baseline = {
+            "parse_row": {"rows_per_s": 1000, "peak_rss_mb": 100},
+            "writer:csv": {"rows_per_s": 1000, "peak_rss_mb": 100},
+        }
+        results = {
+            "parse_row": {"rows_per_s": 850, "peak_rss_mb": 110},
+            "writer:csv": {"rows_per_s": 700, "peak_rss_mb": 130},
+            "writer:parquet": {"error": "pyarrow missing"},
+        }
+
+        regressions = compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(regression.startswith("writer:csv") for regression in regressions))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the cached table templates.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from csd_bg_free_float_extractor.extractor.templates import (
+    TableTemplate, TemplateCache, layout_fingerprint
+)
+
+COLUMNS = [10, 200, 300, 380, 460, 540]
+
+
+def _page(rows, row_height=20, top=100):
+    """Build a fake pdfplumber page with one ruled table row per entry in rows."""
+    chars = []
+    for index, cells in enumerate(rows):
+        row_top = top + index * row_height + 5
+        for x, cell in zip(COLUMNS, cells):
+            for offset, line in enumerate(cell.split("\n")):
+                for position, char in enumerate(line):
+                    chars.append({
+                        "text": char,
+                        "x0": x + 2 + position * 5,
+                        "x1": x + 7 + position * 5,
+                        "top": row_top + offset * 9,
+                        "bottom": row_top + offset * 9 + 8
+                    })
+    edges = [{"x0": COLUMNS[0], "x1": COLUMNS[-1], "top": top + index * row_height}
+             for index in range(len(rows) + 1)]
+    page = MagicMock(chars=chars, horizontal_edges=edges)
+    return page
+
+
+class TestTableTemplate(unittest.TestCase):
+    """Test extracting tables with a template."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.template = TableTemplate(COLUMNS, (10, 100, 540, 160))
+
+    def test_extract_table(self):
+        """Test that characters are assigned to the template's cells."""
+        page = _page([
+            ["235 АД", "BG1100017174", "5109000", "2583625", "41"],
+            ["Фонд\nИмоти", "BG1100008157", "7900000", "0", "1"],
+        ], row_height=30)
+
+        self.assertEqual(self.template.extract_table(page), [
+            ["235 АД", "BG1100017174", "5109000", "2583625", "41"],
+            ["Фонд\nИмоти", "BG1100008157", "7900000", "0", "1"],
+        ])
+
+    def test_extract_table_without_rules(self):
+        """Test that a page without row rules is not extracted."""
+        page = _page([["235 АД", "BG1100017174", "5109000", "2583625", "41"]])
+        page.horizontal_edges = []
+
+        self.assertIsNone(self.template.extract_table(page))
+
+    def test_from_table(self):
+        """Test learning the column boundaries from table cells."""
+        table = MagicMock(bbox=(10, 100, 540, 160))
+        table.cells = [(x0, 100, x1, 120) for x0, x1 in zip(COLUMNS, COLUMNS[1:])]
+        table.cells.append((10.4, 120, 200.2, 140))
+
+        template = TableTemplate.from_table(table)
+        self.assertEqual(template.columns, COLUMNS)
+        self.assertEqual(template.bbox, (10, 100, 540, 160))
+
+
+class TestTemplateCache(unittest.TestCase):
+    """Test the template cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "templates.json"
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_persisted(self):
+        """Test that templates are stored on disk and can be discarded."""
+        TemplateCache(self.path).put("layout", TableTemplate(COLUMNS, (10, 100, 540, 160)))
+
+        cache = TemplateCache(self.path)
+        self.assertEqual(cache.get("layout").columns, COLUMNS)
+
+        cache.discard("layout")
+        self.assertIsNone(TemplateCache(self.path).get("layout"))
+
+    def test_fingerprint(self):
+        """Test the layout fingerprint of a document."""
+        pdf = MagicMock(metadata={"Producer": "Producer", "Creator": "Creator"})
+        pdf.pages = [MagicMock(width=595.2, height=841.9)]
+
+        self.assertEqual(layout_fingerprint(pdf), "595x842|Producer|Creator")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for the consistency checks of extracted reports.
+"""
+
+import unittest
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.constants import CSV_COLUMNS
+from csd_bg_free_float_extractor.extractor.validation import (
+    CHECK_DUPLICATE,
+    CHECK_FREE_FLOAT,
+    CHECK_ISIN,
+    CHECK_SHAREHOLDERS,
+    isin_valid,
+    validate_frame
+)
+
+
+class TestIsinValid(unittest.TestCase):
+    """Test the batched ISIN check."""
+
+    def test_check_digits(self):
+        """Test valid ISINs, including letters in the body, and wrong check digits."""
+        codes = ["BG1100017174", "BG1100008157", "US0378331005", "AU0000XVGZA3",
+                 "BG1100017175", "US0378331006", "AU0000XVGZA4"]
+        self.assertEqual(isin_valid(codes).tolist(), [True] * 4 + [False] * 3)
+
+    def test_format(self):
+        """Test that codes of the wrong length or with other characters are invalid."""
+        codes = [
+            "BG110001717",
+            "BG11000171745",
+            "bg1100017174",
+            "ВG1100017174",
+            "BG11000-7174",
+            "",
+            "BG",
+        ]
+        self.assertEqual(isin_valid(codes).tolist(), [False] * len(codes))
+
+    def test_empty(self):
+        """Test checking no codes."""
+        self.assertEqual(len(isin_valid([])), 0)
+
+
+class TestValidateFrame(unittest.TestCase):
+    """Test finding the inconsistent rows of a report."""
+
+    def test_valid_report(self):
+        """Test that a consistent report has no violations."""
+        df = pd.DataFrame([
+            ["235 ХОЛДИНГС АД", "BG1100017174", 5109000, 2583625, 41],
+            ["БПД АДСИЦ", "BG1100008157", 7900000, 0, 1],
+        ], columns=CSV_COLUMNS)
+
+        result = validate_frame(df)
+
+        self.assertEqual(len(result), 0)
+        self.assertFalse(result)
+        self.assertEqual(result.by_check(), {})
+
+    def test_violations(self):
+        """Test each check on a report with inconsistent rows."""
+        df = pd.DataFrame([
+            ["АЛФА АД", "BG1100017174", 100, 150, 3],
+            ["БЕТА АД", "BG1100017174", 100, 50, 300],
+            ["ГАМА АД", "BG1100017175", 100, 50, 3],
+            ["ДЕЛТА АД", "BG1100008157", 100, 100, 100],
+        ], columns=CSV_COLUMNS)
+
+        result = validate_frame(df)
+
+        self.assertEqual(
+            [(violation["row"], violation["check"]) for violation in result.violations],
+            [
+                (1, CHECK_FREE_FLOAT),
+                (1, CHECK_DUPLICATE),
+                (2, CHECK_SHAREHOLDERS),
+                (2, CHECK_DUPLICATE),
+                (3, CHECK_ISIN),
+            ],
+        )
+        self.assertEqual(result.by_check(), {
+            CHECK_FREE_FLOAT: 1, CHECK_SHAREHOLDERS: 1, CHECK_ISIN: 1, CHECK_DUPLICATE: 2
+        })
+        self.assertIn("Found 5 validation violations in report.pdf", result.summary("report.pdf"))
+
+    def test_details_are_limited(self):
+        """Test that only the first violations are described one by one."""
+        df = pd.DataFrame(
+            [["АЛФА АД", f"BG{i:09d}", 10, 5, 1] for i in range(5)], columns=CSV_COLUMNS
+        )
+
+        lines = validate_frame(df).details(limit=2)
+
+        self.assertEqual(lines, [
+            f"Row 1 (BG000000000, АЛФА АД): {CHECK_ISIN}",
+            f"Row 2 (BG000000001, АЛФА АД): {CHECK_ISIN}",
+            "... 3 more validation violations",
+        ])
+
+    def test_empty_report(self):
+        """Test validating a report without rows."""
+        self.assertEqual(len(validate_frame(pd.DataFrame(columns=CSV_COLUMNS))), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
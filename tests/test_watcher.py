@@ -0,0 +1,182 @@
+"""
+Tests for the file system watcher.
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from csd_bg_free_float_extractor.constants import SCAN_INDEX_FILENAME
+from csd_bg_free_float_extractor.watcher.debounce import DebounceQueue
+from csd_bg_free_float_extractor.watcher.handler import PdfFileHandler
+from csd_bg_free_float_extractor.watcher.poller import PollingScanner, StatIndex, scan_directory
+
+
+class TestDebounceQueue(unittest.TestCase):
+    """Test the coalescing work queue."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "report.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.4")
+        self.processed = []
+        self.done = threading.Event()
+
+        def callback(path):
+            self.processed.append(path)
+            self.done.set()
+
+        self.queue = DebounceQueue(callback, quiet_period=0.05)
+        self.queue.start()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.queue.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_coalesces_events(self):
+        """Test that repeated events for one file are processed once."""
+        for _ in range(5):
+            self.queue.put(self.pdf_path)
+
+        self.assertTrue(self.done.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(self.processed, [self.pdf_path])
+        self.assertEqual(len(self.queue), 0)
+
+    def test_waits_for_stable_file(self):
+        """Test that a file still being written is postponed."""
+        self.queue.put(self.pdf_path)
+        self.pdf_path.write_bytes(b"%PDF-1.4 more content")
+
+        time.sleep(0.07)
+        self.assertEqual(self.processed, [])
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(self.processed, [self.pdf_path])
+
+    def test_drops_deleted_file(self):
+        """Test that a file removed before processing is dropped."""
+        self.queue.put(self.pdf_path)
+        self.pdf_path.unlink()
+
+        self.assertFalse(self.done.wait(0.2))
+        self.assertEqual(len(self.queue), 0)
+
+
+class TestPdfFileHandler(unittest.TestCase):
+    """Test the PDF file system event handler."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = MagicMock()
+        self.handler = PdfFileHandler(self.processor, quiet_period=60)
+
+    def test_created_event_is_queued(self):
+        """Test that creation events are queued instead of processed inline."""
+        event = MagicMock(is_directory=False, src_path="/data/input/report.pdf")
+        self.handler.on_created(event)
+
+        self.processor.process_pdf_file.assert_not_called()
+        self.assertEqual(len(self.handler.queue), 1)
+
+    def test_non_pdf_events_are_ignored(self):
+        """Test that events for other files are ignored."""
+        event = MagicMock(is_directory=False, src_path="/data/input/notes.txt")
+        self.handler.on_created(event)
+        self.handler.on_modified(event)
+
+        self.assertEqual(len(self.handler.queue), 0)
+
+
+class TestPollingScanner(unittest.TestCase):
+    """Test the polling directory scanner."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.input_dir = Path(tempfile.mkdtemp())
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.processor = MagicMock(input_dir=self.input_dir, output_dir=self.output_dir)
+        # No file has been processed
+        self.processor.manifest.lookup.return_value = None
+        (self.input_dir / "old.pdf").write_bytes(b"%PDF-1.4 old")
+        (self.input_dir / "notes.txt").write_text("ignored")
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.input_dir)
+        shutil.rmtree(self.output_dir)
+
+    def _scanner(self):
+        """Create a scanner with a long quiet period so nothing gets processed."""
+        return PollingScanner(self.processor, interval=60, quiet_period=60)
+
+    def test_scan_directory(self):
+        """Test that only PDF files are included in a snapshot."""
+        self.assertEqual(list(scan_directory(self.input_dir)), ["old.pdf"])
+
+    def test_scan_directory_recursive(self):
+        """Test that nested folders are scanned except the excluded one."""
+        (self.input_dir / "2024" / "03").mkdir(parents=True)
+        (self.input_dir / "2024" / "03" / "report.pdf").write_bytes(b"%PDF-1.4 nested")
+        (self.input_dir / "output").mkdir()
+        (self.input_dir / "output" / "failed.pdf").write_bytes(b"%PDF-1.4 output")
+
+        snapshot = scan_directory(self.input_dir, recursive=True, exclude=self.input_dir / "output")
+
+        self.assertEqual(sorted(snapshot), ["2024/03/report.pdf", "old.pdf"])
+
+    def test_stat_index_diff(self):
+        """Test comparing a snapshot with the index."""
+        index = StatIndex(self.output_dir / "index.json")
+        index.entries = {"a.pdf": [1, 1], "b.pdf": [2, 2]}
+
+        changed, removed = index.diff({"a.pdf": [1, 1], "b.pdf": [3, 3], "c.pdf": [4, 4]})
+        self.assertEqual(sorted(changed), ["b.pdf", "c.pdf"])
+        self.assertEqual(removed, [])
+
+        changed, removed = index.diff({"a.pdf": [1, 1]})
+        self.assertEqual(changed, [])
+        self.assertEqual(removed, ["b.pdf"])
+
+    def test_first_start_only_indexes(self):
+        """Test that existing files are indexed but not queued without a saved index."""
+        scanner = self._scanner()
+        self.assertEqual(scanner.reconcile(), [])
+        self.assertEqual(len(scanner.queue), 0)
+
+        (self.input_dir / "new.pdf").write_bytes(b"%PDF-1.4 new")
+        self.assertEqual(scanner.scan_once(), [self.input_dir / "new.pdf"])
+        self.assertEqual(scanner.scan_once(), [])
+
+    def test_catch_up_after_restart(self):
+        """Test that files added while stopped are queued on the next start."""
+        self._scanner().reconcile()
+        (self.input_dir / "dropped.pdf").write_bytes(b"%PDF-1.4 dropped")
+
+        scanner = self._scanner()
+        self.assertEqual(scanner.reconcile(), [self.input_dir / "dropped.pdf"])
+        self.assertEqual(len(scanner.queue), 1)
+
+    def test_unprocessed_file_is_resumed_after_restart(self):
+        """Test that a file detected but not processed before a stop is queued again."""
+        self._scanner().reconcile()
+        (self.input_dir / "detected.pdf").write_bytes(b"%PDF-1.4 detected")
+        self.assertEqual(self._scanner().scan_once(), [self.input_dir / "detected.pdf"])
+
+        scanner = self._scanner()
+        self.assertEqual(scanner.reconcile(), [self.input_dir / "detected.pdf"])
+        self.assertEqual(len(scanner.queue), 1)
+
+        # Once the manifest shows it as processed, it is no longer pending
+        self.processor.manifest.lookup.return_value = {"outputs": []}
+        self.assertEqual(self._scanner().reconcile(), [])
+        self.assertEqual(StatIndex(self.output_dir / SCAN_INDEX_FILENAME).pending, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
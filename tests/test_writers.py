@@ -0,0 +1,185 @@
+"""
+Tests for the output writers.
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from csd_bg_free_float_extractor.constants import LOCKS_DIRNAME
+from csd_bg_free_float_extractor.extractor import writers
+from csd_bg_free_float_extractor.extractor.writers import (
+    BackgroundWriter, atomic_path, date_lock, parse_formats, write_csv_rows, write_outputs,
+    FORMAT_PARQUET, FORMAT_ARROW
+)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestWriters(unittest.TestCase):
+    """Test writing extracted data in the output formats."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.df = pd.DataFrame({
+            "Company": ["235 ХОЛДИНГС АД", "АГРИА ГРУП ХОЛДИНГ АД"],
+            "Emission Code": ["BG1100017174", "BG1100036984"],
+            "Total Shares": pd.array([5109000, 15905549], dtype="int64"),
+            "Free Float": pd.array([2583625, 3025000], dtype="int64"),
+            "Shareholders": pd.array([41, 2900], dtype="int64"),
+        })
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.output_dir)
+
+    def test_parse_formats(self):
+        """Test parsing a list of output formats."""
+        self.assertEqual(parse_formats("CSV,xlsx,csv"), ("csv", "xlsx"))
+        self.assertEqual(parse_formats(["parquet"]), ("parquet",))
+        with self.assertRaises(ValueError):
+            parse_formats("csv,pdf")
+        with self.assertRaises(ValueError):
+            parse_formats("")
+
+    def test_write_csv_and_xlsx(self):
+        """Test writing CSV and Excel files with the same content."""
+        paths = write_outputs(self.df, self.output_dir, "28-02-2025", ("csv", "xlsx"))
+
+        self.assertEqual(
+            paths, [self.output_dir / "28-02-2025.csv", self.output_dir / "28-02-2025.xlsx"]
+        )
+        pd.testing.assert_frame_equal(pd.read_csv(paths[0], encoding="utf-8-sig"), self.df)
+        pd.testing.assert_frame_equal(pd.read_excel(paths[1]), self.df)
+
+    def test_write_csv_rows(self):
+        """Test that streamed rows produce the same CSV file as the DataFrame writer."""
+        expected, = write_outputs(self.df, self.output_dir, "28-02-2025", ("csv",))
+        path = self.output_dir / "streamed.csv"
+
+        count = write_csv_rows(iter(self.df.to_dict("records")), path)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(path.read_bytes(), expected.read_bytes())
+
+    def test_write_csv_rows_failure_leaves_no_file(self):
+        """Test that a failing row source leaves neither the output nor a temporary file."""
+        def rows():
+            yield self.df.to_dict("records")[0]
+            raise RuntimeError("broken page")
+
+        path = self.output_dir / "streamed.csv"
+        with self.assertRaises(RuntimeError):
+            write_csv_rows(rows(), path)
+
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+
+    def test_write_csv_rows_empty_keeps_existing_file(self):
+        """Test that no rows leave an existing output untouched unless empty files are kept."""
+        path = self.output_dir / "28-02-2025.csv"
+        path.write_text("old")
+
+        self.assertEqual(write_csv_rows(iter([]), path, keep_empty=False), 0)
+
+        self.assertEqual(path.read_text(), "old")
+        self.assertEqual(list(self.output_dir.iterdir()), [path])
+
+    def test_atomic_path(self):
+        """Test that the target is only replaced once the write completes."""
+        path = self.output_dir / "28-02-2025.csv"
+        path.write_text("old")
+
+        with self.assertRaises(RuntimeError):
+            with atomic_path(path) as tmp_path:
+                tmp_path.write_text("partial")
+                raise RuntimeError("write failed")
+        self.assertEqual(path.read_text(), "old")
+
+        with atomic_path(path) as tmp_path:
+            tmp_path.write_text("new")
+            self.assertEqual(path.read_text(), "old")
+        self.assertEqual(path.read_text(), "new")
+        self.assertEqual(list(self.output_dir.iterdir()), [path])
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available on this platform")
+    def test_date_lock_file(self):
+        """Test that the lock of a date excludes other lockers of its hidden lock file."""
+        lock_path = self.output_dir / LOCKS_DIRNAME / "28-02-2025.lock"
+
+        def try_lock():
+            with open(lock_path, "a") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+                fcntl.flock(f, fcntl.LOCK_UN)
+                return True
+
+        with date_lock("28-02-2025", self.output_dir):
+            # Reentrant, and the lock file stays locked until the outer block ends
+            with date_lock("28-02-2025", self.output_dir):
+                self.assertFalse(try_lock())
+            self.assertFalse(try_lock())
+        self.assertTrue(try_lock())
+        self.assertEqual(list(self.output_dir.iterdir()), [self.output_dir / LOCKS_DIRNAME])
+        # The process forgets the lock of a date once it is released
+        self.assertNotIn("28-02-2025", writers._date_locks)
+
+    def test_background_writer(self):
+        """Test that jobs run in order in another thread and the queue is bounded."""
+        release = threading.Event()
+        done = []
+
+        def job(number):
+            release.wait()
+            done.append((number, threading.current_thread() is not threading.main_thread()))
+            return number
+
+        with BackgroundWriter(max_pending=2) as writer:
+            futures = [writer.submit(job, 1), writer.submit(job, 2)]
+            blocked = threading.Thread(target=lambda: futures.append(writer.submit(job, 3)))
+            blocked.start()
+            time.sleep(0.1)
+            # The third job waits for a free slot
+            self.assertEqual(len(futures), 2)
+            release.set()
+            blocked.join()
+
+        self.assertEqual([future.result() for future in futures], [1, 2, 3])
+        self.assertEqual(done, [(1, True), (2, True), (3, True)])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_write_columnar(self):
+        """Test that Parquet and Arrow files keep the typed schema and report date."""
+        parquet_path, arrow_path = write_outputs(
+            self.df, self.output_dir, "28-02-2025", (FORMAT_PARQUET, FORMAT_ARROW)
+        )
+
+        import pyarrow.feather
+        import pyarrow.parquet
+        for table in (
+            pyarrow.parquet.read_table(parquet_path),
+            pyarrow.feather.read_table(arrow_path),
+        ):
+            self.assertEqual(table.schema.field("Emission Code").type, pyarrow.string())
+            self.assertEqual(table.schema.field("Free Float").type, pyarrow.int64())
+            self.assertEqual(table.schema.metadata[b"report_date"], b"28-02-2025")
+            pd.testing.assert_frame_equal(table.to_pandas(), self.df, check_dtype=False)
+
+
+if __name__ == "__main__":
+    unittest.main()